@@ -0,0 +1,153 @@
+"""API access allowlists hot reload
+"""
+
+import logging
+import os
+import signal
+import threading
+import typing
+from dotenv import dotenv_values
+from . import constants
+from . import environment
+from . import helpers
+
+
+logger = logging.getLogger(__name__)
+watcher_stop = threading.Event()
+
+
+def read_allowlists_source() -> typing.Tuple[str, str, str, str]:
+    """Reads the api keys, ip addresses and trusted proxies allowlists from their file
+
+    The allowlists file takes the same variables as the environment.
+
+    Returns:
+        typing.Tuple[str, str, str, str]: The allowed api keys, the allowed ip
+        addresses, the trusted proxies and the api keys metadata
+    """
+    values = dotenv_values(environment.allowlists_file)
+    return (
+        values.get(constants.AUTH_ALLOWED_API_KEYS_ENV_NAME) or constants.EMPTY_VALUE,
+        values.get(constants.AUTH_ALLOWED_IP_ADDRESSES_ENV_NAME) or constants.EMPTY_VALUE,
+        values.get(constants.AUTH_TRUSTED_PROXIES_ENV_NAME) or constants.EMPTY_VALUE,
+        values.get(constants.AUTH_API_KEYS_ENV_NAME) or constants.EMPTY_VALUE,
+    )
+
+
+def reload_allowlists() -> bool:
+    """Reloads the allowlists, keeping the current ones when the file is unreadable
+
+    The new values are parsed here and swapped in as a whole, without
+    restarting the workers.
+
+    Returns:
+        bool: True when the allowlists were reloaded
+    """
+    if not environment.allowlists_file:
+        return False
+    try:
+        source = read_allowlists_source()
+    except OSError:
+        return False
+    helpers.set_allowlists(helpers.parse_allowlists(source))
+    return True
+
+
+def handle_reload_signal(signum: int, frame: typing.Any) -> None:  # pylint: disable=W0613
+    """Reloads the allowlists on the reload signal
+
+    Args:
+        signum (int): The signal number
+        frame (typing.Any): The interrupted stack frame
+    """
+    reload_allowlists()
+
+
+def install_reload_signal_handler() -> bool:
+    """Reloads the allowlists on SIGHUP where the platform supports it
+
+    Returns:
+        bool: True when the handler was installed
+    """
+    if not hasattr(signal, "SIGHUP"):
+        return False
+    try:
+        signal.signal(signal.SIGHUP, handle_reload_signal)
+    except ValueError:
+        return False
+    return True
+
+
+def get_file_mtime(path: str) -> typing.Optional[float]:
+    """Gets the modification time of a file
+
+    Args:
+        path (str): The file path
+
+    Returns:
+        typing.Optional[float]: The modification time or None when it is missing
+    """
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def watch_allowlists_file(path: str, mtime: typing.Optional[float]) -> None:
+    """Reloads the allowlists every time the allowlists file changes
+
+    Args:
+        path (str): The allowlists file path
+        mtime (typing.Optional[float]): The modification time of the loaded file
+    """
+    while not watcher_stop.wait(environment.allowlists_watch_interval):
+        current_mtime = get_file_mtime(path)
+        if current_mtime is not None and current_mtime != mtime:
+            mtime = current_mtime
+            reload_allowlists()
+
+
+def start_watching() -> typing.Optional[threading.Thread]:
+    """Starts watching the allowlists file when one is configured
+
+    Returns:
+        typing.Optional[threading.Thread]: The watcher thread
+    """
+    if not environment.allowlists_file or environment.allowlists_watch_interval <= 0:
+        return None
+    watcher_stop.clear()
+    path = environment.allowlists_file
+    watcher = threading.Thread(
+        target=watch_allowlists_file,
+        args=(path, get_file_mtime(path)),
+        name="allowlists-watcher",
+        daemon=True,
+    )
+    watcher.start()
+    return watcher
+
+
+def start_reload() -> bool:
+    """Loads the allowlists file and reloads it on SIGHUP or when it changes
+
+    The process environment cannot change from the outside, so nothing is
+    reloaded without an allowlists file.
+
+    Returns:
+        bool: True when the allowlists file is configured
+    """
+    if not environment.allowlists_file:
+        logger.info(
+            "Allowlists reload unavailable, %s is not set",
+            constants.AUTH_ALLOWLISTS_FILE_ENV_NAME,
+        )
+        return False
+    reload_allowlists()
+    install_reload_signal_handler()
+    start_watching()
+    return True
+
+
+def stop_watching() -> None:
+    """Stops watching the allowlists file"""
+    watcher_stop.set()
@@ -0,0 +1,132 @@
+"""Allowlists hot reload tests
+"""
+
+import os
+import signal
+import tempfile
+import time
+import unittest
+from unittest.mock import Mock, patch
+from app import allowlists, helpers, ip_ranges
+from app.api_keys import get_digest
+
+
+class AllowlistsTest(unittest.TestCase):
+    """Allowlists hot reload tests"""
+
+    def setUp(self):
+        allowlists.watcher_stop.clear()
+        self.addCleanup(helpers.set_allowlists, None)
+
+    def tearDown(self):
+        allowlists.stop_watching()
+
+    def write_file(self, content: str) -> str:
+        """Writes a temporary allowlists file"""
+        with tempfile.NamedTemporaryFile(
+            "w", suffix=".env", delete=False
+        ) as allowlists_file:
+            allowlists_file.write(content)
+        self.addCleanup(os.remove, allowlists_file.name)
+        return allowlists_file.name
+
+    def test_reload_allowlists_from_file(self):
+        """reload_allowlists: It swaps the allowlists with the file ones"""
+        path = self.write_file(
+            "AUTH_ALLOWED_API_KEYS=key-1,key-2\nAUTH_ALLOWED_IP_ADDRESSES=10.0.0.1\n"
+            "AUTH_TRUSTED_PROXIES=10.1.0.0/16\n"
+        )
+        environment = Mock(allowlists_file=path)
+        with patch("app.allowlists.environment", environment):
+            self.assertTrue(allowlists.reload_allowlists())
+        reloaded = helpers.get_allowlists()
+        self.assertEqual(reloaded.source, ("key-1,key-2", "10.0.0.1", "10.1.0.0/16", ""))
+        self.assertEqual(
+            set(reloaded.api_keys), {get_digest("key-1"), get_digest("key-2")}
+        )
+        self.assertEqual(reloaded.ip_addresses, frozenset({"10.0.0.1"}))
+        self.assertTrue(
+            reloaded.trusted_proxies.contains(ip_ranges.parse_ip_address("10.1.2.3"))
+        )
+
+    def test_reload_allowlists_without_file(self):
+        """reload_allowlists: It reloads nothing without allowlists file"""
+        with patch("app.allowlists.environment", Mock(allowlists_file=None)):
+            self.assertFalse(allowlists.reload_allowlists())
+        self.assertIsNone(helpers.reloaded_allowlists)
+
+    def test_reload_allowlists_unreadable_file(self):
+        """reload_allowlists: It keeps the current allowlists when the file is unreadable"""
+        current = helpers.parse_allowlists(("key-1", "", "", ""))
+        helpers.set_allowlists(current)
+        environment = Mock(allowlists_file="/missing/allowlists.env")
+        with patch("app.allowlists.environment", environment), patch(
+            "app.allowlists.dotenv_values", side_effect=OSError
+        ):
+            self.assertFalse(allowlists.reload_allowlists())
+        self.assertIs(helpers.get_allowlists(), current)
+
+    @unittest.skipUnless(hasattr(signal, "SIGHUP"), "SIGHUP is not supported")
+    def test_install_reload_signal_handler(self):
+        """install_reload_signal_handler: It reloads the allowlists on SIGHUP"""
+        previous = signal.getsignal(signal.SIGHUP)
+        self.addCleanup(signal.signal, signal.SIGHUP, previous)
+        with patch("app.allowlists.reload_allowlists") as reload_mock:
+            self.assertTrue(allowlists.install_reload_signal_handler())
+            os.kill(os.getpid(), signal.SIGHUP)
+        reload_mock.assert_called_once_with()
+
+    def test_start_reload_without_file(self):
+        """start_reload: It logs that the allowlists cannot be reloaded without file"""
+        with patch("app.allowlists.environment", Mock(allowlists_file=None)), patch(
+            "app.allowlists.install_reload_signal_handler"
+        ) as install_mock, self.assertLogs("app.allowlists", level="INFO") as logs:
+            self.assertFalse(allowlists.start_reload())
+        install_mock.assert_not_called()
+        self.assertIn("AUTH_ALLOWLISTS_FILE", logs.output[0])
+
+    def test_start_reload(self):
+        """start_reload: It loads the allowlists file and reloads it on SIGHUP"""
+        path = self.write_file("AUTH_ALLOWED_API_KEYS=key-1\n")
+        environment = Mock(allowlists_file=path, allowlists_watch_interval=0)
+        with patch("app.allowlists.environment", environment), patch(
+            "app.allowlists.install_reload_signal_handler"
+        ) as install_mock:
+            self.assertTrue(allowlists.start_reload())
+        install_mock.assert_called_once_with()
+        self.assertEqual(helpers.get_allowlists().source[0], "key-1")
+
+    def test_start_watching_disabled(self):
+        """start_watching: It does not watch without allowlists file or interval"""
+        with patch("app.allowlists.environment", Mock(allowlists_file=None)):
+            self.assertIsNone(allowlists.start_watching())
+        with patch(
+            "app.allowlists.environment",
+            Mock(allowlists_file="allowlists.env", allowlists_watch_interval=0),
+        ):
+            self.assertIsNone(allowlists.start_watching())
+
+    def test_start_watching_file_changes(self):
+        """start_watching: It reloads the allowlists when the file changes"""
+        path = self.write_file("AUTH_ALLOWED_API_KEYS=key-1\n")
+        environment = Mock(allowlists_file=path, allowlists_watch_interval=0.01)
+        with patch("app.allowlists.environment", environment):
+            watcher = allowlists.start_watching()
+            modified_at = os.stat(path).st_mtime + 1
+            with open(path, "w", encoding="utf-8") as allowlists_file:
+                allowlists_file.write("AUTH_ALLOWED_API_KEYS=key-2\n")
+            os.utime(path, (modified_at, modified_at))
+            deadline = time.monotonic() + 2
+            while (
+                helpers.reloaded_allowlists is None
+                or helpers.reloaded_allowlists.source[0] != "key-2"
+            ):
+                self.assertLess(time.monotonic(), deadline)
+                time.sleep(0.01)
+            allowlists.stop_watching()
+            watcher.join(1)
+        self.assertFalse(watcher.is_alive())
+
+
+if __name__ == "__main__":
+    unittest.main()
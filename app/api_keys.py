@@ -0,0 +1,174 @@
+"""API keys digests and metadata
+"""
+
+import hashlib
+import hmac
+import json
+import string
+import typing
+from . import constants
+
+
+DIGEST_LENGTH = hashlib.sha256().digest_size * 2
+HEX_DIGITS = frozenset(string.hexdigits)
+
+
+class ApiKey(typing.NamedTuple):
+    """Digest and metadata of an allowed api key"""
+
+    digest: str
+    owner: typing.Optional[str] = None
+    applications: typing.Optional[typing.FrozenSet[str]] = None
+    rate_limit: typing.Optional[float] = None
+    profiling: bool = False
+
+    def allows_application(self, application: typing.Optional[str]) -> bool:
+        """Checks if the key can be used for an application
+
+        Args:
+            application (typing.Optional[str]): The application in context
+
+        Returns:
+            bool: True when the key is not restricted to other applications
+        """
+        return (
+            application is None
+            or self.applications is None
+            or application in self.applications  # pylint: disable=E1135
+        )
+
+
+def get_digest(api_key: str) -> str:
+    """Gets the digest an api key is stored and looked up by
+
+    Args:
+        api_key (str): The api key
+
+    Returns:
+        str: The prefixed SHA-256 hex digest of the key
+    """
+    digest = hashlib.sha256(api_key.encode()).hexdigest()
+    return f"{constants.API_KEY_DIGEST_PREFIX}{digest}"
+
+
+def parse_digest(value: typing.Any) -> typing.Optional[str]:
+    """Parses a prefixed SHA-256 hex digest
+
+    Args:
+        value (typing.Any): The digest
+
+    Returns:
+        typing.Optional[str]: The normalized digest or None when it is not a valid one
+    """
+    prefix = constants.API_KEY_DIGEST_PREFIX
+    if not isinstance(value, str) or not value.startswith(prefix):
+        return None
+    digest = value[len(prefix) :].lower()
+    if len(digest) != DIGEST_LENGTH or not HEX_DIGITS.issuperset(digest):
+        return None
+    return f"{prefix}{digest}"
+
+
+def parse_allowed_api_key(value: str) -> ApiKey:
+    """Parses an entry of the allowed api keys, either a digest or a plain key
+
+    Args:
+        value (str): The allowed api key entry
+
+    Returns:
+        ApiKey: The api key without metadata
+    """
+    return ApiKey(digest=parse_digest(value) or get_digest(value))
+
+
+def parse_api_key_metadata(entry: typing.Any) -> typing.Optional[ApiKey]:
+    """Parses the digest and metadata of an api key
+
+    Args:
+        entry (typing.Any): The api key entry
+
+    Returns:
+        typing.Optional[ApiKey]: The api key or None when the entry is not a valid one
+    """
+    if not isinstance(entry, dict):
+        return None
+    digest = parse_digest(entry.get("digest"))
+    applications = entry.get("applications")
+    rate_limit = entry.get("rateLimit")
+    profiling = entry.get("profiling", False)
+    if digest is None or not isinstance(applications, (list, type(None))):
+        return None
+    if not isinstance(rate_limit, (int, float, type(None))):
+        return None
+    if not isinstance(profiling, bool):
+        return None
+    return ApiKey(
+        digest=digest,
+        owner=entry.get("owner"),
+        applications=None if applications is None else frozenset(applications),
+        rate_limit=None if rate_limit is None else float(rate_limit),
+        profiling=profiling,
+    )
+
+
+def parse_api_keys_metadata(value: typing.Optional[str]) -> typing.List[ApiKey]:
+    """Parses the JSON list of the api keys digests and metadata
+
+    Invalid entries are skipped, and so is the whole list when it is not
+    valid JSON, so a malformed configuration never grants access.
+
+    Args:
+        value (typing.Optional[str]): The JSON list of the api keys
+
+    Returns:
+        typing.List[ApiKey]: The api keys
+    """
+    if not value:
+        return []
+    try:
+        entries = json.loads(value)
+    except ValueError:
+        return []
+    if not isinstance(entries, list):
+        return []
+    api_keys = (parse_api_key_metadata(entry) for entry in entries)
+    return [api_key for api_key in api_keys if api_key is not None]
+
+
+def build_api_keys_index(
+    api_keys: typing.Iterable[ApiKey],
+) -> typing.Dict[str, ApiKey]:
+    """Indexes the api keys by digest, the later entries winning
+
+    Args:
+        api_keys (typing.Iterable[ApiKey]): The api keys
+
+    Returns:
+        typing.Dict[str, ApiKey]: The api keys by digest
+    """
+    return {api_key.digest: api_key for api_key in api_keys}
+
+
+def find_api_key(
+    index: typing.Dict[str, ApiKey], api_key: typing.Optional[str]
+) -> typing.Optional[ApiKey]:
+    """Finds the digest and metadata of an api key
+
+    The key is looked up by its digest, so the lookup time depends neither on
+    the number of keys nor on how much of a guessed key is right, and the
+    digests are compared in constant time.
+
+    Args:
+        index (typing.Dict[str, ApiKey]): The api keys by digest
+        api_key (typing.Optional[str]): The api key
+
+    Returns:
+        typing.Optional[ApiKey]: The api key or None when it is not an allowed one
+    """
+    if api_key is None:
+        return None
+    digest = get_digest(api_key)
+    found = index.get(digest)
+    if found is None or not hmac.compare_digest(found.digest, digest):
+        return None
+    return found
@@ -0,0 +1,87 @@
+"""API keys tests
+"""
+
+import json
+import unittest
+from app.api_keys import (
+    ApiKey,
+    build_api_keys_index,
+    find_api_key,
+    get_digest,
+    parse_allowed_api_key,
+    parse_api_keys_metadata,
+    parse_digest,
+)
+
+
+DIGEST = "sha256:" + "a" * 64
+
+
+class ApiKeysTest(unittest.TestCase):
+    """API keys tests"""
+
+    def test_parse_digest(self):
+        """parse_digest: It normalizes valid digests only"""
+        self.assertEqual(parse_digest("sha256:" + "A" * 64), DIGEST)
+        for value in ["sha256:" + "a" * 63, "sha256:" + "g" * 64, "a" * 64, None]:
+            self.assertIsNone(parse_digest(value))
+
+    def test_parse_allowed_api_key(self):
+        """parse_allowed_api_key: It keeps digests and hashes plain keys"""
+        self.assertEqual(parse_allowed_api_key(DIGEST), ApiKey(digest=DIGEST))
+        self.assertEqual(
+            parse_allowed_api_key("test-key"), ApiKey(digest=get_digest("test-key"))
+        )
+
+    def test_parse_api_keys_metadata(self):
+        """parse_api_keys_metadata: It parses the valid entries only"""
+        value = json.dumps(
+            [
+                {
+                    "digest": DIGEST,
+                    "owner": "test-owner",
+                    "applications": ["app-1", "app-2"],
+                    "rateLimit": 5,
+                    "profiling": True,
+                },
+                {"digest": "not-a-digest"},
+                {"digest": DIGEST, "rateLimit": "fast"},
+                {"digest": DIGEST, "profiling": "yes"},
+                "not-an-entry",
+            ]
+        )
+        self.assertEqual(
+            parse_api_keys_metadata(value),
+            [
+                ApiKey(
+                    digest=DIGEST,
+                    owner="test-owner",
+                    applications=frozenset({"app-1", "app-2"}),
+                    rate_limit=5.0,
+                    profiling=True,
+                )
+            ],
+        )
+        for value in ["", "not-json", "{}"]:
+            self.assertEqual(parse_api_keys_metadata(value), [])
+
+    def test_find_api_key(self):
+        """find_api_key: It finds the keys by the digest of the plain key"""
+        api_key = ApiKey(digest=get_digest("test-key"), owner="test-owner")
+        index = build_api_keys_index([ApiKey(digest=api_key.digest), api_key])
+        self.assertEqual(find_api_key(index, "test-key"), api_key)
+        self.assertIsNone(find_api_key(index, api_key.digest))
+        self.assertIsNone(find_api_key(index, "other-key"))
+        self.assertIsNone(find_api_key(index, None))
+
+    def test_allows_application(self):
+        """ApiKey: It restricts the applications of the key when listed"""
+        self.assertTrue(ApiKey(digest=DIGEST).allows_application("app-1"))
+        api_key = ApiKey(digest=DIGEST, applications=frozenset({"app-1"}))
+        self.assertTrue(api_key.allows_application("app-1"))
+        self.assertTrue(api_key.allows_application(None))
+        self.assertFalse(api_key.allows_application("app-2"))
+
+
+if __name__ == "__main__":
+    unittest.main()
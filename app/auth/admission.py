@@ -0,0 +1,116 @@
+"""Priority admission control of the auth routes
+"""
+
+import threading
+import time
+import typing
+from .. import environment
+from .. import exceptions
+from .. import metrics
+from . import constants as auth_consts
+from . import timeouts
+
+
+class AdmissionController:
+    """Admission of the requests by route priority under overload
+
+    The controller tracks the requests in flight and a moving average of how
+    long requests wait between their arrival and their admission. Each
+    priority is admitted up to its share of the in flight limit and multiple
+    of the queue delay target, so the sheddable routes are rejected first and
+    the critical ones last.
+    """
+
+    def __init__(self):
+        self.in_flight = 0
+        self.queue_delay = 0.0
+        self.lock = threading.Lock()
+
+    def record_queue_delay(self, delay: float) -> None:
+        """Adds the queue delay of a request to the moving average
+
+        Args:
+            delay (float): The seconds the request waited before its admission
+        """
+        with self.lock:
+            self.queue_delay += auth_consts.ADMISSION_QUEUE_DELAY_SMOOTHING * (
+                delay - self.queue_delay
+            )
+
+    def try_admit(self, priority: str) -> bool:
+        """Admits a request when the load allows its priority
+
+        Args:
+            priority (str): The route priority
+
+        Returns:
+            bool: True when the request is admitted
+        """
+        in_flight_ratio, delay_ratio = auth_consts.ADMISSION_THRESHOLDS[priority]
+        with self.lock:
+            if self.in_flight >= environment.admission_max_in_flight * in_flight_ratio:
+                return False
+            if self.queue_delay > environment.admission_queue_delay_target * delay_ratio:
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self) -> None:
+        """Gives back the slot of a finished request"""
+        with self.lock:
+            self.in_flight -= 1
+
+
+admission_controller = AdmissionController()
+metrics.CallbackGauge(
+    "qms_iam_admitted_requests_in_flight",
+    "Requests admitted and not finished yet",
+    lambda: {(): admission_controller.in_flight},
+)
+metrics.CallbackGauge(
+    "qms_iam_queue_delay_seconds",
+    "Moving average of the time the requests wait before their admission",
+    lambda: {(): admission_controller.queue_delay},
+)
+
+
+def get_queue_delay() -> float:
+    """Gets how long the request in context waited since its arrival
+
+    Returns:
+        float: The seconds since the request arrived
+    """
+    started_at = timeouts.request_started_at.get()
+    if started_at is None:
+        return 0.0
+    return max(0.0, time.monotonic() - started_at)
+
+
+def admit(operation_id: str) -> typing.Callable:
+    """Creates the admission dependency of a route
+
+    Args:
+        operation_id (str): The route operation id
+
+    Returns:
+        typing.Callable: The admission dependency
+    """
+    priority = auth_consts.ROUTE_PRIORITIES.get(
+        operation_id, auth_consts.NORMAL_PRIORITY
+    )
+
+    async def admit_request() -> typing.AsyncIterator[None]:
+        """Admits the request for the time it is in flight
+
+        Raises:
+            HTTPException: Service unavailable error when the request is shed
+        """
+        admission_controller.record_queue_delay(get_queue_delay())
+        if not admission_controller.try_admit(priority):
+            raise exceptions.SERVICE_UNAVAILABLE_ERROR
+        try:
+            yield
+        finally:
+            admission_controller.release()
+
+    return admit_request
@@ -0,0 +1,99 @@
+"""Priority admission control tests
+"""
+
+import asyncio
+import time
+import unittest
+from unittest.mock import Mock, patch
+from fastapi import HTTPException, status
+from . import constants as auth_consts
+from . import timeouts
+from .admission import AdmissionController, admit, get_queue_delay
+
+
+mock_environment = Mock(admission_max_in_flight=10, admission_queue_delay_target=0.1)
+
+
+@patch("app.auth.admission.environment", mock_environment)
+class AdmissionControllerTest(unittest.TestCase):
+    """Admission controller tests"""
+
+    def test_try_admit_in_flight(self):
+        """AdmissionController: It sheds the lower priorities first as requests pile up"""
+        controller = AdmissionController()
+        admitted = {
+            priority: controller.try_admit(priority)
+            for priority in [
+                auth_consts.SHEDDABLE_PRIORITY,
+                auth_consts.NORMAL_PRIORITY,
+                auth_consts.CRITICAL_PRIORITY,
+            ]
+        }
+        self.assertTrue(all(admitted.values()))
+
+        controller.in_flight = 5
+        self.assertFalse(controller.try_admit(auth_consts.SHEDDABLE_PRIORITY))
+        self.assertTrue(controller.try_admit(auth_consts.NORMAL_PRIORITY))
+        controller.in_flight = 8
+        self.assertFalse(controller.try_admit(auth_consts.NORMAL_PRIORITY))
+        self.assertTrue(controller.try_admit(auth_consts.CRITICAL_PRIORITY))
+        controller.in_flight = 10
+        self.assertFalse(controller.try_admit(auth_consts.CRITICAL_PRIORITY))
+
+    def test_try_admit_queue_delay(self):
+        """AdmissionController: It sheds the lower priorities first as requests wait"""
+        controller = AdmissionController()
+        controller.queue_delay = 0.15
+        self.assertFalse(controller.try_admit(auth_consts.SHEDDABLE_PRIORITY))
+        self.assertTrue(controller.try_admit(auth_consts.NORMAL_PRIORITY))
+        controller.queue_delay = 0.5
+        self.assertFalse(controller.try_admit(auth_consts.NORMAL_PRIORITY))
+        self.assertTrue(controller.try_admit(auth_consts.CRITICAL_PRIORITY))
+        self.assertEqual(controller.in_flight, 2)
+
+    def test_record_queue_delay(self):
+        """AdmissionController: It smooths the queue delays"""
+        controller = AdmissionController()
+        controller.record_queue_delay(1.0)
+        self.assertAlmostEqual(controller.queue_delay, 0.2)
+        for _ in range(50):
+            controller.record_queue_delay(0.0)
+        self.assertLess(controller.queue_delay, 0.001)
+
+
+class AdmitTest(unittest.IsolatedAsyncioTestCase):
+    """Admission dependency tests"""
+
+    def test_get_queue_delay(self):
+        """get_queue_delay: It gets the time since the request arrived"""
+        self.assertEqual(get_queue_delay(), 0.0)
+        token = timeouts.request_started_at.set(time.monotonic() - 2)
+        try:
+            self.assertGreaterEqual(get_queue_delay(), 2)
+        finally:
+            timeouts.request_started_at.reset(token)
+
+    @patch("app.auth.admission.environment", mock_environment)
+    async def test_admit(self):
+        """admit: It holds a slot while the request is in flight and sheds the rest"""
+        controller = AdmissionController()
+        with patch("app.auth.admission.admission_controller", controller):
+            dependency = admit(auth_consts.SEND_RESET_PASSWORD_EMAIL)
+            admissions = [dependency() for _ in range(5)]
+            await asyncio.gather(*[admission.asend(None) for admission in admissions])
+            self.assertEqual(controller.in_flight, 5)
+
+            with self.assertRaises(HTTPException) as context:
+                await dependency().asend(None)
+            self.assertEqual(
+                context.exception.status_code, status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+            await admit(auth_consts.VALIDATE_ACCESS_TOKEN_OPERATION_ID)().asend(None)
+
+            for admission in admissions:
+                await admission.aclose()
+            self.assertEqual(controller.in_flight, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
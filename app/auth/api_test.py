@@ -7,23 +7,14 @@ from urllib.parse import urlencode
 from app.constants import (
     FORM_URL_ENCODED,
     JSON_CONTENT_TYPE,
-    TIMEOUT,
-    DEVICE_TOKEN_GRANT_TYPE,
-    REFRESH_TOKEN_GRANT_TYPE,
     PASSWORD_GRANT_TYPE,
     CLIENT_CREDENTIALS_GRANT_TYPE,
 )
 from .api import (
     auth_device,
-    get_auth_tokens,
-    token_instrospect,
-    get_new_access_token,
     get_auth_tokens_for_credentials,
     register_new_user,
     login_user,
-    logout,
-    send_reset_password_email,
-    get_users_by_email,
 )
 from . import models
 from . import constants as paths
@@ -32,8 +23,10 @@ from . import constants as paths
 BASE_URL = "http://base-url.test"
 
 mock_environment = Mock(auth_api_base_url=BASE_URL)
+TIMEOUT = (3, 10)
 
 
+@patch("app.auth.api.timeouts.get_timeout", Mock(return_value=TIMEOUT))
 class AuthAPITest(unittest.TestCase):
     """Auth API functions tests"""
 
@@ -44,13 +37,14 @@ class AuthAPITest(unittest.TestCase):
         self.base_admin_path = f"{BASE_URL}/admin/realms/{self.realm}"
         self.common_headers = {"Content-Type": FORM_URL_ENCODED}
 
-    @patch("app.auth.api.requests.post")
+    @patch("app.auth.api.client.get_session")
     @patch(
         "app.auth.api.environment",
         mock_environment,
     )
-    def test_auth_device(self, post_mock):
+    def test_auth_device(self, get_session_mock):
         """auth_device: It can authorize a device against the external auth service as expected"""
+        post_mock = get_session_mock.return_value.post
         post_mock.return_value = Mock(status_code=200)
         data = models.AuthorizeDevicePayload(
             clientId="test-client-id",
@@ -72,100 +66,14 @@ class AuthAPITest(unittest.TestCase):
             timeout=TIMEOUT,
         )
 
-    @patch("app.auth.api.requests.post")
+    @patch("app.auth.api.client.get_session")
     @patch(
         "app.auth.api.environment",
         mock_environment,
     )
-    def test_get_auth_tokens(self, post_mock):
-        """get_auth_tokens: It can get auth tokens from the external auth service as expected"""
-        post_mock.return_value = Mock(status_code=200)
-        data = models.GetTokensPayload(
-            clientId="test-client-id",
-            clientSecret="test-client-secret",
-            deviceCode="test-device-code",
-        )
-        response = get_auth_tokens(self.realm, data)
-        self.assertEqual(response, post_mock.return_value)
-        post_mock.assert_called_with(
-            f"{self.base_path}{paths.AUTH_TOKENS_PATH}",
-            headers=self.common_headers,
-            data=urlencode(
-                {
-                    "device_code": data.deviceCode,
-                    "grant_type": DEVICE_TOKEN_GRANT_TYPE,
-                    "client_id": data.clientId,
-                    "client_secret": data.clientSecret,
-                }
-            ),
-            timeout=TIMEOUT,
-        )
-
-    @patch("app.auth.api.requests.post")
-    @patch(
-        "app.auth.api.environment",
-        mock_environment,
-    )
-    def test_token_instrospect(self, post_mock):
-        """token_instrospect: It can get token info from the auth service as expected"""
-        post_mock.return_value = Mock(status_code=200)
-        data = models.ValidateAccessTokenPayload(
-            clientId="test-client-id",
-            clientSecret="test-client-secret",
-            expectedScope="test-scope",
-        )
-        token_mock = "test-token"
-        response = token_instrospect(self.realm, token_mock, data)
-        self.assertEqual(response, post_mock.return_value)
-        post_mock.assert_called_with(
-            f"{self.base_path}{paths.INSTROSPECT_PATH}",
-            headers=self.common_headers,
-            data=urlencode(
-                {
-                    "token": token_mock,
-                    "client_id": data.clientId,
-                    "client_secret": data.clientSecret,
-                }
-            ),
-            timeout=TIMEOUT,
-        )
-
-    @patch("app.auth.api.requests.post")
-    @patch(
-        "app.auth.api.environment",
-        mock_environment,
-    )
-    def test_get_new_access_token(self, post_mock):
-        """get_new_access_token: It can get a new token from the auth service as expected"""
-        post_mock.return_value = Mock(status_code=200)
-        data = models.GetNewAccessTokenPayload(
-            clientId="test-client-id",
-            clientSecret="test-client-secret",
-            refreshToken="test-refresh-token",
-        )
-        response = get_new_access_token(self.realm, data)
-        self.assertEqual(response, post_mock.return_value)
-        post_mock.assert_called_with(
-            f"{self.base_path}{paths.AUTH_TOKENS_PATH}",
-            headers=self.common_headers,
-            data=urlencode(
-                {
-                    "refresh_token": data.refreshToken,
-                    "grant_type": REFRESH_TOKEN_GRANT_TYPE,
-                    "client_id": data.clientId,
-                    "client_secret": data.clientSecret,
-                }
-            ),
-            timeout=TIMEOUT,
-        )
-
-    @patch("app.auth.api.requests.post")
-    @patch(
-        "app.auth.api.environment",
-        mock_environment,
-    )
-    def test_get_auth_tokens_for_credentials(self, post_mock):
+    def test_get_auth_tokens_for_credentials(self, get_session_mock):
         """get_auth_tokens_for_credentials: It can get an auth token for credentials"""
+        post_mock = get_session_mock.return_value.post
         post_mock.return_value = Mock(status_code=200)
         data = models.GetTokensForCredentialsPayload(
             clientId="test-client-id",
@@ -188,13 +96,14 @@ class AuthAPITest(unittest.TestCase):
             timeout=TIMEOUT,
         )
 
-    @patch("app.auth.api.requests.post")
+    @patch("app.auth.api.client.get_session")
     @patch(
         "app.auth.api.environment",
         mock_environment,
     )
-    def test_register_new_user(self, post_mock):
+    def test_register_new_user(self, get_session_mock):
         """register_new_user: It can register a new user"""
+        post_mock = get_session_mock.return_value.post
         post_mock.return_value = Mock(status_code=200)
         data = models.RegisterUserPayload(
             username="test-user-name",
@@ -222,13 +131,14 @@ class AuthAPITest(unittest.TestCase):
             timeout=TIMEOUT,
         )
 
-    @patch("app.auth.api.requests.post")
+    @patch("app.auth.api.client.get_session")
     @patch(
         "app.auth.api.environment",
         mock_environment,
     )
-    def test_login_user(self, post_mock):
+    def test_login_user(self, get_session_mock):
         """login_user: It can login an user"""
+        post_mock = get_session_mock.return_value.post
         post_mock.return_value = Mock(status_code=200)
         data = models.LoginUserPayload(
             clientId="test-client-id",
@@ -255,66 +165,5 @@ class AuthAPITest(unittest.TestCase):
             timeout=TIMEOUT,
         )
 
-    @patch("app.auth.api.requests.post")
-    @patch(
-        "app.auth.api.environment",
-        mock_environment,
-    )
-    def test_logout(self, post_mock):
-        """logout: Logs out an existing user"""
-        post_mock.return_value = Mock(status_code=200)
-        user_id = "test-user-id"
-        response = logout(self.realm, self.authorization, user_id)
-        self.assertEqual(response, post_mock.return_value)
-        post_mock.assert_called_with(
-            f"{self.base_admin_path}{paths.AUTH_USERS_PATH}/{user_id}{paths.AUTH_LOGOUT_PATH}",
-            headers={
-                "Content-Type": JSON_CONTENT_TYPE,
-                "Authorization": self.authorization,
-            },
-            timeout=TIMEOUT,
-        )
-
-    @patch("app.auth.api.requests.put")
-    @patch(
-        "app.auth.api.environment",
-        mock_environment,
-    )
-    def test_send_reset_password_email(self, put_mock):
-        """send_reset_password_email: Sends an email to reset the user password"""
-        put_mock.return_value = Mock(status_code=200)
-        user_id = "test-user-id"
-        response = send_reset_password_email(self.realm, self.authorization, user_id)
-        self.assertEqual(response, put_mock.return_value)
-        base = f"{self.base_admin_path}{paths.AUTH_USERS_PATH}/{user_id}"
-        put_mock.assert_called_with(
-            f"{base}{paths.AUTH_RESET_PASSWORD_EMAIL}",
-            headers={
-                "Content-Type": JSON_CONTENT_TYPE,
-                "Authorization": self.authorization,
-            },
-            timeout=TIMEOUT,
-        )
-
-    @patch("app.auth.api.requests.get")
-    @patch(
-        "app.auth.api.environment",
-        mock_environment,
-    )
-    def test_get_users_by_email(self, get_mock):
-        """get_users_by_email: Gets users by email"""
-        get_mock.return_value = Mock(status_code=200)
-        email = "test-user@test.com"
-        response = get_users_by_email(self.realm, self.authorization, email)
-        self.assertEqual(response, get_mock.return_value)
-        get_mock.assert_called_with(
-            f"{self.base_admin_path}{paths.AUTH_USERS_PATH}?email={email}",
-            headers={
-                "Content-Type": JSON_CONTENT_TYPE,
-                "Authorization": self.authorization,
-            },
-            timeout=TIMEOUT,
-        )
-
 if __name__ == "__main__":
     unittest.main()
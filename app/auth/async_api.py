@@ -0,0 +1,232 @@
+"""Auth API asyncio variant
+"""
+
+from urllib.parse import urlencode
+import httpx
+from .. import constants
+from .. import metrics
+from .. import tracing
+from . import circuit_breaker
+from . import client
+from . import models
+from . import retries
+from . import singleflight
+from . import timeouts
+from . import constants as auth_consts
+from .api import common_headers, get_base_path, get_admin_base_path
+
+
+upstream_flights = singleflight.AsyncGroup()
+introspection_latencies = retries.LatencyTracker()
+
+
+@metrics.timed_upstream
+@tracing.traced_upstream
+async def get_auth_tokens(
+    realm: str, payload: models.GetTokensPayload
+) -> httpx.Response:
+    """Gets the authorization tokens for the given device code and realm in context
+
+    Args:
+        realm (str): The realm in context
+        payload (models.GetTokensPayload): The required payload to authorize
+
+    Returns:
+        httpx.Response: The response from the auth API.
+    """
+    url = f"{get_base_path()}{realm}{auth_consts.AUTH_TOKENS_PATH}"
+    payload = urlencode(
+        {
+            "device_code": payload.deviceCode,
+            "grant_type": constants.DEVICE_TOKEN_GRANT_TYPE,
+            "client_id": payload.clientId,
+            "client_secret": payload.clientSecret,
+        }
+    )
+    return await circuit_breaker.async_call(
+        realm,
+        client.get_async_client().post,
+        url,
+        headers=common_headers,
+        content=payload,
+        timeout=timeouts.get_async_timeout(auth_consts.TOKEN_UPSTREAM_OPERATION),
+    )
+
+
+@metrics.timed_upstream
+@tracing.traced_upstream
+async def token_instrospect(
+    realm: str, access_token: str, payload: models.ValidateAccessTokenPayload
+) -> httpx.Response:
+    """Gets information such as scope and active from the given token
+
+    Args:
+        realm (str): The realm in context
+        access_token (str): The token to instrospect
+        payload (models.ValidateAccessTokenPayload): The required payload to intronspect the token
+
+    Returns:
+        httpx.Response: The response from the auth API.
+    """
+    url = f"{get_base_path()}{realm}{auth_consts.INSTROSPECT_PATH}"
+    payload = urlencode(
+        {
+            "token": access_token,
+            "client_id": payload.clientId,
+            "client_secret": payload.clientSecret,
+        }
+    )
+    return await upstream_flights.do(
+        f"{url}?{payload}",
+        retries.async_call,
+        auth_consts.INTROSPECT_UPSTREAM_OPERATION,
+        retries.async_hedged_call,
+        introspection_latencies,
+        circuit_breaker.async_call,
+        realm,
+        client.get_async_client().post,
+        url,
+        headers=common_headers,
+        content=payload,
+    )
+
+
+@metrics.timed_upstream
+@tracing.traced_upstream
+async def get_jwks(realm: str) -> httpx.Response:
+    """Gets the JSON Web Key Set used to sign the tokens of the realm in context
+
+    Args:
+        realm (str): The realm in context
+
+    Returns:
+        httpx.Response: The response from the auth API.
+    """
+    url = f"{get_base_path()}{realm}{auth_consts.JWKS_PATH}"
+    return await upstream_flights.do(
+        url,
+        retries.async_call,
+        auth_consts.INTROSPECT_UPSTREAM_OPERATION,
+        circuit_breaker.async_call,
+        realm,
+        client.get_async_client().get,
+        url,
+    )
+
+
+@metrics.timed_upstream
+@tracing.traced_upstream
+async def get_new_access_token(
+    realm: str, payload: models.GetNewAccessTokenPayload
+) -> httpx.Response:
+    """Gets a new access token
+
+    Args:
+        realm (str): The realm in context
+        payload (models.GetNewAccessTokenPayload): The required payload to get the new access token
+
+    Returns:
+        httpx.Response: The response from the auth API.
+    """
+    url = f"{get_base_path()}{realm}{auth_consts.AUTH_TOKENS_PATH}"
+    payload = urlencode(
+        {
+            "refresh_token": payload.refreshToken,
+            "grant_type": constants.REFRESH_TOKEN_GRANT_TYPE,
+            "client_id": payload.clientId,
+            "client_secret": payload.clientSecret,
+        }
+    )
+    return await circuit_breaker.async_call(
+        realm,
+        client.get_async_client().post,
+        url,
+        headers=common_headers,
+        content=payload,
+        timeout=timeouts.get_async_timeout(auth_consts.TOKEN_UPSTREAM_OPERATION),
+    )
+
+
+@metrics.timed_upstream
+@tracing.traced_upstream
+async def logout(realm: str, authorization: str, user_id: str) -> httpx.Response:
+    """Logs out an existing user
+
+    Args:
+        realm (str): The realm in context
+        authorization (str): Authorization access token
+        user_id (str): The id of the user to log out
+
+    Returns:
+        httpx.Response: The response from the auth API.
+    """
+    base_path = f"{get_admin_base_path()}{realm}{auth_consts.AUTH_USERS_PATH}"
+    url = f"{base_path}/{user_id}{auth_consts.AUTH_LOGOUT_PATH}"
+    return await circuit_breaker.async_call(
+        realm,
+        client.get_async_client().post,
+        url,
+        headers={
+            "Content-Type": constants.JSON_CONTENT_TYPE,
+            "Authorization": authorization,
+        },
+        timeout=timeouts.get_async_timeout(auth_consts.LOGOUT_UPSTREAM_OPERATION),
+    )
+
+
+@metrics.timed_upstream
+@tracing.traced_upstream
+async def send_reset_password_email(
+    realm: str, authorization: str, user_id: str
+) -> httpx.Response:
+    """Sends an email to reset the user password
+
+    Args:
+        realm (str): The realm in context
+        authorization (str): Authorization access token
+        user_id (str): The id of the user to send the reset password email
+
+    Returns:
+        httpx.Response: The response from the auth API.
+    """
+    base_path = f"{get_admin_base_path()}{realm}{auth_consts.AUTH_USERS_PATH}"
+    url = f"{base_path}/{user_id}{auth_consts.AUTH_RESET_PASSWORD_EMAIL}"
+    return await circuit_breaker.async_call(
+        realm,
+        client.get_async_client().put,
+        url,
+        headers={
+            "Content-Type": constants.JSON_CONTENT_TYPE,
+            "Authorization": authorization,
+        },
+        timeout=timeouts.get_async_timeout(auth_consts.RESET_EMAIL_UPSTREAM_OPERATION),
+    )
+
+
+@metrics.timed_upstream
+@tracing.traced_upstream
+async def get_users_by_email(
+    realm: str, authorization: str, email: str
+) -> httpx.Response:
+    """Gets users by email
+
+    Args:
+        realm (str): The realm in context
+        authorization (str): Authorization access token
+        email (str): The email of the user
+
+    Returns:
+        httpx.Response: The response from the auth API.
+    """
+    url = f"{get_admin_base_path()}{realm}{auth_consts.AUTH_USERS_PATH}?email={email}"
+    return await retries.async_call(
+        auth_consts.ADMIN_USERS_UPSTREAM_OPERATION,
+        circuit_breaker.async_call,
+        realm,
+        client.get_async_client().get,
+        url,
+        headers={
+            "Content-Type": constants.JSON_CONTENT_TYPE,
+            "Authorization": authorization,
+        },
+    )
@@ -0,0 +1,180 @@
+"""Auth asyncio API tests
+"""
+
+import unittest
+from unittest.mock import AsyncMock, Mock, patch
+from urllib.parse import urlencode
+from app.constants import (
+    FORM_URL_ENCODED,
+    JSON_CONTENT_TYPE,
+    DEVICE_TOKEN_GRANT_TYPE,
+    REFRESH_TOKEN_GRANT_TYPE,
+)
+from .async_api import (
+    get_auth_tokens,
+    token_instrospect,
+    get_new_access_token,
+    logout,
+    send_reset_password_email,
+    get_users_by_email,
+    get_jwks,
+)
+from . import models
+from . import constants as paths
+
+
+BASE_URL = "http://base-url.test"
+REALM = "test-realm"
+AUTHORIZATION = "test-authorization"
+BASE_PATH = f"{BASE_URL}/realms/{REALM}"
+BASE_ADMIN_PATH = f"{BASE_URL}/admin/realms/{REALM}"
+COMMON_HEADERS = {"Content-Type": FORM_URL_ENCODED}
+ADMIN_HEADERS = {"Content-Type": JSON_CONTENT_TYPE, "Authorization": AUTHORIZATION}
+
+mock_environment = Mock(auth_api_base_url=BASE_URL)
+TIMEOUT = (3, 10)
+
+
+@patch("app.auth.async_api.timeouts.get_async_timeout", Mock(return_value=TIMEOUT))
+@patch("app.auth.api.environment", mock_environment)
+@patch("app.auth.async_api.client.get_async_client")
+class AsyncAuthAPITest(unittest.IsolatedAsyncioTestCase):
+    """Auth asyncio API functions tests"""
+
+    async def test_get_auth_tokens(self, get_async_client_mock):
+        """get_auth_tokens: It can get auth tokens from the external auth service as expected"""
+        post_mock = get_async_client_mock.return_value.post = AsyncMock(
+            return_value=Mock(status_code=200)
+        )
+        data = models.GetTokensPayload(
+            clientId="test-client-id",
+            clientSecret="test-client-secret",
+            deviceCode="test-device-code",
+        )
+        response = await get_auth_tokens(REALM, data)
+        self.assertEqual(response, post_mock.return_value)
+        post_mock.assert_awaited_with(
+            f"{BASE_PATH}{paths.AUTH_TOKENS_PATH}",
+            headers=COMMON_HEADERS,
+            content=urlencode(
+                {
+                    "device_code": data.deviceCode,
+                    "grant_type": DEVICE_TOKEN_GRANT_TYPE,
+                    "client_id": data.clientId,
+                    "client_secret": data.clientSecret,
+                }
+            ),
+            timeout=TIMEOUT,
+        )
+
+    async def test_token_instrospect(self, get_async_client_mock):
+        """token_instrospect: It can get token info from the auth service as expected"""
+        post_mock = get_async_client_mock.return_value.post = AsyncMock(
+            return_value=Mock(status_code=200)
+        )
+        data = models.ValidateAccessTokenPayload(
+            clientId="test-client-id",
+            clientSecret="test-client-secret",
+            expectedScope="test-scope",
+        )
+        response = await token_instrospect(REALM, "test-token", data)
+        self.assertEqual(response, post_mock.return_value)
+        post_mock.assert_awaited_with(
+            f"{BASE_PATH}{paths.INSTROSPECT_PATH}",
+            headers=COMMON_HEADERS,
+            content=urlencode(
+                {
+                    "token": "test-token",
+                    "client_id": data.clientId,
+                    "client_secret": data.clientSecret,
+                }
+            ),
+            timeout=TIMEOUT,
+        )
+
+    async def test_get_new_access_token(self, get_async_client_mock):
+        """get_new_access_token: It can get a new access token from the auth service"""
+        post_mock = get_async_client_mock.return_value.post = AsyncMock(
+            return_value=Mock(status_code=200)
+        )
+        data = models.GetNewAccessTokenPayload(
+            clientId="test-client-id",
+            clientSecret="test-client-secret",
+            refreshToken="test-refresh-token",
+        )
+        response = await get_new_access_token(REALM, data)
+        self.assertEqual(response, post_mock.return_value)
+        post_mock.assert_awaited_with(
+            f"{BASE_PATH}{paths.AUTH_TOKENS_PATH}",
+            headers=COMMON_HEADERS,
+            content=urlencode(
+                {
+                    "refresh_token": data.refreshToken,
+                    "grant_type": REFRESH_TOKEN_GRANT_TYPE,
+                    "client_id": data.clientId,
+                    "client_secret": data.clientSecret,
+                }
+            ),
+            timeout=TIMEOUT,
+        )
+
+    async def test_logout(self, get_async_client_mock):
+        """logout: It can logout an user from the auth service"""
+        post_mock = get_async_client_mock.return_value.post = AsyncMock(
+            return_value=Mock(status_code=204)
+        )
+        response = await logout(REALM, AUTHORIZATION, "test-user-id")
+        self.assertEqual(response, post_mock.return_value)
+        post_mock.assert_awaited_with(
+            f"{BASE_ADMIN_PATH}{paths.AUTH_USERS_PATH}/test-user-id"
+            f"{paths.AUTH_LOGOUT_PATH}",
+            headers=ADMIN_HEADERS,
+            timeout=TIMEOUT,
+        )
+
+    async def test_send_reset_password_email(self, get_async_client_mock):
+        """send_reset_password_email: It can send a reset password email"""
+        put_mock = get_async_client_mock.return_value.put = AsyncMock(
+            return_value=Mock(status_code=204)
+        )
+        response = await send_reset_password_email(
+            REALM, AUTHORIZATION, "test-user-id"
+        )
+        self.assertEqual(response, put_mock.return_value)
+        put_mock.assert_awaited_with(
+            f"{BASE_ADMIN_PATH}{paths.AUTH_USERS_PATH}/test-user-id"
+            f"{paths.AUTH_RESET_PASSWORD_EMAIL}",
+            headers=ADMIN_HEADERS,
+            timeout=TIMEOUT,
+        )
+
+    async def test_get_users_by_email(self, get_async_client_mock):
+        """get_users_by_email: It can get the users matching an email"""
+        get_mock = get_async_client_mock.return_value.get = AsyncMock(
+            return_value=Mock(status_code=200)
+        )
+        response = await get_users_by_email(
+            REALM, AUTHORIZATION, "test@test.com"
+        )
+        self.assertEqual(response, get_mock.return_value)
+        get_mock.assert_awaited_with(
+            f"{BASE_ADMIN_PATH}{paths.AUTH_USERS_PATH}?email=test@test.com",
+            headers=ADMIN_HEADERS,
+            timeout=TIMEOUT,
+        )
+
+    async def test_get_jwks(self, get_async_client_mock):
+        """get_jwks: It can get the signing keys of the realm from the auth service"""
+        get_mock = get_async_client_mock.return_value.get = AsyncMock(
+            return_value=Mock(status_code=200)
+        )
+        response = await get_jwks(REALM)
+        self.assertEqual(response, get_mock.return_value)
+        get_mock.assert_awaited_with(
+            f"{BASE_PATH}{paths.JWKS_PATH}",
+            timeout=TIMEOUT,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,198 @@
+"""Auth API asyncio handlers
+"""
+
+import asyncio
+from fastapi import HTTPException
+from . import models
+from . import async_api
+from . import helpers
+from . import tokens
+from .helpers import handle_error_response
+from .. import constants
+from .. import environment
+from .. import exceptions
+
+
+async def get_auth_tokens(
+    realm: str, payload: models.GetTokensPayload
+) -> models.GetTokensResponse:
+    """Gets the authorization tokens for the given device code and realm in context
+
+    Args:
+        realm (str): The realm in context
+        payload (models.GetTokensPayload): The required payload
+
+    Returns:
+        models.GetTokensResponse: The authorization tokens information
+    """
+    response = await async_api.get_auth_tokens(realm, payload)
+
+    handle_error_response(response)
+
+    return helpers.to_get_tokens_response(response.json())
+
+
+async def get_new_access_token(
+    realm: str, payload: models.GetNewAccessTokenPayload
+) -> models.GetNewAccessTokenResponse:
+    """Gets a new authorization token for the given refresh token and realm in context
+
+    Args:
+        realm (str): The realm in context
+        payload (models.GetNewAccessTokenPayload): The required payload to refresh token
+
+    Returns:
+        models.GetNewAccessTokenResponse: The new access token data
+    """
+    response = await async_api.get_new_access_token(realm, payload)
+
+    handle_error_response(response)
+
+    return helpers.to_get_new_access_token_response(response.json())
+
+
+async def validate_access_token(
+    realm: str, authorization: str, payload: models.ValidateAccessTokenPayload
+) -> models.ValidateAccessTokenResponse:
+    """Validates a token checking if it has not expired and has the required scope
+
+    In the local validation mode signed tokens are verified against the realm
+    signing keys, and only opaque or unknown tokens are instrospected.
+
+    Args:
+        realm (str): The realm in context
+        authorization (str): The authorization access token
+        payload (models.ValidateAccessTokenPayload): The required payload to validate the token
+
+    Raises:
+      HTTPException: Internal server error when something unexpected happens.
+      HTTPException: Service unavailable error when the auth API circuit is open.
+
+    Returns:
+        models.ValidateAccessTokenResponse: The token validation data
+    """
+    access_token = helpers.get_access_token(authorization)
+
+    try:
+        data = None
+        if environment.token_validation_mode == constants.LOCAL_TOKEN_VALIDATION_MODE:
+            data = await tokens.async_verify_access_token(realm, access_token)
+        if data is None:
+            data = await tokens.async_introspect_access_token(realm, access_token, payload)
+        return helpers.to_validate_access_token_response(data, payload.expectedScope)
+    except HTTPException:
+        raise
+    except Exception as exc:
+        raise exceptions.INTERNAL_SERVER_ERROR from exc
+
+
+async def validate_access_tokens_batch(
+    realm: str, payload: models.ValidateAccessTokensBatchPayload
+) -> models.ValidateAccessTokensBatchResponse:
+    """Validates a batch of tokens checking if they have not expired and have the required scope
+
+    Tokens are validated concurrently, with at most the configured number of
+    validations in flight at once.
+
+    Args:
+        realm (str): The realm in context
+        payload (models.ValidateAccessTokensBatchPayload): The tokens to validate
+
+    Raises:
+      HTTPException: Internal server error when something unexpected happens.
+
+    Returns:
+        models.ValidateAccessTokensBatchResponse: The tokens validation data in
+        the same order as the given tokens
+    """
+    semaphore = asyncio.Semaphore(environment.validate_batch_concurrency)
+
+    async def validate(item: models.AccessTokenToValidate):
+        async with semaphore:
+            return await validate_access_token(
+                realm,
+                item.token,
+                models.ValidateAccessTokenPayload(
+                    clientId=payload.clientId,
+                    clientSecret=payload.clientSecret,
+                    expectedScope=item.expectedScope,
+                ),
+            )
+
+    responses = await asyncio.gather(*[validate(item) for item in payload.tokens])
+
+    return models.ValidateAccessTokensBatchResponse(
+        data=[response.data for response in responses]
+    )
+
+
+async def get_user_basic_data(
+    realm: str, authorization: str, payload: models.UserBasicDataPayload
+) -> models.UserBasicDataResponse:
+    """Gets the user basic information
+
+    Args:
+        realm (str): The realm in context
+        authorization (str): The authorization access token
+        payload (models.UserBasicDataPayload): The required payload to get user data
+
+    Returns:
+        models.UserBasicDataResponse: The user data
+    """
+    access_token = helpers.get_access_token(authorization)
+    instrospect_payload = models.ValidateAccessTokenPayload(
+        clientId=payload.clientId,
+        clientSecret=payload.clientSecret,
+        expectedScope="email",
+    )
+    data = await tokens.async_introspect_access_token(
+        realm,
+        access_token,
+        instrospect_payload,
+        check_response=True,
+    )
+
+    return helpers.to_user_basic_data_response(data)
+
+
+async def logout(
+    realm: str, authorization: str, user_id: str
+) -> models.LogoutResponse:
+    """Logs out an existing user
+
+    Args:
+        realm (str): The realm in context
+        authorization (str): Admin authorization access token
+        user_id (str): Id of the user to log out
+
+    Returns:
+        models.LogoutResponse: The response
+    """
+    response = await async_api.logout(realm, authorization, user_id)
+
+    handle_error_response(response)
+
+    return models.LogoutResponse(loggedOut=True)
+
+
+async def send_reset_password_email(
+    realm: str, authorization: str, email: str
+) -> models.SendResetPasswordEmailResponse:
+    """Sends an email to reset the user password
+
+    Args:
+        realm (str): The realm in context
+        authorization (str): Admin authorization access token
+        email (str): Email of the user
+
+    Returns:
+        models.SendResetPasswordEmailResponse: The response
+    """
+    users_response = await async_api.get_users_by_email(realm, authorization, email)
+    users = users_response.json()
+    user_id = users[0].get("id")
+    response = await async_api.send_reset_password_email(realm, authorization, user_id)
+
+    handle_error_response(response)
+
+    return models.SendResetPasswordEmailResponse(emailSent=True)
@@ -0,0 +1,377 @@
+"""API asyncio handlers tests
+"""
+
+import unittest
+from unittest.mock import Mock, patch
+from fastapi import status
+from httpx import Response
+from .async_handlers import (
+    get_auth_tokens,
+    get_new_access_token,
+    validate_access_token,
+    validate_access_tokens_batch,
+    get_user_basic_data,
+    logout,
+    send_reset_password_email,
+)
+from . import models
+from . import tokens
+from .. import exceptions
+
+
+class AsyncHandlersTest(unittest.IsolatedAsyncioTestCase):
+    """Auth asyncio handlers functions tests"""
+
+    def setUp(self):
+        self.realm = "test-realm"
+        self.access_token = "test-access-token"
+        tokens.introspection_cache.clear()
+        tokens.negative_token_cache.clear()
+
+    @patch("app.auth.async_handlers.handle_error_response")
+    @patch("app.auth.async_api.get_auth_tokens")
+    async def test_get_auth_tokens(
+        self, get_auth_tokens_mock, handle_error_response_mock
+    ):
+        """get_auth_tokens: It can retrieve access tokens"""
+        json_data = {
+            "access_token": self.access_token,
+            "refresh_token": "test-refresh-token",
+            "expires_in": 1800,
+            "refresh_expires_in": 3600,
+        }
+        get_auth_tokens_mock.return_value = Mock(
+            spec=Response,
+            status_code=status.HTTP_200_OK,
+            json=Mock(return_value=json_data),
+        )
+        payload = models.GetTokensPayload(
+            clientId="test-client-id",
+            clientSecret="test-client-secret",
+            deviceCode="test-device-code",
+        )
+        response = await get_auth_tokens(self.realm, payload)
+        self.assertEqual(response.data.accessToken, json_data["access_token"])
+        self.assertEqual(response.data.refreshToken, json_data["refresh_token"])
+        self.assertEqual(response.data.expiresIn, json_data["expires_in"])
+        self.assertEqual(
+            response.data.refreshExpiresIn, json_data["refresh_expires_in"]
+        )
+        get_auth_tokens_mock.assert_awaited_with(self.realm, payload)
+        handle_error_response_mock.assert_called_with(get_auth_tokens_mock.return_value)
+
+    @patch("app.auth.async_handlers.handle_error_response")
+    @patch("app.auth.async_api.get_new_access_token")
+    async def test_get_new_access_token(
+        self, get_new_access_token_mock, handle_error_response_mock
+    ):
+        """get_new_access_token: It can get a new access token"""
+        json_data = {
+            "access_token": self.access_token,
+            "expires_in": 1800,
+        }
+        get_new_access_token_mock.return_value = Mock(
+            spec=Response,
+            status_code=status.HTTP_200_OK,
+            json=Mock(return_value=json_data),
+        )
+        payload = models.GetNewAccessTokenPayload(
+            clientId="test-client-id",
+            clientSecret="test-client-secret",
+            refreshToken="test-refresh-token",
+        )
+        response = await get_new_access_token(self.realm, payload)
+
+        self.assertEqual(response.data.accessToken, json_data["access_token"])
+        self.assertEqual(response.data.expiresIn, json_data["expires_in"])
+        get_new_access_token_mock.assert_awaited_with(self.realm, payload)
+        handle_error_response_mock.assert_called_with(
+            get_new_access_token_mock.return_value
+        )
+
+    @patch("app.auth.async_api.token_instrospect")
+    async def test_validate_access_token(self, token_instrospect_mock):
+        """validate_access_token: It is valid and authorized when token is active & has scope"""
+        json_data = {
+            "scope": "first-scope test-scope third-scope",
+            "active": True,
+        }
+        token_instrospect_mock.return_value = Mock(
+            spec=Response,
+            status_code=status.HTTP_200_OK,
+            json=Mock(return_value=json_data),
+        )
+        payload = models.ValidateAccessTokenPayload(
+            clientId="test-client-id",
+            clientSecret="test-client-secret",
+            expectedScope="test-scope",
+        )
+
+        response = await validate_access_token(
+            self.realm, f"Bearer {self.access_token}", payload
+        )
+
+        self.assertEqual(response.data.isValid, True)
+        self.assertEqual(response.data.isAuthorized, True)
+        self.assertEqual(response.data.expectedScope, payload.expectedScope)
+        token_instrospect_mock.assert_awaited_with(
+            self.realm, self.access_token, payload
+        )
+
+    @patch("app.auth.async_api.token_instrospect")
+    async def test_validate_access_token_invalid(self, token_instrospect_mock):
+        """validate_access_token: It returns invalid when token is not active"""
+        token_instrospect_mock.return_value = Mock(
+            spec=Response,
+            status_code=status.HTTP_200_OK,
+            json=Mock(return_value={"scope": "test-scope", "active": False}),
+        )
+        payload = models.ValidateAccessTokenPayload(
+            clientId="test-client-id",
+            clientSecret="test-client-secret",
+            expectedScope="test-scope",
+        )
+
+        response = await validate_access_token(
+            self.realm, f"Bearer {self.access_token}", payload
+        )
+
+        self.assertEqual(response.data.isValid, False)
+        self.assertEqual(response.data.isAuthorized, True)
+
+    @patch("app.auth.async_api.token_instrospect")
+    async def test_validate_access_token_unauthorized(self, token_instrospect_mock):
+        """validate_access_token: It returns unauthorized when the expected scope is not valid"""
+        token_instrospect_mock.return_value = Mock(
+            spec=Response,
+            status_code=status.HTTP_200_OK,
+            json=Mock(return_value={"scope": "test-scope", "active": True}),
+        )
+        payload = models.ValidateAccessTokenPayload(
+            clientId="test-client-id",
+            clientSecret="test-client-secret",
+            expectedScope="unknown-scope",
+        )
+
+        response = await validate_access_token(
+            self.realm, f"Bearer {self.access_token}", payload
+        )
+
+        self.assertEqual(response.data.isValid, True)
+        self.assertEqual(response.data.isAuthorized, False)
+
+    @patch("app.auth.async_api.token_instrospect")
+    async def test_validate_access_token_unexpected_error_handling(
+        self, token_instrospect_mock
+    ):
+        """validate_access_token: It handles unexpected errors properly"""
+        token_instrospect_mock.side_effect = Exception("Unexpected error")
+        payload = models.ValidateAccessTokenPayload(
+            clientId="test-client-id",
+            clientSecret="test-client-secret",
+            expectedScope="unknown-scope",
+        )
+
+        with self.assertRaises(exceptions.INTERNAL_SERVER_ERROR.__class__):
+            await validate_access_token(
+                self.realm, f"Bearer {self.access_token}", payload
+            )
+
+    @patch("app.auth.async_handlers.environment")
+    @patch("app.auth.tokens.async_verify_access_token")
+    @patch("app.auth.async_api.token_instrospect")
+    async def test_validate_access_token_local(
+        self, token_instrospect_mock, verify_access_token_mock, environment_mock
+    ):
+        """validate_access_token: It verifies the token locally in the local validation mode"""
+        environment_mock.token_validation_mode = "local"
+        verify_access_token_mock.return_value = {"active": True, "scope": "test-scope"}
+        payload = models.ValidateAccessTokenPayload(
+            clientId="test-client-id",
+            clientSecret="test-client-secret",
+            expectedScope="test-scope",
+        )
+
+        response = await validate_access_token(
+            self.realm, f"Bearer {self.access_token}", payload
+        )
+
+        self.assertEqual(response.data.isValid, True)
+        self.assertEqual(response.data.isAuthorized, True)
+        verify_access_token_mock.assert_awaited_with(self.realm, self.access_token)
+        token_instrospect_mock.assert_not_awaited()
+
+    @patch("app.auth.async_handlers.environment")
+    @patch("app.auth.tokens.async_verify_access_token")
+    @patch("app.auth.async_api.token_instrospect")
+    async def test_validate_access_token_local_fallback(
+        self, token_instrospect_mock, verify_access_token_mock, environment_mock
+    ):
+        """validate_access_token: It instrospects the tokens that can not be verified locally"""
+        environment_mock.token_validation_mode = "local"
+        verify_access_token_mock.return_value = None
+        token_instrospect_mock.return_value = Mock(
+            spec=Response,
+            status_code=status.HTTP_200_OK,
+            json=Mock(return_value={"active": True, "scope": "test-scope"}),
+        )
+        payload = models.ValidateAccessTokenPayload(
+            clientId="test-client-id",
+            clientSecret="test-client-secret",
+            expectedScope="test-scope",
+        )
+
+        response = await validate_access_token(
+            self.realm, f"Bearer {self.access_token}", payload
+        )
+
+        self.assertEqual(response.data.isValid, True)
+        token_instrospect_mock.assert_awaited_with(
+            self.realm, self.access_token, payload
+        )
+
+    @patch("app.auth.async_handlers.environment")
+    @patch("app.auth.async_api.token_instrospect")
+    async def test_validate_access_tokens_batch(
+        self, token_instrospect_mock, environment_mock
+    ):
+        """validate_access_tokens_batch: It validates every token keeping their order"""
+        environment_mock.validate_batch_concurrency = 2
+        introspected = {
+            "active-token": {"active": True, "scope": "first-scope"},
+            "inactive-token": {"active": False},
+        }
+
+        async def token_instrospect(_realm, access_token, _payload):
+            return Mock(
+                spec=Response,
+                status_code=status.HTTP_200_OK,
+                json=Mock(return_value=introspected[access_token]),
+            )
+
+        token_instrospect_mock.side_effect = token_instrospect
+        payload = models.ValidateAccessTokensBatchPayload(
+            clientId="test-client-id",
+            clientSecret="test-client-secret",
+            tokens=[
+                {"token": "active-token", "expectedScope": "first-scope"},
+                {"token": "inactive-token", "expectedScope": "first-scope"},
+                {"token": "active-token", "expectedScope": "second-scope"},
+            ],
+        )
+
+        response = await validate_access_tokens_batch(self.realm, payload)
+
+        self.assertEqual(
+            [(data.isValid, data.isAuthorized) for data in response.data],
+            [(True, True), (False, False), (True, False)],
+        )
+        self.assertEqual(
+            [data.expectedScope for data in response.data],
+            ["first-scope", "first-scope", "second-scope"],
+        )
+
+    @patch("app.auth.tokens.handle_error_response")
+    @patch("app.auth.async_api.token_instrospect")
+    async def test_get_user_basic_data(
+        self, token_instrospect_mock, handle_error_response_mock
+    ):
+        """get_user_basic_data: It can the user basic data"""
+        json_data = {
+            "sub": "test-user-id",
+            "preferred_username": "test-username",
+            "email": "test-email@test.com",
+            "name": "Test User",
+            "given_name": "Test",
+            "family_name": "User",
+            "active": True,
+            "email_verified": True,
+        }
+        token_instrospect_mock.return_value = Mock(
+            spec=Response,
+            status_code=status.HTTP_200_OK,
+            json=Mock(return_value=json_data),
+        )
+        payload = models.UserBasicDataPayload(
+            clientId="test-client-id",
+            clientSecret="test-client-secret",
+        )
+        response = await get_user_basic_data(self.realm, self.access_token, payload)
+
+        self.assertEqual(response.data.id, json_data["sub"])
+        self.assertEqual(response.data.username, json_data["preferred_username"])
+        self.assertEqual(response.data.email, json_data["email"])
+        self.assertEqual(response.data.active, json_data["active"])
+        handle_error_response_mock.assert_called_with(
+            token_instrospect_mock.return_value
+        )
+
+    @patch("app.auth.async_api.token_instrospect")
+    async def test_get_user_basic_data_inactive(self, token_instrospect_mock):
+        """get_user_basic_data: It fails when the token is not active"""
+        token_instrospect_mock.return_value = Mock(
+            spec=Response,
+            status_code=status.HTTP_200_OK,
+            json=Mock(return_value={"active": False}),
+        )
+        payload = models.UserBasicDataPayload(
+            clientId="test-client-id",
+            clientSecret="test-client-secret",
+        )
+        with self.assertRaises(exceptions.UNAUTHORIZED_ERROR.__class__):
+            await get_user_basic_data(self.realm, self.access_token, payload)
+
+    @patch("app.auth.async_handlers.handle_error_response")
+    @patch("app.auth.async_api.logout")
+    async def test_logout(self, logout_mock, handle_error_response_mock):
+        """logout: It can get logout an user"""
+        logout_mock.return_value = Mock(
+            spec=Response,
+            status_code=status.HTTP_200_OK,
+            json=Mock(return_value={}),
+        )
+        user_id = "test-user_id"
+        response = await logout(self.realm, self.access_token, user_id)
+        self.assertEqual(response.loggedOut, True)
+        logout_mock.assert_awaited_with(self.realm, self.access_token, user_id)
+        handle_error_response_mock.assert_called_with(logout_mock.return_value)
+
+    @patch("app.auth.async_handlers.handle_error_response")
+    @patch("app.auth.async_api.send_reset_password_email")
+    @patch("app.auth.async_api.get_users_by_email")
+    async def test_send_reset_password_email(
+        self,
+        get_users_by_email_mock,
+        send_reset_password_email_mock,
+        handle_error_response_mock,
+    ):
+        """send_reset_password_email: It can send a reset pasword email"""
+        user_id = "test-user-id"
+        email = "test-user@test.com"
+        get_users_by_email_mock.return_value = Mock(
+            spec=Response,
+            status_code=status.HTTP_200_OK,
+            json=Mock(return_value=[{"id": user_id}]),
+        )
+        send_reset_password_email_mock.return_value = Mock(
+            spec=Response,
+            status_code=status.HTTP_200_OK,
+            json=Mock(return_value={}),
+        )
+        response = await send_reset_password_email(
+            self.realm, self.access_token, email
+        )
+        self.assertEqual(response.emailSent, True)
+        get_users_by_email_mock.assert_awaited_with(
+            self.realm, self.access_token, email
+        )
+        send_reset_password_email_mock.assert_awaited_with(
+            self.realm, self.access_token, user_id
+        )
+        handle_error_response_mock.assert_called_with(
+            send_reset_password_email_mock.return_value
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+"""Audit log of the user account operations
+"""
+
+import contextlib
+import datetime
+import json
+import sys
+import time
+import typing
+from starlette.concurrency import run_in_threadpool
+from .. import batch_writer
+from .. import constants
+from .. import environment
+from .. import metrics
+from . import constants as auth_consts
+from . import timeouts
+
+
+def create_writer() -> typing.Optional[batch_writer.BatchWriter]:
+    """Creates the writer of the audit records to the configured file or stdout
+
+    Returns:
+        typing.Optional[batch_writer.BatchWriter]: The writer or None when the
+        audit log is disabled
+    """
+    if not environment.audit_log_file:
+        return None
+    if environment.audit_log_file == constants.STDOUT_LOG_FILE:
+        write_batch = batch_writer.stream_lines(sys.stdout)
+    else:
+        write_batch = batch_writer.append_lines(environment.audit_log_file)
+    return batch_writer.BatchWriter(
+        "audit",
+        write_batch,
+        environment.audit_log_queue_size,
+        auth_consts.AUDIT_BATCH_SIZE,
+        auth_consts.AUDIT_FLUSH_INTERVAL,
+    )
+
+
+audit_writer = create_writer()
+metrics.CallbackGauge(
+    "qms_iam_audit_records_dropped",
+    "Audit records dropped because the queue was full or the log failed",
+    lambda: {(): audit_writer.dropped if audit_writer else 0},
+)
+
+
+def get_record(
+    operation_id: str,
+    realm: str,
+    user_id: typing.Optional[str],
+    error: typing.Optional[Exception],
+    latency: float,
+) -> str:
+    """Renders an audit record as a JSON line
+
+    Args:
+        operation_id (str): The operation id
+        realm (str): The application in context
+        user_id (typing.Optional[str]): The user id, name or email
+        error (typing.Optional[Exception]): The error the operation failed with
+        latency (float): The seconds since the request arrived
+
+    Returns:
+        str: The audit record
+    """
+    return json.dumps(
+        {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "event": operation_id,
+            "realm": realm,
+            "userId": user_id,
+            "outcome": (
+                auth_consts.AUDIT_SUCCESS_OUTCOME
+                if error is None
+                else auth_consts.AUDIT_FAILURE_OUTCOME
+            ),
+            "error": None if error is None else metrics.get_error_code(error),
+            "latency": round(latency, 6),
+        },
+        separators=(",", ":"),
+    )
+
+
+async def submit(record: str) -> None:
+    """Queues an audit record, applying the queue full policy
+
+    With the block policy the request waits, off the event loop, for room in
+    the queue up to the block timeout, and otherwise the record is dropped
+    right away when the queue is full.
+
+    Args:
+        record (str): The audit record
+    """
+    if (
+        environment.audit_log_queue_full_policy == constants.BLOCK_QUEUE_FULL_POLICY
+        and audit_writer.records.full()
+    ):
+        await run_in_threadpool(
+            audit_writer.submit, record, environment.audit_log_block_timeout
+        )
+        return
+    audit_writer.submit(record)
+
+
+@contextlib.asynccontextmanager
+async def audit(
+    operation_id: str, realm: str, user_id: typing.Optional[str]
+) -> typing.AsyncIterator[None]:
+    """Audits the operation run in context
+
+    Args:
+        operation_id (str): The operation id
+        realm (str): The application in context
+        user_id (typing.Optional[str]): The user id, name or email
+    """
+    if audit_writer is None:
+        yield
+        return
+
+    started_at = timeouts.request_started_at.get() or time.monotonic()
+    error = None
+    try:
+        yield
+    except Exception as exc:
+        error = exc
+        raise
+    finally:
+        await submit(
+            get_record(
+                operation_id, realm, user_id, error, time.monotonic() - started_at
+            )
+        )
@@ -0,0 +1,114 @@
+"""Audit log tests
+"""
+
+import asyncio
+import json
+import unittest
+from unittest.mock import Mock, patch
+from app import batch_writer, exceptions
+from app.auth import audit
+
+
+mock_environment = Mock(
+    audit_log_queue_full_policy="drop",
+    audit_log_block_timeout=1.0,
+)
+
+
+def create_writer(max_queue=10):
+    """Creates a writer that keeps the records queued"""
+    writer = batch_writer.BatchWriter("test", Mock(), max_queue, 10, 0.01)
+    writer.thread = Mock()
+    return writer
+
+
+def get_records(writer):
+    """Gets the queued records"""
+    records = []
+    while not writer.records.empty():
+        records.append(json.loads(writer.records.get_nowait()))
+    return records
+
+
+@patch("app.auth.audit.environment", mock_environment)
+class AuditTest(unittest.TestCase):
+    """Audit log tests"""
+
+    def test_audit_success(self):
+        """audit: It records the outcome and latency of the operation"""
+        writer = create_writer()
+
+        async def run():
+            async with audit.audit("loginUser", "test-app", "test-user"):
+                pass
+
+        with patch("app.auth.audit.audit_writer", writer):
+            asyncio.run(run())
+
+        records = get_records(writer)
+        self.assertEqual(len(records), 1)
+        record = records[0]
+        self.assertEqual(record["event"], "loginUser")
+        self.assertEqual(record["realm"], "test-app")
+        self.assertEqual(record["userId"], "test-user")
+        self.assertEqual(record["outcome"], "success")
+        self.assertIsNone(record["error"])
+        self.assertGreaterEqual(record["latency"], 0)
+        self.assertIn("timestamp", record)
+
+    def test_audit_failure(self):
+        """audit: It records the error code of the failed operations"""
+        writer = create_writer()
+
+        async def run():
+            async with audit.audit("logout", "test-app", "user-1"):
+                raise exceptions.CONFLICT_ERROR
+
+        with patch("app.auth.audit.audit_writer", writer):
+            with self.assertRaises(type(exceptions.CONFLICT_ERROR)):
+                asyncio.run(run())
+
+        self.assertEqual(
+            [(record["outcome"], record["error"]) for record in get_records(writer)],
+            [("failure", "CONFLICT")],
+        )
+
+    def test_audit_disabled(self):
+        """audit: It records nothing when the audit log is disabled"""
+
+        async def run():
+            async with audit.audit("logout", "test-app", "user-1"):
+                return True
+
+        with patch("app.auth.audit.audit_writer", None):
+            self.assertTrue(asyncio.run(run()))
+
+    def test_submit_drop(self):
+        """submit: It drops the records when the queue is full"""
+        writer = create_writer(max_queue=1)
+        with patch("app.auth.audit.audit_writer", writer):
+            asyncio.run(audit.submit("{}"))
+            asyncio.run(audit.submit("{}"))
+        self.assertEqual(writer.dropped, 1)
+        self.assertEqual(writer.records.qsize(), 1)
+
+    def test_submit_block(self):
+        """submit: It waits for room in the queue with the block policy"""
+        writer = create_writer(max_queue=1)
+        writer.records.put_nowait("{}")
+
+        async def run():
+            loop = asyncio.get_running_loop()
+            loop.call_later(0.05, writer.records.get_nowait)
+            await audit.submit('{"event":"logout"}')
+
+        with patch("app.auth.audit.audit_writer", writer), patch.object(
+            mock_environment, "audit_log_queue_full_policy", "block"
+        ):
+            asyncio.run(run())
+        self.assertEqual(writer.dropped, 0)
+        self.assertEqual(get_records(writer), [{"event": "logout"}])
+
+
+if __name__ == "__main__":
+    unittest.main()
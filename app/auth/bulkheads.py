@@ -0,0 +1,99 @@
+"""Bounded executors isolating the synchronous route handlers
+"""
+
+import asyncio
+import contextvars
+import threading
+import typing
+from concurrent import futures
+from .. import environment
+from .. import exceptions
+from .. import metrics
+from .. import profiling
+
+
+class Bulkhead:
+    """Bounded executor of an operation class
+
+    Calls run on the bulkhead's own threads, with at most ``max_queue`` calls
+    waiting for one. Calls over that limit are rejected right away, so a
+    saturated operation class never takes capacity away from the others.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int):
+        self.name = name
+        self.max_calls = max_workers + max_queue
+        self.calls = 0
+        self.lock = threading.Lock()
+        self.executor = futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=f"bulkhead-{name}"
+        )
+
+    def acquire(self) -> bool:
+        """Takes a running or queued call slot when there is one left
+
+        Returns:
+            bool: True when the call can be submitted
+        """
+        with self.lock:
+            if self.calls >= self.max_calls:
+                return False
+            self.calls += 1
+            return True
+
+    def release(self) -> None:
+        """Gives back the slot of a finished call"""
+        with self.lock:
+            self.calls -= 1
+
+    async def run(self, func: typing.Callable, *args) -> typing.Any:
+        """Runs the function on the bulkhead threads
+
+        The slot is given back when the function finishes, even if the caller
+        stopped waiting for it.
+
+        Args:
+            func (typing.Callable): The function to run
+
+        Raises:
+            HTTPException: Service unavailable error when the bulkhead is saturated.
+
+        Returns:
+            typing.Any: The function result
+        """
+        if not self.acquire():
+            raise exceptions.SERVICE_UNAVAILABLE_ERROR
+        context = contextvars.copy_context()
+
+        def run_call():
+            try:
+                return context.run(profiling.call, func, *args)
+            finally:
+                self.release()
+
+        try:
+            future = self.executor.submit(run_call)
+        except RuntimeError:
+            self.release()
+            raise
+        return await asyncio.wrap_future(future)
+
+
+token_bulkhead = Bulkhead(
+    "token",
+    environment.token_bulkhead_max_workers,
+    environment.token_bulkhead_max_queue,
+)
+admin_bulkhead = Bulkhead(
+    "admin",
+    environment.admin_bulkhead_max_workers,
+    environment.admin_bulkhead_max_queue,
+)
+metrics.CallbackGauge(
+    "qms_iam_bulkhead_calls_in_flight",
+    "Running and queued calls of the synchronous handlers bulkheads",
+    lambda: {
+        (bulkhead.name,): bulkhead.calls for bulkhead in (token_bulkhead, admin_bulkhead)
+    },
+    ("bulkhead",),
+)
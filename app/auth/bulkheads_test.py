@@ -0,0 +1,57 @@
+"""Synchronous handlers bulkheads tests
+"""
+
+import asyncio
+import contextvars
+import threading
+import unittest
+from fastapi import HTTPException, status
+from .bulkheads import Bulkhead
+
+
+request_id = contextvars.ContextVar("request_id", default=None)
+
+
+class BulkheadTest(unittest.IsolatedAsyncioTestCase):
+    """Bulkhead tests"""
+
+    async def test_run(self):
+        """Bulkhead: It runs the function on its threads with the caller context"""
+        bulkhead = Bulkhead("test", 1, 0)
+        request_id.set("test-request-id")
+
+        def get_call():
+            return threading.current_thread().name, request_id.get()
+
+        thread_name, context_request_id = await bulkhead.run(get_call)
+        self.assertTrue(thread_name.startswith("bulkhead-test"))
+        self.assertEqual(context_request_id, "test-request-id")
+        self.assertEqual(bulkhead.calls, 0)
+
+    async def test_run_saturated(self):
+        """Bulkhead: It rejects calls over the running and queued limit"""
+        bulkhead = Bulkhead("test", 1, 1)
+        release = threading.Event()
+        calls = [
+            asyncio.ensure_future(bulkhead.run(release.wait, 1)) for _ in range(2)
+        ]
+        await asyncio.sleep(0)
+        with self.assertRaises(HTTPException) as context:
+            await bulkhead.run(release.wait, 1)
+        self.assertEqual(
+            context.exception.status_code, status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+        release.set()
+        self.assertEqual(await asyncio.gather(*calls), [True, True])
+        self.assertEqual(bulkhead.calls, 0)
+
+    async def test_run_error(self):
+        """Bulkhead: It gives back the slot of failed calls"""
+        bulkhead = Bulkhead("test", 1, 0)
+        with self.assertRaises(ZeroDivisionError):
+            await bulkhead.run(divmod, 1, 0)
+        self.assertEqual(bulkhead.calls, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+"""Auth API in-memory caches
+"""
+
+import threading
+import time
+import typing
+from collections import OrderedDict
+from .. import metrics
+
+
+class TTLCache:
+    """Thread safe LRU cache whose entries expire after their time to live
+
+    The cache holds at most ``max_entries`` entries, evicting the least
+    recently used ones first. A cache with no room is disabled. The lookups
+    of named caches are counted in the metrics.
+    """
+
+    def __init__(self, max_entries: int, name: typing.Optional[str] = None):
+        self.max_entries = max_entries
+        self.name = name
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, key: str) -> typing.Optional[typing.Any]:
+        """Gets a not expired value from the cache
+
+        Args:
+            key (str): The cache key
+
+        Returns:
+            typing.Optional[typing.Any]: The cached value or None when missing
+        """
+        value = self.lookup(key)
+        if self.name is not None:
+            metrics.record_cache_lookup(self.name, value is not None)
+        return value
+
+    def lookup(self, key: str) -> typing.Optional[typing.Any]:
+        """Looks up a not expired value
+
+        Args:
+            key (str): The cache key
+
+        Returns:
+            typing.Optional[typing.Any]: The cached value or None when missing
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: typing.Any, ttl: float) -> None:
+        """Stores a value in the cache for the given time to live
+
+        Args:
+            key (str): The cache key
+            value (typing.Any): The value to cache
+            ttl (float): Time to live in seconds
+        """
+        if self.max_entries <= 0 or ttl <= 0:
+            return
+        with self.lock:
+            self.entries[key] = (time.monotonic() + ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        """Removes a value from the cache
+
+        Args:
+            key (str): The cache key
+        """
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Removes all the values from the cache"""
+        with self.lock:
+            self.entries.clear()
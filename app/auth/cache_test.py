@@ -0,0 +1,68 @@
+"""Auth API in-memory caches tests
+"""
+
+import unittest
+from unittest.mock import patch
+from .cache import TTLCache
+
+
+class TTLCacheTest(unittest.TestCase):
+    """TTL cache tests"""
+
+    def test_get_and_set(self):
+        """TTLCache: It returns the cached values until they expire"""
+        cache = TTLCache(10)
+        with patch("app.auth.cache.time.monotonic", return_value=100):
+            cache.set("key", {"active": True}, 30)
+            self.assertEqual(cache.get("key"), {"active": True})
+            self.assertIsNone(cache.get("missing-key"))
+        with patch("app.auth.cache.time.monotonic", return_value=130):
+            self.assertIsNone(cache.get("key"))
+        self.assertEqual(len(cache), 0)
+
+    def test_lru_eviction(self):
+        """TTLCache: It evicts the least recently used entries when it is full"""
+        cache = TTLCache(2)
+        cache.set("first", 1, 30)
+        cache.set("second", 2, 30)
+        cache.get("first")
+        cache.set("third", 3, 30)
+        self.assertEqual(cache.get("first"), 1)
+        self.assertIsNone(cache.get("second"))
+        self.assertEqual(cache.get("third"), 3)
+
+    def test_disabled(self):
+        """TTLCache: It does not store values without room or time to live"""
+        cache = TTLCache(0)
+        cache.set("key", 1, 30)
+        self.assertIsNone(cache.get("key"))
+        cache = TTLCache(10)
+        cache.set("key", 1, 0)
+        self.assertIsNone(cache.get("key"))
+
+    def test_delete_and_clear(self):
+        """TTLCache: It can remove single or all the cached values"""
+        cache = TTLCache(10)
+        cache.set("first", 1, 30)
+        cache.set("second", 2, 30)
+        cache.delete("first")
+        self.assertIsNone(cache.get("first"))
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+    @patch("app.auth.cache.metrics.record_cache_lookup")
+    def test_lookups_metrics(self, record_cache_lookup_mock):
+        """TTLCache: It counts the hits and misses of named caches"""
+        cache = TTLCache(10, "test-cache")
+        cache.set("key", True, 30)
+        cache.get("key")
+        cache.get("missing-key")
+        TTLCache(10).get("key")
+        self.assertEqual(
+            [call.args for call in record_cache_lookup_mock.call_args_list],
+            [("test-cache", True), ("test-cache", False)],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,273 @@
+"""Auth API upstream circuit breakers
+"""
+
+import asyncio
+import threading
+import time
+import typing
+from collections import OrderedDict, deque
+from urllib.parse import urlsplit
+from fastapi import HTTPException, status
+from .. import environment
+from .. import exceptions
+from .. import metrics
+from . import concurrency
+
+
+CLOSED_STATE = "closed"
+OPEN_STATE = "open"
+HALF_OPEN_STATE = "half_open"
+
+breakers = OrderedDict()
+breakers_lock = threading.Lock()
+
+
+class CircuitBreaker:
+    """Circuit breaker of an upstream host and realm
+
+    The breaker trips open when the rate of failed or slow calls within the
+    window reaches the configured threshold. While open every call fails fast,
+    and once the open duration elapses a single probe call is let through in
+    the half open state to decide whether to close or open it again.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = CLOSED_STATE
+        self.opened_at = 0.0
+        self.probing = False
+        self.outcomes = deque()
+        self.lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """Checks if a call can go through the breaker
+
+        Returns:
+            bool: True when the call can be made
+        """
+        with self.lock:
+            if self.state == CLOSED_STATE:
+                return True
+            if self.state == OPEN_STATE:
+                elapsed = time.monotonic() - self.opened_at
+                if elapsed < environment.circuit_breaker_open_duration:
+                    return False
+                self.state = HALF_OPEN_STATE
+                self.probing = False
+            if self.probing:
+                return False
+            self.probing = True
+            return True
+
+    def record(self, failed: bool) -> None:
+        """Records the outcome of a call made through the breaker
+
+        Args:
+            failed (bool): Whether the call failed or was too slow
+        """
+        now = time.monotonic()
+        with self.lock:
+            if self.state == HALF_OPEN_STATE:
+                self.probing = False
+                self.outcomes.clear()
+                if failed:
+                    self.open(now)
+                else:
+                    self.state = CLOSED_STATE
+                return
+
+            self.outcomes.append((now, failed))
+            window_start = now - environment.circuit_breaker_window
+            while self.outcomes and self.outcomes[0][0] <= window_start:
+                self.outcomes.popleft()
+            if self.state == CLOSED_STATE and self.should_trip():
+                self.open(now)
+
+    def release(self) -> None:
+        """Lets another probe through after one was abandoned or shed without outcome"""
+        with self.lock:
+            self.probing = False
+
+    def should_trip(self) -> bool:
+        """Checks if the failure rate within the window reached the threshold
+
+        Returns:
+            bool: True when the breaker has to open
+        """
+        calls = len(self.outcomes)
+        if calls < environment.circuit_breaker_min_calls:
+            return False
+        failures = sum(1 for _, failed in self.outcomes if failed)
+        return failures / calls >= environment.circuit_breaker_failure_rate
+
+    def open(self, now: float) -> None:
+        """Opens the breaker
+
+        Args:
+            now (float): The current monotonic time
+        """
+        self.state = OPEN_STATE
+        self.opened_at = now
+        self.outcomes.clear()
+
+
+def get_breaker(
+    realm: str, url: str, create: bool = True
+) -> typing.Optional[CircuitBreaker]:
+    """Gets the circuit breaker of the upstream host and realm of a call
+
+    The realm comes from the callers, so only the configured number of
+    breakers is kept, dropping the least recently used ones first.
+
+    Args:
+        realm (str): The realm in context
+        url (str): The upstream URL
+        create (bool, optional): Whether to add the breaker when it is missing
+
+    Returns:
+        typing.Optional[CircuitBreaker]: The circuit breaker or None when it is
+        missing and not created
+    """
+    name = f"{urlsplit(url).netloc}/{realm}"
+    with breakers_lock:
+        breaker = breakers.get(name)
+        if breaker is None:
+            if not create:
+                return None
+            breaker = breakers[name] = CircuitBreaker(name)
+            while len(breakers) > max(1, environment.circuit_breaker_max_breakers):
+                breakers.popitem(last=False)
+        else:
+            breakers.move_to_end(name)
+    return breaker
+
+
+def get_states() -> typing.Dict[str, str]:
+    """Gets the state of every circuit breaker
+
+    Returns:
+        typing.Dict[str, str]: The states by upstream host and realm
+    """
+    return {name: breaker.state for name, breaker in list(breakers.items())}
+
+
+metrics.CallbackGauge(
+    "qms_iam_circuit_breaker_open",
+    "Whether the circuit breaker of an auth API host and realm is open",
+    lambda: {
+        (name,): int(state == OPEN_STATE) for name, state in get_states().items()
+    },
+    ("circuit",),
+)
+
+
+def is_failure(status_code: int, duration: float) -> bool:
+    """Checks if an upstream response counts as a failure for the breaker
+
+    Client errors are answers of a healthy upstream, so only server errors and
+    slow calls count.
+
+    Args:
+        status_code (int): The response status code
+        duration (float): The call duration in seconds
+
+    Returns:
+        bool: True when the call failed
+    """
+    return (
+        status_code >= status.HTTP_500_INTERNAL_SERVER_ERROR
+        or duration >= environment.circuit_breaker_slow_call_duration
+    )
+
+
+def record_response(
+    breaker: typing.Optional[CircuitBreaker],
+    realm: str,
+    url: str,
+    response: typing.Any,
+    duration: float,
+) -> None:
+    """Records the outcome of an upstream response on the breaker of its realm
+
+    Realms get a breaker once they answer healthy, so made up realms, which
+    the upstream does not find, never get one.
+
+    Args:
+        breaker (typing.Optional[CircuitBreaker]): The breaker the call went through
+        realm (str): The realm in context
+        url (str): The upstream URL
+        response (typing.Any): The upstream response
+        duration (float): The call duration in seconds
+    """
+    failed = is_failure(response.status_code, duration)
+    if breaker is None:
+        if failed or response.status_code == status.HTTP_404_NOT_FOUND:
+            return
+        breaker = get_breaker(realm, url)
+    breaker.record(failed)
+
+
+def call(realm: str, func: typing.Callable, url: str, **kwargs) -> typing.Any:
+    """Calls the upstream through the breaker of its host and realm
+
+    Args:
+        realm (str): The realm in context
+        func (typing.Callable): The HTTP client method
+        url (str): The upstream URL
+
+    Raises:
+        HTTPException: Service unavailable error when the breaker is open.
+
+    Returns:
+        typing.Any: The upstream response
+    """
+    breaker = get_breaker(realm, url, create=False)
+    if breaker is not None and not breaker.allow_request():
+        raise exceptions.SERVICE_UNAVAILABLE_ERROR
+    started_at = time.monotonic()
+    try:
+        response = concurrency.call(func, url, **kwargs)
+    except HTTPException:
+        if breaker is not None:
+            breaker.release()
+        raise
+    except Exception:
+        if breaker is not None:
+            breaker.record(True)
+        raise
+    record_response(breaker, realm, url, response, time.monotonic() - started_at)
+    return response
+
+
+async def async_call(
+    realm: str, func: typing.Callable[..., typing.Awaitable], url: str, **kwargs
+) -> typing.Any:
+    """Calls the upstream through the breaker of its host and realm
+
+    Args:
+        realm (str): The realm in context
+        func (typing.Callable[..., typing.Awaitable]): The async HTTP client method
+        url (str): The upstream URL
+
+    Raises:
+        HTTPException: Service unavailable error when the breaker is open.
+
+    Returns:
+        typing.Any: The upstream response
+    """
+    breaker = get_breaker(realm, url, create=False)
+    if breaker is not None and not breaker.allow_request():
+        raise exceptions.SERVICE_UNAVAILABLE_ERROR
+    started_at = time.monotonic()
+    try:
+        response = await concurrency.async_call(func, url, **kwargs)
+    except (asyncio.CancelledError, HTTPException):
+        if breaker is not None:
+            breaker.release()
+        raise
+    except Exception:
+        if breaker is not None:
+            breaker.record(True)
+        raise
+    record_response(breaker, realm, url, response, time.monotonic() - started_at)
+    return response
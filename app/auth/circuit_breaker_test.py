@@ -0,0 +1,189 @@
+"""Auth API upstream circuit breakers tests
+"""
+
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, Mock, patch
+from fastapi import HTTPException, status
+from . import circuit_breaker
+
+
+URL = "http://auth-api.test/realms/test-realm/protocol/openid-connect/token"
+REALM = "test-realm"
+
+mock_environment = Mock(
+    circuit_breaker_failure_rate=0.5,
+    circuit_breaker_min_calls=4,
+    circuit_breaker_window=30,
+    circuit_breaker_slow_call_duration=5,
+    circuit_breaker_open_duration=15,
+    circuit_breaker_max_breakers=10,
+)
+
+
+@patch("app.auth.circuit_breaker.environment", mock_environment)
+class CircuitBreakerTest(unittest.TestCase):
+    """Circuit breaker functions tests"""
+
+    def setUp(self):
+        circuit_breaker.breakers.clear()
+
+    def test_get_breaker(self):
+        """get_breaker: It keeps one breaker per upstream host and realm"""
+        breaker = circuit_breaker.get_breaker(REALM, URL)
+        self.assertIs(breaker, circuit_breaker.get_breaker(REALM, f"{URL}?query"))
+        self.assertIsNot(breaker, circuit_breaker.get_breaker("other-realm", URL))
+        self.assertIsNot(
+            breaker, circuit_breaker.get_breaker(REALM, "http://other-host.test/path")
+        )
+        self.assertEqual(
+            circuit_breaker.get_states()["auth-api.test/test-realm"],
+            circuit_breaker.CLOSED_STATE,
+        )
+
+    def test_get_breaker_evict(self):
+        """get_breaker: It drops the least recently used breakers past the maximum"""
+        with patch.object(mock_environment, "circuit_breaker_max_breakers", 2):
+            first = circuit_breaker.get_breaker("realm-1", URL)
+            circuit_breaker.get_breaker("realm-2", URL)
+            self.assertIs(circuit_breaker.get_breaker("realm-1", URL), first)
+            circuit_breaker.get_breaker("realm-3", URL)
+        self.assertEqual(
+            list(circuit_breaker.get_states()),
+            ["auth-api.test/realm-1", "auth-api.test/realm-3"],
+        )
+
+    def test_is_failure(self):
+        """is_failure: It counts server errors and slow calls as failures"""
+        self.assertFalse(circuit_breaker.is_failure(status.HTTP_200_OK, 0.1))
+        self.assertFalse(circuit_breaker.is_failure(status.HTTP_401_UNAUTHORIZED, 0.1))
+        self.assertTrue(circuit_breaker.is_failure(status.HTTP_502_BAD_GATEWAY, 0.1))
+        self.assertTrue(circuit_breaker.is_failure(status.HTTP_200_OK, 5))
+
+    def test_trip_and_recover(self):
+        """CircuitBreaker: It opens on failures and closes after a successful probe"""
+        breaker = circuit_breaker.CircuitBreaker("test")
+        with patch("app.auth.circuit_breaker.time.monotonic", return_value=100):
+            for failed in [False, True, False]:
+                breaker.record(failed)
+            self.assertEqual(breaker.state, circuit_breaker.CLOSED_STATE)
+            breaker.record(True)
+            self.assertEqual(breaker.state, circuit_breaker.OPEN_STATE)
+            self.assertFalse(breaker.allow_request())
+        with patch("app.auth.circuit_breaker.time.monotonic", return_value=115):
+            self.assertTrue(breaker.allow_request())
+            self.assertEqual(breaker.state, circuit_breaker.HALF_OPEN_STATE)
+            self.assertFalse(breaker.allow_request())
+            breaker.record(False)
+        self.assertEqual(breaker.state, circuit_breaker.CLOSED_STATE)
+        self.assertTrue(breaker.allow_request())
+
+    def test_failed_probe(self):
+        """CircuitBreaker: It opens again when the half open probe fails"""
+        breaker = circuit_breaker.CircuitBreaker("test")
+        with patch("app.auth.circuit_breaker.time.monotonic", return_value=100):
+            breaker.open(100)
+        with patch("app.auth.circuit_breaker.time.monotonic", return_value=120):
+            self.assertTrue(breaker.allow_request())
+            breaker.record(True)
+            self.assertEqual(breaker.state, circuit_breaker.OPEN_STATE)
+            self.assertFalse(breaker.allow_request())
+
+    def test_window(self):
+        """CircuitBreaker: It only counts the outcomes within the window"""
+        breaker = circuit_breaker.CircuitBreaker("test")
+        with patch("app.auth.circuit_breaker.time.monotonic", return_value=100):
+            for _ in range(3):
+                breaker.record(True)
+        with patch("app.auth.circuit_breaker.time.monotonic", return_value=140):
+            breaker.record(True)
+        self.assertEqual(breaker.state, circuit_breaker.CLOSED_STATE)
+
+    def test_call(self):
+        """call: It fails fast with service unavailable while the breaker is open"""
+        func = Mock(return_value=Mock(status_code=status.HTTP_503_SERVICE_UNAVAILABLE))
+        circuit_breaker.get_breaker(REALM, URL)
+        for _ in range(4):
+            response = circuit_breaker.call(REALM, func, URL, timeout=10)
+            self.assertEqual(response, func.return_value)
+        with self.assertRaises(HTTPException) as context:
+            circuit_breaker.call(REALM, func, URL, timeout=10)
+        self.assertEqual(
+            context.exception.status_code, status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+        self.assertEqual(func.call_count, 4)
+        func.assert_called_with(URL, timeout=10)
+
+    def test_call_error(self):
+        """call: It counts and raises the errors of the upstream calls"""
+        func = Mock(side_effect=ConnectionError("Connection refused"))
+        circuit_breaker.get_breaker(REALM, URL)
+        for _ in range(4):
+            with self.assertRaises(ConnectionError):
+                circuit_breaker.call(REALM, func, URL)
+        self.assertEqual(
+            circuit_breaker.get_breaker(REALM, URL).state, circuit_breaker.OPEN_STATE
+        )
+
+    def test_call_unknown_realm(self):
+        """call: It only adds a breaker once the realm answers healthy"""
+        func = Mock(return_value=Mock(status_code=status.HTTP_404_NOT_FOUND))
+        circuit_breaker.call(REALM, func, URL)
+        func.side_effect = ConnectionError("Connection refused")
+        with self.assertRaises(ConnectionError):
+            circuit_breaker.call(REALM, func, URL)
+        func.side_effect = None
+        func.return_value.status_code = status.HTTP_502_BAD_GATEWAY
+        circuit_breaker.call(REALM, func, URL)
+        self.assertEqual(circuit_breaker.get_states(), {})
+        func.return_value.status_code = status.HTTP_401_UNAUTHORIZED
+        circuit_breaker.call(REALM, func, URL)
+        self.assertEqual(
+            circuit_breaker.get_states(),
+            {"auth-api.test/test-realm": circuit_breaker.CLOSED_STATE},
+        )
+
+    @patch("app.auth.circuit_breaker.concurrency.call")
+    def test_call_shed(self, concurrency_call_mock):
+        """call: It does not count calls shed by the concurrency limit"""
+        concurrency_call_mock.side_effect = HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+        breaker = circuit_breaker.get_breaker(REALM, URL)
+        breaker.state = circuit_breaker.HALF_OPEN_STATE
+        with self.assertRaises(HTTPException):
+            circuit_breaker.call(REALM, Mock(), URL)
+        self.assertEqual(breaker.state, circuit_breaker.HALF_OPEN_STATE)
+        self.assertTrue(breaker.allow_request())
+
+
+@patch("app.auth.circuit_breaker.environment", mock_environment)
+class AsyncCircuitBreakerTest(unittest.IsolatedAsyncioTestCase):
+    """Circuit breaker asyncio functions tests"""
+
+    def setUp(self):
+        circuit_breaker.breakers.clear()
+
+    async def test_async_call(self):
+        """async_call: It fails fast with service unavailable while the breaker is open"""
+        func = AsyncMock(side_effect=ConnectionError("Connection refused"))
+        circuit_breaker.get_breaker(REALM, URL)
+        for _ in range(4):
+            with self.assertRaises(ConnectionError):
+                await circuit_breaker.async_call(REALM, func, URL)
+        with self.assertRaises(HTTPException):
+            await circuit_breaker.async_call(REALM, func, URL)
+        self.assertEqual(func.await_count, 4)
+
+    async def test_async_call_cancelled(self):
+        """async_call: It lets another probe through when the probe is cancelled"""
+        breaker = circuit_breaker.get_breaker(REALM, URL)
+        breaker.state = circuit_breaker.HALF_OPEN_STATE
+        func = AsyncMock(side_effect=asyncio.CancelledError())
+        with self.assertRaises(asyncio.CancelledError):
+            await circuit_breaker.async_call(REALM, func, URL)
+        self.assertTrue(breaker.allow_request())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+"""Auth API HTTP client
+"""
+
+import threading
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from .. import environment
+
+
+HTTP_SCHEMES = ("http://", "https://")
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+_async_clients = {}
+
+
+def create_session() -> requests.Session:
+    """Creates a pooled session for the auth API
+
+    The session keeps connections alive between calls, so the TCP and TLS
+    handshakes are only paid once per pooled connection.
+
+    Returns:
+        requests.Session: The pooled session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=environment.auth_api_pool_connections,
+        pool_maxsize=environment.auth_api_pool_maxsize,
+        pool_block=environment.auth_api_pool_block,
+    )
+    for scheme in HTTP_SCHEMES:
+        session.mount(scheme, adapter)
+    return session
+
+
+def open_session() -> requests.Session:
+    """Opens the shared auth API session if it is not already opened
+
+    Returns:
+        requests.Session: The shared session
+    """
+    with _sessions_lock:
+        if "default" not in _sessions:
+            _sessions["default"] = create_session()
+        return _sessions["default"]
+
+
+def get_session() -> requests.Session:
+    """Gets the shared auth API session, opening it on first use
+
+    Returns:
+        requests.Session: The shared session
+    """
+    session = _sessions.get("default")
+    if session is None:
+        session = open_session()
+    return session
+
+
+def close_session() -> None:
+    """Closes the shared auth API session and its pooled connections"""
+    with _sessions_lock:
+        session = _sessions.pop("default", None)
+    if session is not None:
+        session.close()
+
+
+def create_async_client() -> httpx.AsyncClient:
+    """Creates a pooled asyncio client for the auth API
+
+    Returns:
+        httpx.AsyncClient: The pooled asyncio client
+    """
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=(
+                environment.auth_api_pool_connections
+                * environment.auth_api_pool_maxsize
+            ),
+            max_keepalive_connections=environment.auth_api_pool_maxsize,
+        ),
+    )
+
+
+def open_async_client() -> httpx.AsyncClient:
+    """Opens the shared asyncio auth API client if it is not already opened
+
+    Returns:
+        httpx.AsyncClient: The shared asyncio client
+    """
+    if "default" not in _async_clients:
+        _async_clients["default"] = create_async_client()
+    return _async_clients["default"]
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Gets the shared asyncio auth API client, opening it on first use
+
+    Returns:
+        httpx.AsyncClient: The shared asyncio client
+    """
+    async_client = _async_clients.get("default")
+    if async_client is None:
+        async_client = open_async_client()
+    return async_client
+
+
+async def close_async_client() -> None:
+    """Closes the shared asyncio auth API client and its pooled connections"""
+    async_client = _async_clients.pop("default", None)
+    if async_client is not None:
+        await async_client.aclose()
@@ -0,0 +1,71 @@
+"""Auth API client tests
+"""
+
+import unittest
+from unittest.mock import Mock, patch
+from httpx import AsyncClient
+from requests import Session
+from . import client
+
+
+mock_environment = Mock(
+    auth_api_pool_connections=4,
+    auth_api_pool_maxsize=20,
+    auth_api_pool_block=False,
+)
+
+
+class AuthClientTest(unittest.TestCase):
+    """Auth API client functions tests"""
+
+    def tearDown(self):
+        client.close_session()
+
+    @patch("app.auth.client.environment", mock_environment)
+    def test_create_session(self):
+        """create_session: It mounts a pooled adapter for http and https"""
+        session = client.create_session()
+        for scheme in client.HTTP_SCHEMES:
+            adapter = session.get_adapter(f"{scheme}auth.test")
+            self.assertEqual(adapter._pool_connections, 4)  # pylint: disable=W0212
+            self.assertEqual(adapter._pool_maxsize, 20)  # pylint: disable=W0212
+            self.assertFalse(adapter._pool_block)  # pylint: disable=W0212
+        session.close()
+
+    @patch("app.auth.client.environment", mock_environment)
+    def test_get_session_reuses_session(self):
+        """get_session: It returns the same session until it is closed"""
+        session = client.get_session()
+        self.assertIsInstance(session, Session)
+        self.assertIs(client.get_session(), session)
+        self.assertIs(client.open_session(), session)
+
+    @patch("app.auth.client.environment", mock_environment)
+    def test_close_session(self):
+        """close_session: It closes the shared session so a new one is opened next time"""
+        session = client.get_session()
+        with patch.object(session, "close") as close_mock:
+            client.close_session()
+            close_mock.assert_called_once()
+        self.assertIsNot(client.get_session(), session)
+
+
+class AuthAsyncClientTest(unittest.IsolatedAsyncioTestCase):
+    """Auth API asyncio client functions tests"""
+
+    async def asyncTearDown(self):
+        await client.close_async_client()
+
+    @patch("app.auth.client.environment", mock_environment)
+    async def test_get_async_client_reuses_client(self):
+        """get_async_client: It returns the same client until it is closed"""
+        async_client = client.get_async_client()
+        self.assertIsInstance(async_client, AsyncClient)
+        self.assertIs(client.get_async_client(), async_client)
+        await client.close_async_client()
+        self.assertTrue(async_client.is_closed)
+        self.assertIsNot(client.get_async_client(), async_client)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,198 @@
+"""Adaptive concurrency limit of the auth API upstream calls
+"""
+
+import asyncio
+import threading
+import time
+import typing
+from fastapi import status
+from .. import environment
+from .. import exceptions
+from .. import metrics
+from . import constants as auth_consts
+
+
+class AdaptiveLimiter:
+    """Concurrency limit adapted to the upstream latency with AIMD
+
+    The limit grows by ``1 / limit`` for every fast call made while the limit
+    was being used, which adds about one call per round trip, and shrinks by
+    a ratio on slow or failed calls. The calls that started before the last
+    decrease belong to the round trip that caused it, so they do not shrink
+    the limit again: a burst of slow calls, like an upstream pause, costs a
+    single decrease. Calls over the limit wait briefly for a free slot and
+    are shed when none frees up in time.
+    """
+
+    def __init__(self):
+        self.limit = float(environment.upstream_concurrency_initial_limit)
+        self.in_flight = 0
+        self.decreased_at = float("-inf")
+        self.condition = threading.Condition()
+
+    def get_limit(self) -> int:
+        """Gets the current concurrency limit
+
+        Returns:
+            int: The maximum number of calls in flight
+        """
+        return int(self.limit)
+
+    def try_acquire(self) -> bool:
+        """Takes a slot when the limit allows another call
+
+        Returns:
+            bool: True when the call can be made
+        """
+        with self.condition:
+            if self.in_flight >= self.get_limit():
+                return False
+            self.in_flight += 1
+            return True
+
+    def acquire(self) -> bool:
+        """Takes a slot, waiting up to the queue timeout for one
+
+        Returns:
+            bool: True when the call can be made
+        """
+        with self.condition:
+            acquired = self.condition.wait_for(
+                lambda: self.in_flight < self.get_limit(),
+                timeout=environment.upstream_concurrency_queue_timeout,
+            )
+            if acquired:
+                self.in_flight += 1
+            return acquired
+
+    async def async_acquire(self) -> bool:
+        """Takes a slot, waiting up to the queue timeout for one
+
+        Returns:
+            bool: True when the call can be made
+        """
+        deadline = time.monotonic() + environment.upstream_concurrency_queue_timeout
+        while not self.try_acquire():
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(auth_consts.CONCURRENCY_QUEUE_POLL_INTERVAL)
+        return True
+
+    def release(self, started_at: float, finished_at: float, failed: bool) -> None:
+        """Gives back the slot of a finished call and adapts the limit
+
+        Args:
+            started_at (float): The monotonic time the call started at
+            finished_at (float): The monotonic time the call finished at
+            failed (bool): Whether the call failed
+        """
+        duration = finished_at - started_at
+        with self.condition:
+            in_flight = self.in_flight
+            self.in_flight -= 1
+            if failed or duration > environment.upstream_concurrency_latency_threshold:
+                if started_at >= self.decreased_at:
+                    self.limit = max(
+                        float(environment.upstream_concurrency_min_limit),
+                        self.limit * auth_consts.CONCURRENCY_BACKOFF_RATIO,
+                    )
+                    self.decreased_at = finished_at
+            elif in_flight * 2 >= self.get_limit():
+                self.limit = min(
+                    float(environment.upstream_concurrency_max_limit),
+                    self.limit + 1 / self.limit,
+                )
+            self.condition.notify()
+
+    def abandon(self) -> None:
+        """Gives back the slot of a cancelled call, leaving the limit as it is"""
+        with self.condition:
+            self.in_flight -= 1
+            self.condition.notify()
+
+
+upstream_limiter = AdaptiveLimiter()
+metrics.CallbackGauge(
+    "qms_iam_upstream_concurrency_limit",
+    "Adaptive concurrency limit of the auth API calls",
+    lambda: {(): upstream_limiter.get_limit()},
+)
+metrics.CallbackGauge(
+    "qms_iam_upstream_calls_in_flight",
+    "Auth API calls in flight",
+    lambda: {(): upstream_limiter.in_flight},
+)
+
+
+def is_failed_response(response: typing.Any) -> bool:
+    """Checks if an upstream response tells the upstream is struggling
+
+    Args:
+        response (typing.Any): The upstream response
+
+    Returns:
+        bool: True for server errors
+    """
+    return response.status_code >= status.HTTP_500_INTERNAL_SERVER_ERROR
+
+
+def call(func: typing.Callable, url: str, **kwargs) -> typing.Any:
+    """Calls the upstream within the adaptive concurrency limit
+
+    Args:
+        func (typing.Callable): The HTTP client method
+        url (str): The upstream URL
+
+    Raises:
+        HTTPException: Service unavailable error when the call is shed.
+
+    Returns:
+        typing.Any: The upstream response
+    """
+    if not upstream_limiter.acquire():
+        raise exceptions.SERVICE_UNAVAILABLE_ERROR
+    started_at = time.monotonic()
+    try:
+        response = func(url, **kwargs)
+    except Exception:
+        upstream_limiter.release(started_at, time.monotonic(), True)
+        raise
+    except BaseException:
+        upstream_limiter.abandon()
+        raise
+    upstream_limiter.release(
+        started_at, time.monotonic(), is_failed_response(response)
+    )
+    return response
+
+
+async def async_call(
+    func: typing.Callable[..., typing.Awaitable], url: str, **kwargs
+) -> typing.Any:
+    """Calls the upstream within the adaptive concurrency limit
+
+    Args:
+        func (typing.Callable[..., typing.Awaitable]): The async HTTP client method
+        url (str): The upstream URL
+
+    Raises:
+        HTTPException: Service unavailable error when the call is shed.
+
+    Returns:
+        typing.Any: The upstream response
+    """
+    if not await upstream_limiter.async_acquire():
+        raise exceptions.SERVICE_UNAVAILABLE_ERROR
+    started_at = time.monotonic()
+    try:
+        response = await func(url, **kwargs)
+    except asyncio.CancelledError:
+        upstream_limiter.abandon()
+        raise
+    except Exception:
+        upstream_limiter.release(started_at, time.monotonic(), True)
+        raise
+    upstream_limiter.release(
+        started_at, time.monotonic(), is_failed_response(response)
+    )
+    return response
@@ -0,0 +1,131 @@
+"""Adaptive concurrency limit tests
+"""
+
+import asyncio
+import threading
+import unittest
+from unittest.mock import AsyncMock, Mock, patch
+from fastapi import HTTPException, status
+from . import concurrency
+
+
+mock_environment = Mock(
+    upstream_concurrency_initial_limit=4,
+    upstream_concurrency_min_limit=2,
+    upstream_concurrency_max_limit=5,
+    upstream_concurrency_latency_threshold=1,
+    upstream_concurrency_queue_timeout=0.01,
+)
+
+
+@patch("app.auth.concurrency.environment", mock_environment)
+class AdaptiveLimiterTest(unittest.TestCase):
+    """Adaptive limiter tests"""
+
+    def setUp(self):
+        with patch("app.auth.concurrency.environment", mock_environment):
+            self.limiter = concurrency.AdaptiveLimiter()
+
+    def test_increase(self):
+        """AdaptiveLimiter: It grows the limit by about one call per round trip"""
+        for _ in range(4):
+            self.assertTrue(self.limiter.acquire())
+        for _ in range(2):
+            self.limiter.release(0, 0.1, False)
+        self.assertEqual(self.limiter.get_limit(), 4)
+        self.assertAlmostEqual(self.limiter.limit, 4.25 + 1 / 4.25)
+        for _ in range(2):
+            self.limiter.release(0, 0.1, False)
+        self.assertEqual(self.limiter.in_flight, 0)
+        for _ in range(20):
+            self.limiter.acquire()
+            self.limiter.acquire()
+            self.limiter.release(0, 0.1, False)
+            self.limiter.release(0, 0.1, False)
+        self.assertEqual(self.limiter.get_limit(), 5)
+
+    def test_no_increase_when_unused(self):
+        """AdaptiveLimiter: It keeps the limit when it is far from being used"""
+        self.limiter.acquire()
+        self.limiter.release(0, 0.1, False)
+        self.assertEqual(self.limiter.get_limit(), 4)
+
+    def test_decrease(self):
+        """AdaptiveLimiter: It shrinks the limit on slow or failed calls"""
+        self.limiter.acquire()
+        self.limiter.release(0, 2, False)
+        self.assertEqual(self.limiter.limit, 3.6)
+        for index in range(10):
+            self.limiter.acquire()
+            self.limiter.release(10 + index, 10.1 + index, True)
+        self.assertEqual(self.limiter.get_limit(), 2)
+
+    def test_single_decrease_per_round_trip(self):
+        """AdaptiveLimiter: It shrinks the limit once for a burst of slow calls"""
+        with patch.object(mock_environment, "upstream_concurrency_max_limit", 30):
+            self.limiter.limit = 27.0
+            for _ in range(27):
+                self.assertTrue(self.limiter.acquire())
+            for index in range(27):
+                self.limiter.release(0, 1.5 + index * 0.01, False)
+            self.assertEqual(self.limiter.in_flight, 0)
+            self.assertAlmostEqual(self.limiter.limit, 27 * 0.9)
+            self.limiter.acquire()
+            self.limiter.release(2, 3.5, False)
+            self.assertAlmostEqual(self.limiter.limit, 27 * 0.9 * 0.9)
+
+    def test_acquire_queue(self):
+        """AdaptiveLimiter: It waits briefly for a slot and sheds calls otherwise"""
+        for _ in range(4):
+            self.assertTrue(self.limiter.acquire())
+        self.assertFalse(self.limiter.acquire())
+        threading.Timer(0.001, self.limiter.release, (0, 0.1, False)).start()
+        with patch.object(mock_environment, "upstream_concurrency_queue_timeout", 1):
+            self.assertTrue(self.limiter.acquire())
+
+    def test_call(self):
+        """call: It sheds calls over the limit with service unavailable"""
+        func = Mock(return_value=Mock(status_code=status.HTTP_200_OK))
+        with patch.object(concurrency, "upstream_limiter", self.limiter):
+            self.assertEqual(
+                concurrency.call(func, "url", timeout=1), func.return_value
+            )
+            self.limiter.in_flight = 4
+            with self.assertRaises(HTTPException) as context:
+                concurrency.call(func, "url")
+        self.assertEqual(
+            context.exception.status_code, status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+        func.assert_called_once_with("url", timeout=1)
+
+
+@patch("app.auth.concurrency.environment", mock_environment)
+class AsyncAdaptiveLimiterTest(unittest.IsolatedAsyncioTestCase):
+    """Adaptive limiter asyncio tests"""
+
+    async def test_async_call(self):
+        """async_call: It counts failed calls against the limit"""
+        limiter = concurrency.AdaptiveLimiter()
+        func = AsyncMock(side_effect=ConnectionError("Connection refused"))
+        with patch.object(concurrency, "upstream_limiter", limiter):
+            with self.assertRaises(ConnectionError):
+                await concurrency.async_call(func, "url")
+            limiter.in_flight = limiter.get_limit()
+            with self.assertRaises(HTTPException):
+                await concurrency.async_call(func, "url")
+        self.assertEqual(limiter.limit, 3.6)
+        func.assert_awaited_once_with("url")
+
+    async def test_async_call_cancelled(self):
+        """async_call: It frees the slot of cancelled calls without shrinking the limit"""
+        limiter = concurrency.AdaptiveLimiter()
+        func = AsyncMock(side_effect=asyncio.CancelledError)
+        with patch.object(concurrency, "upstream_limiter", limiter):
+            with self.assertRaises(asyncio.CancelledError):
+                await concurrency.async_call(func, "url")
+        self.assertEqual(limiter.limit, 4)
+        self.assertEqual(limiter.in_flight, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,6 +8,7 @@ AUTHORIZE_DEVICE_OPERATION_ID = "authorizeDevice"
 GET_AUTH_TOKENS_OPERATION_ID = "getAuthTokens"
 GET_NEW_ACCESS_TOKEN_OPERATION_ID = "getNewAccessToken"
 VALIDATE_ACCESS_TOKEN_OPERATION_ID = "validateAccessToken"
+VALIDATE_ACCESS_TOKENS_BATCH_OPERATION_ID = "validateAccessTokensBatch"
 TOKENS_FOR_CREDENTIALS_OPERATION_ID="getAuthTokensForCredentials"
 REGISTER_USER_OPERATION_ID = "registerUser"
 LOGIN_USER_OPERATION_ID = "loginUser"
@@ -15,10 +16,34 @@ GET_USER_BASIC_DATA_OPERATION_ID="getUserBasicData"
 LOGOUT_OPERATION_ID="logout"
 SEND_RESET_PASSWORD_EMAIL="sendResetPasswordEmail"
 
+# Audit log
+AUDIT_BATCH_SIZE = 256
+AUDIT_FLUSH_INTERVAL = 1.0
+AUDIT_SUCCESS_OUTCOME = "success"
+AUDIT_FAILURE_OUTCOME = "failure"
+
+# Maximum number of tokens validated in a single batch
+VALIDATE_ACCESS_TOKENS_BATCH_MAX_SIZE = 100
+
+# Token instrospection claims kept in the instrospection cache
+INTROSPECTION_RESULT_CLAIMS = (
+    "active",
+    "scope",
+    "exp",
+    "sub",
+    "preferred_username",
+    "email",
+    "name",
+    "given_name",
+    "family_name",
+    "email_verified",
+)
+
 # External API paths
 AUTH_DEVICE_PATH = "/protocol/openid-connect/auth/device"
 AUTH_TOKENS_PATH = "/protocol/openid-connect/token"
 INSTROSPECT_PATH = "/protocol/openid-connect/token/introspect"
+JWKS_PATH = "/protocol/openid-connect/certs"
 AUTH_USERS_PATH = "/users"
 REALMS_PATH = "/realms/"
 ADMIN_PATH = "/admin"
@@ -30,7 +55,59 @@ TOKENS_ROUTE_PATH = "/tokens"
 TOKENS_FOR_CREDENTIALS_ROUTE_PATH = "/tokens/for-credentials"
 TOKEN_REFRESH_ROUTE_PATH = "/token/refresh"
 TOKEN_VALIDATE_ROUTE_PATH = "/token/validate"
+TOKEN_VALIDATE_BATCH_ROUTE_PATH = "/token/validate/batch"
 REGISTER_ROUTE_PATH = "/register"
 LOGIN_ROUTE_PATH = "/login"
 AUTH_LOGOUT_PATH = "/logout"
 USER_BASIC_DATA_PATH="/user-basic-data"
+
+# Upstream operations with their own timeouts
+INTROSPECT_UPSTREAM_OPERATION = "introspect"
+TOKEN_UPSTREAM_OPERATION = "token"
+ADMIN_USERS_UPSTREAM_OPERATION = "admin_users"
+LOGOUT_UPSTREAM_OPERATION = "logout"
+RESET_EMAIL_UPSTREAM_OPERATION = "reset_email"
+
+# Remaining budget of the caller in milliseconds
+REQUEST_DEADLINE_HEADER = "x-request-deadline-ms"
+
+# Upstream retries and hedged requests
+RETRYABLE_STATUS_CODES = frozenset({502, 503, 504})
+HEDGING_PERCENTILE = 0.95
+HEDGING_MIN_SAMPLES = 20
+HEDGING_LATENCY_SAMPLES = 200
+
+# Upstream adaptive concurrency limit
+CONCURRENCY_BACKOFF_RATIO = 0.9
+CONCURRENCY_QUEUE_POLL_INTERVAL = 0.005
+
+# Admission priorities of the routes, the other routes having the normal one
+CRITICAL_PRIORITY = "critical"
+NORMAL_PRIORITY = "normal"
+SHEDDABLE_PRIORITY = "sheddable"
+ROUTE_PRIORITIES = {
+    VALIDATE_ACCESS_TOKEN_OPERATION_ID: CRITICAL_PRIORITY,
+    VALIDATE_ACCESS_TOKENS_BATCH_OPERATION_ID: CRITICAL_PRIORITY,
+    GET_USER_BASIC_DATA_OPERATION_ID: CRITICAL_PRIORITY,
+    AUTHORIZE_DEVICE_OPERATION_ID: SHEDDABLE_PRIORITY,
+    REGISTER_USER_OPERATION_ID: SHEDDABLE_PRIORITY,
+    SEND_RESET_PASSWORD_EMAIL: SHEDDABLE_PRIORITY,
+}
+
+# Share of the maximum requests in flight and multiple of the queue delay
+# target up to which the requests of every priority are admitted
+ADMISSION_THRESHOLDS = {
+    CRITICAL_PRIORITY: (1.0, float("inf")),
+    NORMAL_PRIORITY: (0.8, 2.0),
+    SHEDDABLE_PRIORITY: (0.5, 1.0),
+}
+ADMISSION_QUEUE_DELAY_SMOOTHING = 0.2
+
+# Client credentials tokens background refresh
+CREDENTIALS_TOKEN_REFRESH_WORKERS = 2
+
+# Cache names in the metrics
+INTROSPECTION_CACHE_NAME = "introspection"
+NEGATIVE_TOKEN_CACHE_NAME = "negative_token"
+CREDENTIALS_TOKEN_CACHE_NAME = "credentials_token"
+JWKS_CACHE_NAME = "jwks"
@@ -0,0 +1,176 @@
+"""Client credentials access tokens cache
+"""
+
+import hashlib
+import threading
+import time
+import typing
+from concurrent import futures
+from .. import environment
+from . import api
+from . import models
+from . import singleflight
+from . import constants as auth_consts
+from .cache import TTLCache
+from .helpers import handle_error_response
+
+
+credentials_tokens_cache = TTLCache(
+    environment.credentials_token_cache_max_entries,
+    auth_consts.CREDENTIALS_TOKEN_CACHE_NAME,
+)
+mint_flights = singleflight.Group()
+refreshing_keys = set()
+refreshing_keys_lock = threading.Lock()
+refresh_executor = futures.ThreadPoolExecutor(
+    max_workers=auth_consts.CREDENTIALS_TOKEN_REFRESH_WORKERS,
+    thread_name_prefix="credentials-refresh",
+)
+
+
+class CredentialsToken(typing.NamedTuple):
+    """Cached client credentials access token"""
+
+    access_token: str
+    expires_at: typing.Optional[float]
+
+    def get_expires_in(self) -> typing.Optional[int]:
+        """Gets the remaining lifetime of the token
+
+        Returns:
+            typing.Optional[int]: The remaining lifetime in seconds, None when
+            the IdP did not tell when the token expires
+        """
+        if self.expires_at is None:
+            return None
+        return max(0, round(self.expires_at - time.monotonic()))
+
+
+def get_credentials_cache_key(
+    realm: str, payload: models.GetTokensForCredentialsPayload
+) -> str:
+    """Gets the client credentials tokens cache key
+
+    The key is a digest, so the client secret is not kept in memory.
+
+    Args:
+        realm (str): The realm in context
+        payload (models.GetTokensForCredentialsPayload): The client credentials
+
+    Returns:
+        str: The cache key
+    """
+    digest = hashlib.sha256()
+    for value in (realm, payload.clientId, payload.clientSecret, payload.scope):
+        digest.update(value.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def mint_credentials_token(
+    key: str, realm: str, payload: models.GetTokensForCredentialsPayload
+) -> CredentialsToken:
+    """Gets a new access token for the client credentials and caches it
+
+    The token is served from the cache until the configured expiry margin
+    before it expires. Tokens without a lifetime are not cached.
+
+    Args:
+        key (str): The client credentials tokens cache key
+        realm (str): The realm in context
+        payload (models.GetTokensForCredentialsPayload): The client credentials
+
+    Returns:
+        CredentialsToken: The new access token
+    """
+    response = api.get_auth_tokens_for_credentials(realm, payload)
+
+    handle_error_response(response)
+
+    data = response.json()
+    expires_in = data.get("expires_in")
+    if expires_in is None:
+        return CredentialsToken(access_token=data.get("access_token"), expires_at=None)
+
+    token = CredentialsToken(
+        access_token=data.get("access_token"),
+        expires_at=time.monotonic() + expires_in,
+    )
+    credentials_tokens_cache.set(
+        key, token, expires_in - environment.credentials_token_expiry_margin
+    )
+    return token
+
+
+def refresh_credentials_token(
+    key: str, realm: str, payload: models.GetTokensForCredentialsPayload
+) -> None:
+    """Gets a new access token for the client credentials in the background
+
+    Failures are ignored, the cached token keeps being served until it expires
+    and the next caller mints a new one.
+
+    Args:
+        key (str): The client credentials tokens cache key
+        realm (str): The realm in context
+        payload (models.GetTokensForCredentialsPayload): The client credentials
+    """
+    try:
+        mint_flights.do(key, mint_credentials_token, key, realm, payload)
+    except Exception:  # pylint: disable=broad-exception-caught
+        pass
+    finally:
+        with refreshing_keys_lock:
+            refreshing_keys.discard(key)
+
+
+def schedule_credentials_token_refresh(
+    key: str, realm: str, payload: models.GetTokensForCredentialsPayload
+) -> None:
+    """Queues a background refresh of the token unless one is already pending
+
+    The refreshes run on a small pool of threads, so many tokens reaching the
+    refresh window together wait for their turn instead of each getting a
+    thread.
+
+    Args:
+        key (str): The client credentials tokens cache key
+        realm (str): The realm in context
+        payload (models.GetTokensForCredentialsPayload): The client credentials
+    """
+    with refreshing_keys_lock:
+        if key in refreshing_keys:
+            return
+        refreshing_keys.add(key)
+    try:
+        refresh_executor.submit(refresh_credentials_token, key, realm, payload)
+    except RuntimeError:
+        with refreshing_keys_lock:
+            refreshing_keys.discard(key)
+
+
+def get_credentials_token(
+    realm: str, payload: models.GetTokensForCredentialsPayload
+) -> CredentialsToken:
+    """Gets an access token for the client credentials through the cache
+
+    Cached tokens about to reach the expiry margin are refreshed ahead in the
+    background, so callers only wait for a new token on a cache miss.
+
+    Args:
+        realm (str): The realm in context
+        payload (models.GetTokensForCredentialsPayload): The client credentials
+
+    Returns:
+        CredentialsToken: The access token
+    """
+    key = get_credentials_cache_key(realm, payload)
+    token = credentials_tokens_cache.get(key)
+    if token is None:
+        return mint_flights.do(key, mint_credentials_token, key, realm, payload)
+
+    usable_for = token.expires_at - time.monotonic()
+    usable_for -= environment.credentials_token_expiry_margin
+    if usable_for <= environment.credentials_token_refresh_ahead:
+        schedule_credentials_token_refresh(key, realm, payload)
+    return token
@@ -0,0 +1,142 @@
+"""Client credentials access tokens cache tests
+"""
+
+import threading
+import time
+import unittest
+from unittest.mock import Mock, patch
+from fastapi import HTTPException, status
+from . import constants as auth_consts
+from . import credentials
+from . import models
+
+
+mock_environment = Mock(
+    credentials_token_expiry_margin=30,
+    credentials_token_refresh_ahead=60,
+)
+
+
+@patch("app.auth.credentials.environment", mock_environment)
+class CredentialsTest(unittest.TestCase):
+    """Client credentials access tokens cache functions tests"""
+
+    def setUp(self):
+        self.realm = "test-realm"
+        credentials.credentials_tokens_cache.clear()
+        self.payload = models.GetTokensForCredentialsPayload(
+            clientId="test-client-id",
+            clientSecret="test-client-secret",
+            scope="test-scope",
+        )
+
+    def get_tokens_response(self, access_token: str, expires_in: int = 300) -> Mock:
+        """Gets an auth API tokens response mock"""
+        return Mock(
+            status_code=status.HTTP_200_OK,
+            json=Mock(
+                return_value={"access_token": access_token, "expires_in": expires_in}
+            ),
+        )
+
+    def test_get_credentials_cache_key(self):
+        """get_credentials_cache_key: It depends on the realm, credentials and scope"""
+        key = credentials.get_credentials_cache_key(self.realm, self.payload)
+        self.assertNotIn(self.payload.clientSecret, key)
+        for update in [
+            {"clientId": "other-client-id"},
+            {"clientSecret": "other-client-secret"},
+            {"scope": "other-scope"},
+        ]:
+            self.assertNotEqual(
+                key,
+                credentials.get_credentials_cache_key(
+                    self.realm, self.payload.copy(update=update)
+                ),
+            )
+
+    @patch("app.auth.credentials.schedule_credentials_token_refresh")
+    @patch("app.auth.api.get_auth_tokens_for_credentials")
+    def test_get_credentials_token(self, get_tokens_mock, schedule_refresh_mock):
+        """get_credentials_token: It serves cached tokens with their remaining lifetime"""
+        get_tokens_mock.return_value = self.get_tokens_response("test-token")
+        with patch("app.auth.credentials.time.monotonic", return_value=1000):
+            token = credentials.get_credentials_token(self.realm, self.payload)
+            self.assertEqual(token.access_token, "test-token")
+            self.assertEqual(token.get_expires_in(), 300)
+        with patch("app.auth.credentials.time.monotonic", return_value=1100):
+            token = credentials.get_credentials_token(self.realm, self.payload)
+            self.assertEqual(token.get_expires_in(), 200)
+        get_tokens_mock.assert_called_once_with(self.realm, self.payload)
+        schedule_refresh_mock.assert_not_called()
+
+    @patch("app.auth.credentials.schedule_credentials_token_refresh")
+    @patch("app.auth.api.get_auth_tokens_for_credentials")
+    def test_get_credentials_token_refresh_ahead(
+        self, get_tokens_mock, schedule_refresh_mock
+    ):
+        """get_credentials_token: It refreshes ahead tokens close to the expiry margin"""
+        get_tokens_mock.return_value = self.get_tokens_response("test-token")
+        with patch("app.auth.credentials.time.monotonic", return_value=1000):
+            credentials.get_credentials_token(self.realm, self.payload)
+        with patch("app.auth.credentials.time.monotonic", return_value=1220):
+            token = credentials.get_credentials_token(self.realm, self.payload)
+        self.assertEqual(token.access_token, "test-token")
+        schedule_refresh_mock.assert_called_once()
+        get_tokens_mock.assert_called_once()
+
+    @patch("app.auth.api.get_auth_tokens_for_credentials")
+    def test_refresh_credentials_token(self, get_tokens_mock):
+        """schedule_credentials_token_refresh: It replaces the cached token in background"""
+        get_tokens_mock.return_value = self.get_tokens_response("new-token")
+        key = credentials.get_credentials_cache_key(self.realm, self.payload)
+        credentials.schedule_credentials_token_refresh(key, self.realm, self.payload)
+        for _ in range(100):
+            if credentials.credentials_tokens_cache.get(key) is not None:
+                break
+            time.sleep(0.01)
+        self.assertEqual(
+            credentials.credentials_tokens_cache.get(key).access_token, "new-token"
+        )
+
+    @patch("app.auth.credentials.refresh_credentials_token")
+    def test_refresh_credentials_token_bounded(self, refresh_mock):
+        """schedule_credentials_token_refresh: It runs the refreshes on a bounded pool"""
+        release = threading.Event()
+        refresh_mock.side_effect = lambda *args: release.wait(1)
+        threads = threading.active_count()
+        for index in range(10):
+            credentials.schedule_credentials_token_refresh(
+                f"key-{index}", self.realm, self.payload
+            )
+        self.assertLessEqual(
+            threading.active_count() - threads,
+            auth_consts.CREDENTIALS_TOKEN_REFRESH_WORKERS,
+        )
+        release.set()
+        credentials.refresh_executor.submit(lambda: None).result()
+
+    @patch("app.auth.api.get_auth_tokens_for_credentials")
+    def test_get_credentials_token_without_expiry(self, get_tokens_mock):
+        """get_credentials_token: It serves tokens without a lifetime uncached"""
+        get_tokens_mock.return_value = self.get_tokens_response("test-token", None)
+        for _ in range(2):
+            token = credentials.get_credentials_token(self.realm, self.payload)
+            self.assertEqual(token.access_token, "test-token")
+            self.assertIsNone(token.get_expires_in())
+        self.assertEqual(get_tokens_mock.call_count, 2)
+
+    @patch("app.auth.api.get_auth_tokens_for_credentials")
+    def test_get_credentials_token_error(self, get_tokens_mock):
+        """get_credentials_token: It raises on error responses without caching them"""
+        get_tokens_mock.return_value = Mock(
+            status_code=status.HTTP_401_UNAUTHORIZED, json=Mock(return_value={})
+        )
+        for _ in range(2):
+            with self.assertRaises(HTTPException):
+                credentials.get_credentials_token(self.realm, self.payload)
+        self.assertEqual(get_tokens_mock.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,18 +7,13 @@ from fastapi import status
 from requests import Response
 from .handlers import (
     authorize_device,
-    get_auth_tokens,
-    get_new_access_token,
     get_auth_tokens_for_credentials,
     login_user,
-    logout,
-    send_reset_password_email,
     register_new_user,
-    validate_access_token,
-    get_user_basic_data,
 )
+from . import credentials
 from . import models
-from .. import exceptions
+from . import tokens
 
 
 class HandlersTest(unittest.TestCase):
@@ -27,6 +22,9 @@ class HandlersTest(unittest.TestCase):
     def setUp(self):
         self.realm = "test-realm"
         self.access_token = "test-access-token"
+        tokens.introspection_cache.clear()
+        tokens.negative_token_cache.clear()
+        credentials.credentials_tokens_cache.clear()
 
     @patch("app.auth.handlers.handle_error_response")
     @patch("app.auth.api.auth_device")
@@ -61,179 +59,7 @@ class HandlersTest(unittest.TestCase):
         auth_device_mock.assert_called_with(self.realm, payload)
         handle_error_response_mock.assert_called_with(auth_device_mock.return_value)
 
-    @patch("app.auth.handlers.handle_error_response")
-    @patch("app.auth.api.get_auth_tokens")
-    def test_get_auth_tokens(self, get_auth_tokens_mock, handle_error_response_mock):
-        """get_auth_tokens: It can retrieve access tokens"""
-        json_data = {
-            "access_token": self.access_token,
-            "refresh_token": "test-refresh-token",
-            "expires_in": 1800,
-            "refresh_expires_in": 3600,
-        }
-        get_auth_tokens_mock.return_value = Mock(
-            spec=Response,
-            status_code=status.HTTP_200_OK,
-            json=Mock(return_value=json_data),
-        )
-        payload = models.GetTokensPayload(
-            clientId="test-client-id",
-            clientSecret="test-client-secret",
-            deviceCode="test-device-code",
-        )
-        response = get_auth_tokens(self.realm, payload)
-        self.assertEqual(response.data.accessToken, json_data["access_token"])
-        self.assertEqual(response.data.refreshToken, json_data["refresh_token"])
-        self.assertEqual(response.data.expiresIn, json_data["expires_in"])
-        self.assertEqual(
-            response.data.refreshExpiresIn, json_data["refresh_expires_in"]
-        )
-        get_auth_tokens_mock.assert_called_with(self.realm, payload)
-        handle_error_response_mock.assert_called_with(get_auth_tokens_mock.return_value)
-
-    @patch("app.auth.handlers.handle_error_response")
-    @patch("app.auth.api.get_new_access_token")
-    def test_get_new_access_token(
-        self, get_new_access_token_mock, handle_error_response_mock
-    ):
-        """get_new_access_token: It can get a new access token"""
-        json_data = {
-            "access_token": self.access_token,
-            "expires_in": 1800,
-        }
-        get_new_access_token_mock.return_value = Mock(
-            spec=Response,
-            status_code=status.HTTP_200_OK,
-            json=Mock(return_value=json_data),
-        )
-        payload = models.GetNewAccessTokenPayload(
-            clientId="test-client-id",
-            clientSecret="test-client-secret",
-            refreshToken="test-refresh-token",
-        )
-        response = get_new_access_token(self.realm, payload)
-
-        self.assertEqual(response.data.accessToken, json_data["access_token"])
-        self.assertEqual(response.data.expiresIn, json_data["expires_in"])
-
-        get_new_access_token_mock.assert_called_with(self.realm, payload)
-        handle_error_response_mock.assert_called_with(
-            get_new_access_token_mock.return_value
-        )
-
-    @patch("app.auth.api.token_instrospect")
-    def test_validate_access_token(self, token_instrospect_mock):
-        """validate_access_token: It is valid and authorized when token is active & has scope"""
-        json_data = {
-            "scope": "first-scope test-scope third-scope",
-            "active": True,
-        }
-        authorization = f"Bearer {self.access_token}"
-        token_instrospect_mock.return_value = Mock(
-            spec=Response,
-            status_code=status.HTTP_200_OK,
-            json=Mock(return_value=json_data),
-        )
-        payload = models.ValidateAccessTokenPayload(
-            clientId="test-client-id",
-            clientSecret="test-client-secret",
-            expectedScope="test-scope",
-        )
-
-        response = validate_access_token(self.realm, authorization, payload)
-
-        self.assertEqual(response.data.isValid, True)
-        self.assertEqual(response.data.isAuthorized, True)
-        self.assertEqual(response.data.expectedScope, payload.expectedScope)
-
-        token_instrospect_mock.assert_called_with(
-            self.realm, self.access_token, payload
-        )
-
-    @patch("app.auth.api.token_instrospect")
-    def test_validate_access_token_invalid(self, token_instrospect_mock):
-        """validate_access_token: It returns invalid when token is not active"""
-        json_data = {
-            "scope": "first-scope test-scope third-scope",
-            "active": False,
-        }
-        authorization = f"Bearer {self.access_token}"
-        token_instrospect_mock.return_value = Mock(
-            spec=Response,
-            status_code=status.HTTP_200_OK,
-            json=Mock(return_value=json_data),
-        )
-        payload = models.ValidateAccessTokenPayload(
-            clientId="test-client-id",
-            clientSecret="test-client-secret",
-            expectedScope="test-scope",
-        )
-
-        response = validate_access_token(self.realm, authorization, payload)
-
-        self.assertEqual(response.data.isValid, False)
-        self.assertEqual(response.data.isAuthorized, True)
-        self.assertEqual(response.data.expectedScope, payload.expectedScope)
-
-        token_instrospect_mock.assert_called_with(
-            self.realm, self.access_token, payload
-        )
-
-    @patch("app.auth.api.token_instrospect")
-    def test_validate_access_token_unathorized(self, token_instrospect_mock):
-        """validate_access_token: It returns unauthorized when the expected scope is not valid"""
-        json_data = {
-            "scope": "first-scope test-scope third-scope",
-            "active": True,
-        }
-        authorization = f"Bearer {self.access_token}"
-        token_instrospect_mock.return_value = Mock(
-            spec=Response,
-            status_code=status.HTTP_200_OK,
-            json=Mock(return_value=json_data),
-        )
-        payload = models.ValidateAccessTokenPayload(
-            clientId="test-client-id",
-            clientSecret="test-client-secret",
-            expectedScope="unknown-scope",
-        )
-
-        response = validate_access_token(self.realm, authorization, payload)
-
-        self.assertEqual(response.data.isValid, True)
-        self.assertEqual(response.data.isAuthorized, False)
-        self.assertEqual(response.data.expectedScope, payload.expectedScope)
-
-        token_instrospect_mock.assert_called_with(
-            self.realm, self.access_token, payload
-        )
-
-    @patch("app.auth.api.token_instrospect")
-    def test_validate_access_token_unexpected_error_handling(
-        self, token_instrospect_mock
-    ):
-        """validate_access_token: It handles unexpected errors properly"""
-        authorization = f"Bearer {self.access_token}"
-        token_instrospect_mock.side_effect = Exception("Unexpected error")
-        payload = models.ValidateAccessTokenPayload(
-            clientId="test-client-id",
-            clientSecret="test-client-secret",
-            expectedScope="unknown-scope",
-        )
-
-        self.assertRaises(
-            exceptions.INTERNAL_SERVER_ERROR.__class__,
-            validate_access_token,
-            self.realm,
-            authorization,
-            payload,
-        )
-
-        token_instrospect_mock.assert_called_with(
-            self.realm, self.access_token, payload
-        )
-
-    @patch("app.auth.handlers.handle_error_response")
+    @patch("app.auth.credentials.handle_error_response")
     @patch("app.auth.api.get_auth_tokens_for_credentials")
     def test_get_auth_tokens_for_credentials(
         self, get_auth_tokens_for_credentials_mock, handle_error_response_mock
@@ -331,97 +157,5 @@ class HandlersTest(unittest.TestCase):
         login_user_mock.assert_called_with(self.realm, payload)
         handle_error_response_mock.assert_called_with(login_user_mock.return_value)
 
-    @patch("app.auth.handlers.handle_error_response")
-    @patch("app.auth.api.logout")
-    def test_logout(self, logout_mock, handle_error_response_mock):
-        """logout: It can get logout an user"""
-        logout_mock.return_value = Mock(
-            spec=Response,
-            status_code=status.HTTP_200_OK,
-            json=Mock(return_value={}),
-        )
-        user_id = "test-user_id"
-        response = logout(self.realm, self.access_token, user_id)
-        self.assertEqual(response.loggedOut, True)
-        logout_mock.assert_called_with(self.realm, self.access_token, user_id)
-        handle_error_response_mock.assert_called_with(logout_mock.return_value)
-
-    @patch("app.auth.handlers.handle_error_response")
-    @patch("app.auth.api.send_reset_password_email")
-    @patch("app.auth.api.get_users_by_email")
-    def test_send_reset_password_email(
-        self,
-        get_users_by_email_mock,
-        send_reset_password_email_mock,
-        handle_error_response_mock
-    ):
-        """send_reset_password_email: It can send a reset pasword email"""
-        user_id = "test-user-id"
-        email = "test-user@test.com"
-        get_users_by_email_mock.return_value = Mock(
-            spec=Response,
-            status_code=status.HTTP_200_OK,
-            json=Mock(return_value=[
-                {
-                    "id": user_id,
-                }
-            ]),
-        )
-        send_reset_password_email_mock.return_value = Mock(
-            spec=Response,
-            status_code=status.HTTP_200_OK,
-            json=Mock(return_value={}),
-        )
-        response = send_reset_password_email(self.realm, self.access_token, email)
-        self.assertEqual(response.emailSent, True)
-        get_users_by_email_mock.assert_called_with(
-            self.realm, self.access_token, email
-        )
-        send_reset_password_email_mock.assert_called_with(
-            self.realm, self.access_token, user_id
-        )
-        handle_error_response_mock.assert_called_with(
-            send_reset_password_email_mock.return_value
-        )
-
-    @patch("app.auth.handlers.handle_error_response")
-    @patch("app.auth.api.token_instrospect")
-    def test_get_user_basic_data(self, token_instrospect_mock, handle_error_response_mock):
-        """get_user_basic_data: It can the user basic data"""
-        json_data = {
-            "sub": "test-user-id",
-            "preferred_username": "test-username",
-            "email": "test-email@test.com",
-            "name": "Test User",
-            "given_name": "Test",
-            "family_name": "User",
-            "active": True,
-            "email_verified": True,
-        }
-
-        token_instrospect_mock.return_value = Mock(
-            spec=Response,
-            status_code=status.HTTP_200_OK,
-            json=Mock(return_value=json_data),
-        )
-        payload = models.UserBasicDataPayload(
-            clientId="test-client-id",
-            clientSecret="test-client-secret",
-        )
-        response = get_user_basic_data(self.realm, self.access_token, payload)
-
-        self.assertEqual(response.data.id, json_data["sub"])
-        self.assertEqual(response.data.username, json_data["preferred_username"])
-        self.assertEqual(response.data.email, json_data["email"])
-        self.assertEqual(response.data.fullName, json_data["name"])
-        self.assertEqual(response.data.firstName, json_data["given_name"])
-        self.assertEqual(response.data.lastName, json_data["family_name"])
-        self.assertEqual(response.data.active, json_data["active"])
-        self.assertEqual(response.data.emailVerified, json_data["email_verified"])
-
-        token_instrospect_mock.assert_called()
-        handle_error_response_mock.assert_called_with(token_instrospect_mock.return_value)
-
-
 if __name__ == "__main__":
     unittest.main()
@@ -3,6 +3,8 @@
 
 from fastapi import status
 from requests import Response
+from . import models
+from .. import constants
 from .. import exceptions
 
 
@@ -31,3 +33,105 @@ def handle_error_response(response: Response) -> None:
 
     if response.status_code > status.HTTP_403_FORBIDDEN:
         raise exceptions.INTERNAL_SERVER_ERROR
+
+
+def get_access_token(authorization: str) -> str:
+    """Gets the access token from an authorization header value
+
+    Args:
+        authorization (str): The authorization header value
+
+    Returns:
+        str: The access token
+    """
+    return authorization.replace(constants.BEARER_PORTION, constants.EMPTY_VALUE)
+
+
+def to_get_tokens_response(data: dict) -> models.GetTokensResponse:
+    """Maps the auth API tokens data to the get tokens response
+
+    Args:
+        data (dict): The auth API tokens data
+
+    Returns:
+        models.GetTokensResponse: The authorization tokens information
+    """
+    return models.GetTokensResponse(
+        data=models.GetTokensResponseData(
+            accessToken=data.get("access_token"),
+            refreshToken=data.get("refresh_token"),
+            expiresIn=data.get("expires_in"),
+            refreshExpiresIn=data.get("refresh_expires_in"),
+        )
+    )
+
+
+def to_get_new_access_token_response(data: dict) -> models.GetNewAccessTokenResponse:
+    """Maps the auth API tokens data to the new access token response
+
+    Args:
+        data (dict): The auth API tokens data
+
+    Returns:
+        models.GetNewAccessTokenResponse: The new access token data
+    """
+    return models.GetNewAccessTokenResponse(
+        data=models.GetNewAccessTokenResponseData(
+            accessToken=data.get("access_token"),
+            expiresIn=data.get("expires_in"),
+        )
+    )
+
+
+def to_validate_access_token_response(
+    data: dict, expected_scope: str
+) -> models.ValidateAccessTokenResponse:
+    """Maps the token instrospection data to the validate access token response
+
+    Args:
+        data (dict): The token instrospection data
+        expected_scope (str): The scope the token is expected to have
+
+    Returns:
+        models.ValidateAccessTokenResponse: The token validation data
+    """
+    is_valid = data.get(constants.ACTIVE_PROPERTY) is True
+    scopes = data.get(constants.SCOPE_PROPERTY, constants.EMPTY_VALUE).split(
+        constants.SCOPES_SEPARATOR
+    )
+    return models.ValidateAccessTokenResponse(
+        data=models.ValidateAccessTokenResponseData(
+            isValid=is_valid,
+            isAuthorized=expected_scope in scopes,
+            expectedScope=expected_scope,
+        )
+    )
+
+
+def to_user_basic_data_response(data: dict) -> models.UserBasicDataResponse:
+    """Maps the token instrospection data to the user basic data response
+
+    Args:
+        data (dict): The token instrospection data
+
+    Raises:
+        HTTPException: Authorization error when the token is not active
+
+    Returns:
+        models.UserBasicDataResponse: The user data
+    """
+    if data.get(constants.ACTIVE_PROPERTY) is not True:
+        raise exceptions.UNAUTHORIZED_ERROR
+
+    return models.UserBasicDataResponse(
+        data=models.UserBasicData(
+            id=data.get("sub", constants.EMPTY_VALUE),
+            username=data.get("preferred_username", constants.EMPTY_VALUE),
+            email=data.get("email", constants.EMPTY_VALUE),
+            fullName=data.get("name", constants.EMPTY_VALUE),
+            firstName=data.get("given_name", constants.EMPTY_VALUE),
+            lastName=data.get("family_name", constants.EMPTY_VALUE),
+            active=data.get("active", False),
+            emailVerified=data.get("email_verified", False),
+        )
+    )
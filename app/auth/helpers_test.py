@@ -5,7 +5,13 @@ import unittest
 from unittest.mock import Mock, patch
 from fastapi import status, HTTPException
 from requests import Response
-from .helpers import handle_error_response
+from .helpers import (
+    handle_error_response,
+    get_access_token,
+    to_validate_access_token_response,
+    to_user_basic_data_response,
+)
+from .. import exceptions
 
 
 class AuthHelpersTest(unittest.TestCase):
@@ -82,3 +88,26 @@ class AuthHelpersTest(unittest.TestCase):
         )
         self.assertRaises(HTTPException, handle_error_response, response_mock)
         get_validation_error_mock.assert_not_called()
+
+    def test_get_access_token(self):
+        """get_access_token: It removes the bearer portion from the authorization"""
+        self.assertEqual(get_access_token("Bearer test-token"), "test-token")
+        self.assertEqual(get_access_token("test-token"), "test-token")
+
+    def test_to_validate_access_token_response(self):
+        """to_validate_access_token_response: It maps the activity and scopes of the token"""
+        data = {"active": True, "scope": "email test-scope"}
+        response = to_validate_access_token_response(data, "test-scope")
+        self.assertTrue(response.data.isValid)
+        self.assertTrue(response.data.isAuthorized)
+        response = to_validate_access_token_response({}, "test-scope")
+        self.assertFalse(response.data.isValid)
+        self.assertFalse(response.data.isAuthorized)
+
+    def test_to_user_basic_data_response_inactive(self):
+        """to_user_basic_data_response: It fails when the token is not active"""
+        self.assertRaises(
+            exceptions.UNAUTHORIZED_ERROR.__class__,
+            to_user_basic_data_response,
+            {"active": False},
+        )
@@ -1,7 +1,9 @@
 """Auth API models
 """
 
-from pydantic import BaseModel
+from typing import List, Optional
+from pydantic import BaseModel, conlist
+from . import constants
 
 
 class GetTokensPayload(BaseModel):
@@ -172,6 +174,43 @@ class ValidateAccessTokenResponse(BaseModel):
     data: ValidateAccessTokenResponseData
 
 
+class AccessTokenToValidate(BaseModel):
+    """Access Token To Validate data
+
+    Args:
+        BaseModel (class): Base model class
+    """
+
+    token: str
+    expectedScope: str
+
+
+class ValidateAccessTokensBatchPayload(BaseModel):
+    """Validate Access Tokens Batch Payload data
+
+    Args:
+        BaseModel (class): Base model class
+    """
+
+    clientId: str
+    clientSecret: str
+    tokens: conlist(
+        AccessTokenToValidate,
+        min_items=1,
+        max_items=constants.VALIDATE_ACCESS_TOKENS_BATCH_MAX_SIZE,
+    )
+
+
+class ValidateAccessTokensBatchResponse(BaseModel):
+    """Validate Access Tokens Batch Response
+
+    Args:
+        BaseModel (class): Base model class
+    """
+
+    data: List[ValidateAccessTokenResponseData]
+
+
 class GetTokensForCredentialsPayload(BaseModel):
     """Get Tokens for credentials Payload
 
@@ -192,7 +231,7 @@ class GetTokensForCredentialsResponseData(BaseModel):
     """
 
     accessToken: str
-    expiresIn: int
+    expiresIn: Optional[int]
 
 
 class GetTokensForCredentialsResponse(BaseModel):
@@ -0,0 +1,228 @@
+"""Auth API upstream retries and hedged requests
+"""
+
+import asyncio
+import random
+import threading
+import time
+import typing
+from collections import deque
+import httpx
+from .. import environment
+from . import constants as auth_consts
+from . import timeouts
+
+
+ASYNC_RETRYABLE_ERRORS = (httpx.TransportError,)
+
+
+class RetryBudget:
+    """Budget limiting the retries to a ratio of the calls
+
+    Every call deposits the configured ratio and every retry or hedged request
+    withdraws a whole one, so during an outage the extra load stays within the
+    ratio once the burst reserve is spent.
+    """
+
+    def __init__(self):
+        self.balance = float(environment.retry_budget_burst)
+        self.lock = threading.Lock()
+
+    def deposit(self) -> None:
+        """Deposits the share of a new call"""
+        with self.lock:
+            self.balance = min(
+                self.balance + environment.retry_budget_ratio,
+                environment.retry_budget_burst,
+            )
+
+    def try_spend(self) -> bool:
+        """Withdraws a retry from the budget when there is one left
+
+        Returns:
+            bool: True when the retry can be made
+        """
+        with self.lock:
+            if self.balance < 1:
+                return False
+            self.balance -= 1
+            return True
+
+
+class LatencyTracker:
+    """Latencies of the latest successful calls of an operation"""
+
+    def __init__(self):
+        self.samples = deque(maxlen=auth_consts.HEDGING_LATENCY_SAMPLES)
+
+    def record(self, duration: float) -> None:
+        """Records the latency of a call
+
+        Args:
+            duration (float): The call duration in seconds
+        """
+        self.samples.append(duration)
+
+    def get_percentile(self, percentile: float) -> typing.Optional[float]:
+        """Gets a latency percentile of the latest calls
+
+        Args:
+            percentile (float): The percentile, between 0 and 1
+
+        Returns:
+            typing.Optional[float]: The latency or None without enough samples
+        """
+        samples = sorted(self.samples)
+        if len(samples) < auth_consts.HEDGING_MIN_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * percentile))]
+
+
+retry_budget = RetryBudget()
+
+
+def get_backoff_delay(attempt: int) -> float:
+    """Gets the delay before a retry with capped exponential backoff and full jitter
+
+    Args:
+        attempt (int): The number of the failed attempt, starting at 0
+
+    Returns:
+        float: The delay in seconds
+    """
+    ceiling = min(
+        environment.retry_max_delay, environment.retry_base_delay * 2**attempt
+    )
+    return random.uniform(0, ceiling)
+
+
+def can_retry(attempt: int, delay: float) -> bool:
+    """Checks if a failed attempt can be retried after the given delay
+
+    Args:
+        attempt (int): The number of the failed attempt, starting at 0
+        delay (float): The delay before the retry in seconds
+
+    Returns:
+        bool: True when the attempts, the request deadline and the retry
+        budget allow another attempt
+    """
+    if attempt + 1 >= environment.retry_max_attempts:
+        return False
+    remaining = timeouts.get_remaining_budget()
+    if remaining is not None and remaining <= delay:
+        return False
+    return retry_budget.try_spend()
+
+
+def is_retryable_response(response: typing.Any) -> bool:
+    """Checks if an upstream response is worth retrying
+
+    Args:
+        response (typing.Any): The upstream response
+
+    Returns:
+        bool: True for gateway errors and unavailable upstreams
+    """
+    return response.status_code in auth_consts.RETRYABLE_STATUS_CODES
+
+
+async def async_call(
+    operation: str, func: typing.Callable[..., typing.Awaitable], *args, **kwargs
+) -> typing.Any:
+    """Calls an idempotent upstream operation retrying transient failures
+
+    The timeouts of every attempt are computed right before it, so retries
+    never outlive the request deadline.
+
+    Args:
+        operation (str): The upstream operation
+        func (typing.Callable[..., typing.Awaitable]): The coroutine function making the call
+
+    Returns:
+        typing.Any: The upstream response
+    """
+    retry_budget.deposit()
+    attempt = 0
+    while True:
+        try:
+            response = await func(
+                *args, timeout=timeouts.get_async_timeout(operation), **kwargs
+            )
+        except ASYNC_RETRYABLE_ERRORS:
+            delay = get_backoff_delay(attempt)
+            if not can_retry(attempt, delay):
+                raise
+        else:
+            if not is_retryable_response(response):
+                return response
+            delay = get_backoff_delay(attempt)
+            if not can_retry(attempt, delay):
+                return response
+        await asyncio.sleep(delay)
+        attempt += 1
+
+
+def get_hedging_delay(latencies: LatencyTracker) -> typing.Optional[float]:
+    """Gets how long to wait for a call before hedging it
+
+    Args:
+        latencies (LatencyTracker): The latencies of the operation
+
+    Returns:
+        typing.Optional[float]: The delay in seconds or None when hedging is off
+    """
+    if not environment.introspection_hedging:
+        return None
+    return latencies.get_percentile(auth_consts.HEDGING_PERCENTILE)
+
+
+async def async_hedged_call(
+    latencies: LatencyTracker,
+    func: typing.Callable[..., typing.Awaitable],
+    *args,
+    **kwargs,
+) -> typing.Any:
+    """Calls an idempotent upstream operation hedging slow calls
+
+    When the call has not answered by the latency percentile of the operation,
+    a second one is sent if the retry budget allows it, and the first
+    successful reply wins while the other one is cancelled.
+
+    Args:
+        latencies (LatencyTracker): The latencies of the operation
+        func (typing.Callable[..., typing.Awaitable]): The coroutine function making the call
+
+    Returns:
+        typing.Any: The function result
+    """
+
+    async def timed():
+        started_at = time.monotonic()
+        result = await func(*args, **kwargs)
+        latencies.record(time.monotonic() - started_at)
+        return result
+
+    delay = get_hedging_delay(latencies)
+    if delay is None:
+        return await timed()
+
+    done, pending = await asyncio.wait({asyncio.ensure_future(timed())}, timeout=delay)
+    try:
+        if not done and retry_budget.try_spend():
+            pending.add(asyncio.ensure_future(timed()))
+
+        error = None
+        while True:
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+            if not pending:
+                raise error
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,166 @@
+"""Auth API upstream retries and hedged requests tests
+"""
+
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, Mock, patch
+import httpx
+from fastapi import status
+from . import retries
+
+
+mock_environment = Mock(
+    retry_max_attempts=3,
+    retry_base_delay=0.05,
+    retry_max_delay=1,
+    retry_budget_ratio=0.5,
+    retry_budget_burst=2,
+    introspection_hedging=True,
+)
+TIMEOUT = (3, 10)
+
+
+def get_latencies(latency: float) -> retries.LatencyTracker:
+    """Gets a latency tracker full of the same latency"""
+    latencies = retries.LatencyTracker()
+    for _ in range(20):
+        latencies.record(latency)
+    return latencies
+
+
+@patch("app.auth.retries.environment", mock_environment)
+class RetriesTest(unittest.TestCase):
+    """Retries functions tests"""
+
+    def setUp(self):
+        with patch("app.auth.retries.environment", mock_environment):
+            retries.retry_budget = retries.RetryBudget()
+
+    def test_retry_budget(self):
+        """RetryBudget: It allows the burst and then a ratio of the calls"""
+        budget = retries.retry_budget
+        self.assertTrue(budget.try_spend())
+        self.assertTrue(budget.try_spend())
+        self.assertFalse(budget.try_spend())
+        budget.deposit()
+        self.assertFalse(budget.try_spend())
+        budget.deposit()
+        self.assertTrue(budget.try_spend())
+
+    def test_get_backoff_delay(self):
+        """get_backoff_delay: It draws the delay up to a capped exponential ceiling"""
+        with patch("app.auth.retries.random.uniform") as uniform_mock:
+            retries.get_backoff_delay(0)
+            uniform_mock.assert_called_with(0, 0.05)
+            retries.get_backoff_delay(2)
+            uniform_mock.assert_called_with(0, 0.2)
+            retries.get_backoff_delay(10)
+            uniform_mock.assert_called_with(0, 1)
+
+    def test_latency_tracker(self):
+        """LatencyTracker: It gets percentiles once it has enough samples"""
+        latencies = retries.LatencyTracker()
+        latencies.record(1)
+        self.assertIsNone(latencies.get_percentile(0.95))
+        for latency in range(100):
+            latencies.record(latency / 100)
+        self.assertEqual(latencies.get_percentile(0.95), 0.95)
+
+@patch("app.auth.retries.environment", mock_environment)
+class AsyncRetriesTest(unittest.IsolatedAsyncioTestCase):
+    """Retries asyncio functions tests"""
+
+    def setUp(self):
+        with patch("app.auth.retries.environment", mock_environment):
+            retries.retry_budget = retries.RetryBudget()
+
+    @patch("app.auth.retries.asyncio.sleep", new_callable=AsyncMock)
+    @patch("app.auth.retries.timeouts.get_async_timeout")
+    async def test_async_call(self, get_async_timeout_mock, sleep_mock):
+        """async_call: It retries transport errors"""
+        response = Mock(status_code=status.HTTP_200_OK)
+        func = AsyncMock(side_effect=[httpx.ConnectError("Refused"), response])
+        self.assertEqual(await retries.async_call("token", func, "url"), response)
+        func.assert_awaited_with("url", timeout=get_async_timeout_mock.return_value)
+        sleep_mock.assert_awaited_once()
+
+    @patch("app.auth.retries.asyncio.sleep", new_callable=AsyncMock)
+    @patch("app.auth.retries.timeouts.get_async_timeout", Mock(return_value=TIMEOUT))
+    async def test_async_call_retryable_response(self, sleep_mock):
+        """async_call: It retries gateway errors up to the maximum attempts"""
+        response = Mock(status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+        func = AsyncMock(return_value=response)
+        self.assertEqual(await retries.async_call("introspect", func, "url"), response)
+        self.assertEqual(func.await_count, 3)
+        self.assertEqual(sleep_mock.await_count, 2)
+
+    @patch("app.auth.retries.asyncio.sleep", new_callable=AsyncMock)
+    @patch("app.auth.retries.timeouts.get_async_timeout", Mock(return_value=TIMEOUT))
+    async def test_async_call_not_retryable(self, sleep_mock):
+        """async_call: It does not retry client errors"""
+        func = AsyncMock(return_value=Mock(status_code=status.HTTP_401_UNAUTHORIZED))
+        await retries.async_call("introspect", func, "url")
+        func.assert_awaited_once()
+        func = AsyncMock(side_effect=ValueError("Unexpected"))
+        with self.assertRaises(ValueError):
+            await retries.async_call("introspect", func, "url")
+        func.assert_awaited_once()
+        sleep_mock.assert_not_awaited()
+
+    @patch("app.auth.retries.asyncio.sleep", new_callable=AsyncMock)
+    @patch("app.auth.retries.timeouts.get_async_timeout", Mock(return_value=TIMEOUT))
+    async def test_async_call_budget_exhausted(self, _):
+        """async_call: It stops retrying once the retry budget is spent"""
+        func = AsyncMock(side_effect=httpx.ReadTimeout("Timeout"))
+        for expected_calls in [3, 1, 2]:
+            func.reset_mock()
+            with self.assertRaises(httpx.ReadTimeout):
+                await retries.async_call("introspect", func, "url")
+            self.assertEqual(func.await_count, expected_calls)
+
+    @patch("app.auth.retries.timeouts.get_async_timeout", Mock(return_value=TIMEOUT))
+    async def test_async_call_deadline(self):
+        """async_call: It does not retry past the request deadline"""
+        func = AsyncMock(side_effect=httpx.ConnectError("Refused"))
+        with patch("app.auth.retries.timeouts.get_remaining_budget", return_value=0):
+            with self.assertRaises(httpx.ConnectError):
+                await retries.async_call("introspect", func, "url")
+        func.assert_awaited_once()
+
+    async def test_async_hedged_call(self):
+        """async_hedged_call: It takes the first reply and cancels the slow call"""
+        response = Mock(status_code=status.HTTP_200_OK)
+        cancelled = asyncio.Event()
+
+        async def func(url):
+            if not func.calls:
+                func.calls.append(url)
+                try:
+                    await asyncio.sleep(1)
+                except asyncio.CancelledError:
+                    cancelled.set()
+                    raise
+            return response
+
+        func.calls = []
+        result = await retries.async_hedged_call(get_latencies(0.01), func, "url")
+        self.assertEqual(result, response)
+        await asyncio.wait_for(cancelled.wait(), 1)
+
+    async def test_async_hedged_call_disabled(self):
+        """async_hedged_call: It makes a single call without enough latency samples"""
+        func = AsyncMock(return_value=Mock(status_code=status.HTTP_200_OK))
+        latencies = retries.LatencyTracker()
+        await retries.async_hedged_call(latencies, func, "url")
+        func.assert_awaited_once_with("url")
+        self.assertEqual(len(latencies.samples), 1)
+
+    async def test_async_hedged_call_error(self):
+        """async_hedged_call: It raises the error when every call fails"""
+        func = AsyncMock(side_effect=httpx.ConnectError("Refused"))
+        with self.assertRaises(httpx.ConnectError):
+            await retries.async_hedged_call(get_latencies(0.01), func, "url")
+
+
+if __name__ == "__main__":
+    unittest.main()
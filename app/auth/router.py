@@ -2,36 +2,52 @@
 """
 
 from fastapi import APIRouter, Depends, Header
+from . import admission
+from . import audit
+from . import bulkheads
 from . import handlers
+from . import async_handlers
 from . import models
 from . import constants
 from .. import helpers
+from .. import rate_limits
 from .. import responses
+from .. import tracing
 
 
-router = APIRouter()
+router = APIRouter(route_class=tracing.TracedRoute)
 
 
 @router.post(
     constants.DEVICE_ROUTE_PATH,
-    dependencies=[Depends(helpers.validate_api_access)],
+    dependencies=[
+        Depends(helpers.validate_api_access),
+        Depends(rate_limits.rate_limit(constants.AUTHORIZE_DEVICE_OPERATION_ID)),
+        Depends(admission.admit(constants.AUTHORIZE_DEVICE_OPERATION_ID)),
+    ],
     tags=constants.TAGS,
     operation_id=constants.AUTHORIZE_DEVICE_OPERATION_ID,
     response_model=models.AuthorizeDeviceResponse,
     responses=responses.responses_descriptions,
 )
-def authorize_device(
+async def authorize_device(
     payload: models.AuthorizeDevicePayload,
     application: str = Header(..., convert_underscores=False),
 ) -> models.AuthorizeDeviceResponse:
     """Authorize a device to an application in context
     """
-    return handlers.authorize_device(application, payload)
+    return await bulkheads.token_bulkhead.run(
+        handlers.authorize_device, application, payload
+    )
 
 
 @router.post(
     constants.TOKENS_ROUTE_PATH,
-    dependencies=[Depends(helpers.validate_api_access)],
+    dependencies=[
+        Depends(helpers.validate_api_access),
+        Depends(rate_limits.rate_limit(constants.GET_AUTH_TOKENS_OPERATION_ID)),
+        Depends(admission.admit(constants.GET_AUTH_TOKENS_OPERATION_ID)),
+    ],
     tags=constants.TAGS,
     operation_id=constants.GET_AUTH_TOKENS_OPERATION_ID,
     response_model=models.GetTokensResponse,
@@ -43,12 +59,16 @@ async def get_auth_tokens(
 ) -> models.GetTokensResponse:
     """Gets the authorization tokens for the given device code and application in context
     """
-    return handlers.get_auth_tokens(application, payload)
+    return await async_handlers.get_auth_tokens(application, payload)
 
 
 @router.post(
     constants.TOKEN_REFRESH_ROUTE_PATH,
-    dependencies=[Depends(helpers.validate_api_access)],
+    dependencies=[
+        Depends(helpers.validate_api_access),
+        Depends(rate_limits.rate_limit(constants.GET_NEW_ACCESS_TOKEN_OPERATION_ID)),
+        Depends(admission.admit(constants.GET_NEW_ACCESS_TOKEN_OPERATION_ID)),
+    ],
     tags=constants.TAGS,
     operation_id=constants.GET_NEW_ACCESS_TOKEN_OPERATION_ID,
     response_model=models.GetNewAccessTokenResponse,
@@ -60,12 +80,16 @@ async def get_new_access_token(
 ) -> models.GetNewAccessTokenResponse:
     """Gets a new access token for the given refresh token and application in context
     """
-    return handlers.get_new_access_token(application, payload)
+    return await async_handlers.get_new_access_token(application, payload)
 
 
 @router.post(
     constants.TOKEN_VALIDATE_ROUTE_PATH,
-    dependencies=[Depends(helpers.validate_api_access)],
+    dependencies=[
+        Depends(helpers.validate_api_access),
+        Depends(rate_limits.rate_limit(constants.VALIDATE_ACCESS_TOKEN_OPERATION_ID)),
+        Depends(admission.admit(constants.VALIDATE_ACCESS_TOKEN_OPERATION_ID)),
+    ],
     tags=constants.TAGS,
     operation_id=constants.VALIDATE_ACCESS_TOKEN_OPERATION_ID,
     response_model=models.ValidateAccessTokenResponse,
@@ -78,12 +102,37 @@ async def validate_access_token(
 ) -> models.ValidateAccessTokenResponse:
     """Validates a token checking if it has not expired and has the required scope
     """
-    return handlers.validate_access_token(application, authorization, payload)
+    return await async_handlers.validate_access_token(application, authorization, payload)
+
+
+@router.post(
+    constants.TOKEN_VALIDATE_BATCH_ROUTE_PATH,
+    dependencies=[
+        Depends(helpers.validate_api_access),
+        Depends(rate_limits.rate_limit(constants.VALIDATE_ACCESS_TOKENS_BATCH_OPERATION_ID)),
+        Depends(admission.admit(constants.VALIDATE_ACCESS_TOKENS_BATCH_OPERATION_ID)),
+    ],
+    tags=constants.TAGS,
+    operation_id=constants.VALIDATE_ACCESS_TOKENS_BATCH_OPERATION_ID,
+    response_model=models.ValidateAccessTokensBatchResponse,
+    responses=responses.responses_descriptions,
+)
+async def validate_access_tokens_batch(
+    payload: models.ValidateAccessTokensBatchPayload,
+    application: str = Header(..., convert_underscores=False),
+) -> models.ValidateAccessTokensBatchResponse:
+    """Validates a batch of tokens checking if they have not expired and have the required scope
+    """
+    return await async_handlers.validate_access_tokens_batch(application, payload)
 
 
 @router.post(
     constants.USER_BASIC_DATA_PATH,
-    dependencies=[Depends(helpers.validate_api_access)],
+    dependencies=[
+        Depends(helpers.validate_api_access),
+        Depends(rate_limits.rate_limit(constants.GET_USER_BASIC_DATA_OPERATION_ID)),
+        Depends(admission.admit(constants.GET_USER_BASIC_DATA_OPERATION_ID)),
+    ],
     tags=constants.TAGS,
     operation_id=constants.GET_USER_BASIC_DATA_OPERATION_ID,
     response_model=models.UserBasicDataResponse,
@@ -95,61 +144,89 @@ async def get_user_basic_data(
     authorization: str = Header(..., convert_underscores=False),
 ) -> models.UserBasicDataResponse:
     """Gets the user basic data for the authorization token"""
-    return handlers.get_user_basic_data(application, authorization, payload)
+    return await async_handlers.get_user_basic_data(application, authorization, payload)
 
 
 @router.post(
     constants.TOKENS_FOR_CREDENTIALS_ROUTE_PATH,
-    dependencies=[Depends(helpers.validate_api_access)],
+    dependencies=[
+        Depends(helpers.validate_api_access),
+        Depends(rate_limits.rate_limit(constants.TOKENS_FOR_CREDENTIALS_OPERATION_ID)),
+        Depends(admission.admit(constants.TOKENS_FOR_CREDENTIALS_OPERATION_ID)),
+    ],
     tags=constants.TAGS,
     operation_id=constants.TOKENS_FOR_CREDENTIALS_OPERATION_ID,
     response_model=models.GetTokensForCredentialsResponse,
     responses=responses.responses_descriptions,
 )
-def get_auth_tokens_for_credentials(
+async def get_auth_tokens_for_credentials(
     payload: models.GetTokensForCredentialsPayload,
     application: str = Header(..., convert_underscores=False),
 ) -> models.GetTokensForCredentialsResponse:
     """Gets the authorization tokens for the credentials and realm in context"""
-    return handlers.get_auth_tokens_for_credentials(application, payload)
+    return await bulkheads.token_bulkhead.run(
+        handlers.get_auth_tokens_for_credentials, application, payload
+    )
 
 
 @router.post(
     constants.REGISTER_ROUTE_PATH,
-    dependencies=[Depends(helpers.validate_api_access)],
+    dependencies=[
+        Depends(helpers.validate_api_access),
+        Depends(rate_limits.rate_limit(constants.REGISTER_USER_OPERATION_ID)),
+        Depends(admission.admit(constants.REGISTER_USER_OPERATION_ID)),
+    ],
     tags=constants.TAGS,
     operation_id=constants.REGISTER_USER_OPERATION_ID,
     response_model=models.RegisterUserResponse,
     responses=responses.responses_descriptions,
 )
-def register_new_user(
+async def register_new_user(
     payload: models.RegisterUserPayload,
     application: str = Header(..., convert_underscores=False),
     authorization: str = Header(..., convert_underscores=False),
 ) -> models.RegisterUserResponse:
     """Registers a new user"""
-    return handlers.register_new_user(application, authorization, payload)
+    async with audit.audit(
+        constants.REGISTER_USER_OPERATION_ID, application, payload.username
+    ):
+        return await bulkheads.admin_bulkhead.run(
+            handlers.register_new_user, application, authorization, payload
+        )
 
 
 @router.post(
     constants.LOGIN_ROUTE_PATH,
-    dependencies=[Depends(helpers.validate_api_access)],
+    dependencies=[
+        Depends(helpers.validate_api_access),
+        Depends(rate_limits.rate_limit(constants.LOGIN_USER_OPERATION_ID)),
+        Depends(admission.admit(constants.LOGIN_USER_OPERATION_ID)),
+    ],
     tags=constants.TAGS,
     operation_id=constants.LOGIN_USER_OPERATION_ID,
     response_model=models.LoginUserResponse,
     responses=responses.responses_descriptions,
 )
-def login_user(
+async def login_user(
     payload: models.LoginUserPayload,
     application: str = Header(..., convert_underscores=False),
 ) -> models.LoginUserResponse:
     """Logs in an user"""
-    return handlers.login_user(application, payload)
+    async with audit.audit(
+        constants.LOGIN_USER_OPERATION_ID, application, payload.username
+    ):
+        return await bulkheads.token_bulkhead.run(
+            handlers.login_user, application, payload
+        )
 
 
 @router.post(
     "/{user_id}/logout",
-    dependencies=[Depends(helpers.validate_api_access)],
+    dependencies=[
+        Depends(helpers.validate_api_access),
+        Depends(rate_limits.rate_limit(constants.LOGOUT_OPERATION_ID)),
+        Depends(admission.admit(constants.LOGOUT_OPERATION_ID)),
+    ],
     tags=constants.TAGS,
     operation_id=constants.LOGOUT_OPERATION_ID,
     response_model=models.LogoutResponse,
@@ -161,12 +238,17 @@ async def logout(
     authorization: str = Header(..., convert_underscores=False),
 ) -> models.LogoutResponse:
     """Logs out an existing user"""
-    return handlers.logout(application, authorization, user_id)
+    async with audit.audit(constants.LOGOUT_OPERATION_ID, application, user_id):
+        return await async_handlers.logout(application, authorization, user_id)
 
 
 @router.put(
     constants.AUTH_RESET_PASSWORD_EMAIL,
-    dependencies=[Depends(helpers.validate_api_access)],
+    dependencies=[
+        Depends(helpers.validate_api_access),
+        Depends(rate_limits.rate_limit(constants.SEND_RESET_PASSWORD_EMAIL)),
+        Depends(admission.admit(constants.SEND_RESET_PASSWORD_EMAIL)),
+    ],
     tags=constants.TAGS,
     operation_id=constants.SEND_RESET_PASSWORD_EMAIL,
     response_model=models.SendResetPasswordEmailResponse,
@@ -178,4 +260,7 @@ async def send_reset_password_email(
     authorization: str = Header(..., convert_underscores=False),
 ) -> models.SendResetPasswordEmailResponse:
     """Sends an email to reset the user password"""
-    return handlers.send_reset_password_email(application, authorization, email)
+    async with audit.audit(constants.SEND_RESET_PASSWORD_EMAIL, application, email):
+        return await async_handlers.send_reset_password_email(
+            application, authorization, email
+        )
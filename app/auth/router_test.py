@@ -2,10 +2,11 @@
 """
 
 import unittest
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 from fastapi import status
 from fastapi.testclient import TestClient
 from .. import main, constants
+from ..rate_limits import MemoryBackend
 from . import models
 from . import constants as auth_constants
 
@@ -31,6 +32,7 @@ class RouterTest(unittest.TestCase):
         """authorize_device: It can authorize a device"""
         environment_mock.allowed_api_keys = self.api_key
         environment_mock.allowed_ip_adresses = self.host
+        environment_mock.api_keys = ""
 
         auth_device_mock.return_value = models.AuthorizeDeviceResponse(
             data=models.AuthorizeDeviceResponseData(
@@ -57,11 +59,12 @@ class RouterTest(unittest.TestCase):
         auth_device_mock.assert_called_with(self.application, payload)
 
     @patch("app.helpers.environment")
-    @patch("app.auth.handlers.get_auth_tokens")
+    @patch("app.auth.async_handlers.get_auth_tokens")
     def test_get_auth_tokens(self, get_auth_tokens_mock, environment_mock):
         """get_auth_tokens: It can retrieve access tokens"""
         environment_mock.allowed_api_keys = self.api_key
         environment_mock.allowed_ip_adresses = self.host
+        environment_mock.api_keys = ""
 
         get_auth_tokens_mock.return_value = models.GetTokensResponse(
             data=models.GetTokensResponseData(
@@ -86,11 +89,12 @@ class RouterTest(unittest.TestCase):
         get_auth_tokens_mock.assert_called_with(self.application, payload)
 
     @patch("app.helpers.environment")
-    @patch("app.auth.handlers.get_new_access_token")
+    @patch("app.auth.async_handlers.get_new_access_token")
     def test_get_new_access_token(self, get_new_access_token_mock, environment_mock):
         """get_new_access_token: It can get a new access token"""
         environment_mock.allowed_api_keys = self.api_key
         environment_mock.allowed_ip_adresses = self.host
+        environment_mock.api_keys = ""
 
         get_new_access_token_mock.return_value = models.GetNewAccessTokenResponse(
             data=models.GetNewAccessTokenResponseData(
@@ -113,11 +117,12 @@ class RouterTest(unittest.TestCase):
         get_new_access_token_mock.assert_called_with(self.application, payload)
 
     @patch("app.helpers.environment")
-    @patch("app.auth.handlers.validate_access_token")
+    @patch("app.auth.async_handlers.validate_access_token")
     def test_validate_access_token(self, validate_access_token_mock, environment_mock):
         """get_new_access_token: It can get a new access token"""
         environment_mock.allowed_api_keys = self.api_key
         environment_mock.allowed_ip_adresses = self.host
+        environment_mock.api_keys = ""
 
         validate_access_token_mock.return_value = models.ValidateAccessTokenResponse(
             data=models.ValidateAccessTokenResponseData(
@@ -142,6 +147,98 @@ class RouterTest(unittest.TestCase):
             self.application, self.authorization, payload
         )
 
+    @patch(
+        "app.rate_limits.environment",
+        Mock(
+            rate_limits={auth_constants.VALIDATE_ACCESS_TOKEN_OPERATION_ID: 1.0},
+            rate_limit_default=0.0,
+            rate_limit_burst=1.0,
+        ),
+    )
+    @patch("app.rate_limits.backend", MemoryBackend(100))
+    @patch("app.helpers.environment")
+    @patch("app.auth.async_handlers.validate_access_token")
+    def test_validate_access_token_rate_limited(
+        self, validate_access_token_mock, environment_mock
+    ):
+        """validate_access_token: It rejects the requests over the rate limit"""
+        environment_mock.allowed_api_keys = self.api_key
+        environment_mock.allowed_ip_adresses = self.host
+        environment_mock.api_keys = ""
+
+        validate_access_token_mock.return_value = models.ValidateAccessTokenResponse(
+            data=models.ValidateAccessTokenResponseData(
+                isValid=True,
+                isAuthorized=True,
+                expectedScope="test-expected-scope",
+            ),
+        )
+        payload = models.ValidateAccessTokenPayload(
+            clientId="test-client-id",
+            clientSecret="test-client-secret",
+            expectedScope="test-scope",
+        )
+        responses = [
+            self.client.post(
+                f"{constants.AUTH_ROUTE_PREFIX}/token/validate",
+                headers=self.headers,
+                json=payload.dict(),
+            )
+            for _ in range(2)
+        ]
+        self.assertEqual(responses[0].status_code, status.HTTP_200_OK)
+        self.assertEqual(responses[1].status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(responses[1].headers["retry-after"], "1")
+        self.assertEqual(responses[1].json()["code"], "TOO_MANY_REQUESTS")
+        validate_access_token_mock.assert_called_once()
+
+    @patch("app.helpers.environment")
+    @patch("app.auth.async_handlers.validate_access_tokens_batch")
+    def test_validate_access_tokens_batch(self, validate_batch_mock, environment_mock):
+        """validate_access_tokens_batch: It can validate a batch of tokens"""
+        environment_mock.allowed_api_keys = self.api_key
+        environment_mock.allowed_ip_adresses = self.host
+        environment_mock.api_keys = ""
+
+        validate_batch_mock.return_value = models.ValidateAccessTokensBatchResponse(
+            data=[
+                models.ValidateAccessTokenResponseData(
+                    isValid=True, isAuthorized=False, expectedScope="test-scope"
+                ),
+            ],
+        )
+        payload = models.ValidateAccessTokensBatchPayload(
+            clientId="test-client-id",
+            clientSecret="test-client-secret",
+            tokens=[{"token": "test-token", "expectedScope": "test-scope"}],
+        )
+        response = self.client.post(
+            f"{constants.AUTH_ROUTE_PREFIX}/token/validate/batch",
+            headers=self.headers,
+            json=payload.dict(),
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), validate_batch_mock.return_value)
+        validate_batch_mock.assert_called_with(self.application, payload)
+
+    @patch("app.helpers.environment")
+    def test_validate_access_tokens_batch_too_large(self, environment_mock):
+        """validate_access_tokens_batch: It rejects batches over the maximum size"""
+        environment_mock.allowed_api_keys = self.api_key
+        environment_mock.allowed_ip_adresses = self.host
+        environment_mock.api_keys = ""
+        token = {"token": "test-token", "expectedScope": "test-scope"}
+        response = self.client.post(
+            f"{constants.AUTH_ROUTE_PREFIX}/token/validate/batch",
+            headers=self.headers,
+            json={
+                "clientId": "test-client-id",
+                "clientSecret": "test-client-secret",
+                "tokens": [token] * (auth_constants.VALIDATE_ACCESS_TOKENS_BATCH_MAX_SIZE + 1),
+            },
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     @patch("app.helpers.environment")
     @patch("app.auth.handlers.get_auth_tokens_for_credentials")
     def test_get_auth_tokens_for_credentials(
@@ -150,6 +247,7 @@ class RouterTest(unittest.TestCase):
         """get_auth_tokens_for_credentials: It can get access token for a given credentials"""
         environment_mock.allowed_api_keys = self.api_key
         environment_mock.allowed_ip_adresses = self.host
+        environment_mock.api_keys = ""
 
         get_auth_tokens_for_credentials_mock.return_value = (
             models.GetTokensForCredentialsResponse(
@@ -183,6 +281,7 @@ class RouterTest(unittest.TestCase):
         """register_new_user: It can register a new user"""
         environment_mock.allowed_api_keys = self.api_key
         environment_mock.allowed_ip_adresses = self.host
+        environment_mock.api_keys = ""
 
         register_new_user_mock.return_value = models.RegisterUserResponse(
             registered=True
@@ -211,6 +310,7 @@ class RouterTest(unittest.TestCase):
         """login_user: It can register a new user"""
         environment_mock.allowed_api_keys = self.api_key
         environment_mock.allowed_ip_adresses = self.host
+        environment_mock.api_keys = ""
 
         login_user_mock.return_value = models.LoginUserResponse(
             data=models.LoginUserResponseData(
@@ -237,11 +337,58 @@ class RouterTest(unittest.TestCase):
         login_user_mock.assert_called_with(self.application, payload)
 
     @patch("app.helpers.environment")
-    @patch("app.auth.handlers.logout")
+    @patch("app.auth.bulkheads.admin_bulkhead.acquire", return_value=False)
+    @patch("app.auth.handlers.register_new_user")
+    def test_register_new_user_saturated(
+        self, register_new_user_mock, _acquire_mock, environment_mock
+    ):
+        """register_new_user: It fails fast when the admin bulkhead is saturated"""
+        environment_mock.allowed_api_keys = self.api_key
+        environment_mock.allowed_ip_adresses = self.host
+        environment_mock.api_keys = ""
+        response = self.client.post(
+            f"{constants.AUTH_ROUTE_PREFIX}{auth_constants.REGISTER_ROUTE_PATH}",
+            headers=self.headers,
+            json={
+                "username": "test-username",
+                "email": "test-user@test.com",
+                "firstName": "Test",
+                "lastName": "User",
+                "password": "test-password!",
+            },
+        )
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        register_new_user_mock.assert_not_called()
+
+    @patch("app.helpers.environment")
+    @patch("app.auth.admission.admission_controller.queue_delay", 10.0)
+    @patch("app.auth.handlers.register_new_user")
+    def test_register_new_user_shed(self, register_new_user_mock, environment_mock):
+        """register_new_user: It is shed once the requests wait over the target"""
+        environment_mock.allowed_api_keys = self.api_key
+        environment_mock.allowed_ip_adresses = self.host
+        environment_mock.api_keys = ""
+        response = self.client.post(
+            f"{constants.AUTH_ROUTE_PREFIX}{auth_constants.REGISTER_ROUTE_PATH}",
+            headers=self.headers,
+            json={
+                "username": "test-username",
+                "email": "test-user@test.com",
+                "firstName": "Test",
+                "lastName": "User",
+                "password": "test-password!",
+            },
+        )
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        register_new_user_mock.assert_not_called()
+
+    @patch("app.helpers.environment")
+    @patch("app.auth.async_handlers.logout")
     def test_logout(self, logout_mock, environment_mock):
         """logout: It can log out an existing user"""
         environment_mock.allowed_api_keys = self.api_key
         environment_mock.allowed_ip_adresses = self.host
+        environment_mock.api_keys = ""
 
         logout_mock.return_value = models.LogoutResponse(loggedOut=True)
         user_id = "test-user_id"
@@ -254,11 +401,12 @@ class RouterTest(unittest.TestCase):
         logout_mock.assert_called_with(self.application, self.authorization, user_id)
 
     @patch("app.helpers.environment")
-    @patch("app.auth.handlers.send_reset_password_email")
+    @patch("app.auth.async_handlers.send_reset_password_email")
     def test_send_reset_password_email(self, send_mock, environment_mock):
         """send_reset_password_email: It can send a reset password email for existing users"""
         environment_mock.allowed_api_keys = self.api_key
         environment_mock.allowed_ip_adresses = self.host
+        environment_mock.api_keys = ""
 
         send_mock.return_value = models.SendResetPasswordEmailResponse(emailSent=True)
         email = "test-user@test.com"
@@ -272,11 +420,12 @@ class RouterTest(unittest.TestCase):
         send_mock.assert_called_with(self.application, self.authorization, email)
 
     @patch("app.helpers.environment")
-    @patch("app.auth.handlers.get_user_basic_data")
+    @patch("app.auth.async_handlers.get_user_basic_data")
     def test_get_user_basic_data(self, basic_data_mock, environment_mock):
         """get_user_basic_data: It can log out an existing user"""
         environment_mock.allowed_api_keys = self.api_key
         environment_mock.allowed_ip_adresses = self.host
+        environment_mock.api_keys = ""
 
         payload = models.UserBasicDataPayload(
             clientId="test-client-id",
@@ -0,0 +1,100 @@
+"""Auth API upstream calls de-duplication
+"""
+
+import asyncio
+import threading
+import typing
+
+
+class Call:  # pylint: disable=too-few-public-methods
+    """In-flight call shared by the callers of a single flight group"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class Group:  # pylint: disable=too-few-public-methods
+    """Single flight group for threads
+
+    Concurrent callers asking for the same key share one execution of the
+    function and its result, or its error.
+    """
+
+    def __init__(self):
+        self.calls = {}
+        self.lock = threading.Lock()
+
+    def do(self, key: str, func: typing.Callable, *args, **kwargs) -> typing.Any:
+        """Runs the function unless a call with the same key is already in flight
+
+        Args:
+            key (str): The call key
+            func (typing.Callable): The function to run
+
+        Returns:
+            typing.Any: The result of the shared call
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self.calls[key] = Call()
+
+        if not is_leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except Exception as exc:
+            call.error = exc
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+
+
+class AsyncGroup:
+    """Single flight group for coroutines
+
+    Concurrent callers asking for the same key await one task running the
+    coroutine function. Cancelling a caller does not cancel the shared task.
+    """
+
+    def __init__(self):
+        self.tasks = {}
+
+    async def do(
+        self, key: str, func: typing.Callable[..., typing.Awaitable], *args, **kwargs
+    ) -> typing.Any:
+        """Awaits the coroutine function unless a call with the same key is in flight
+
+        Args:
+            key (str): The call key
+            func (typing.Callable[..., typing.Awaitable]): The coroutine function
+
+        Returns:
+            typing.Any: The result of the shared call
+        """
+        task = self.tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            self.tasks[key] = task
+            task.add_done_callback(lambda done_task: self.forget(key, done_task))
+        return await asyncio.shield(task)
+
+    def forget(self, key: str, task: asyncio.Future) -> None:
+        """Forgets a finished task so the next call with its key runs again
+
+        Args:
+            key (str): The call key
+            task (asyncio.Future): The finished task
+        """
+        if self.tasks.get(key) is task:
+            del self.tasks[key]
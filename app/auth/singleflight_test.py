@@ -0,0 +1,92 @@
+"""Auth API upstream calls de-duplication tests
+"""
+
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import Mock
+from .singleflight import Group, AsyncGroup
+
+
+class GroupTest(unittest.TestCase):
+    """Threads single flight group tests"""
+
+    def test_do_shares_concurrent_calls(self):
+        """Group.do: It runs concurrent calls with the same key only once"""
+        group = Group()
+        release = threading.Event()
+        func = Mock(side_effect=lambda: release.wait() and "test-result")
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(group.do("key", func)))
+            for _ in range(5)
+        ]
+        threads[0].start()
+        while "key" not in group.calls:
+            release.wait(0.001)
+        for thread in threads[1:]:
+            thread.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, ["test-result"] * 5)
+        func.assert_called_once()
+        self.assertEqual(group.calls, {})
+
+    def test_do_runs_again_after_completion(self):
+        """Group.do: It runs the function again once the previous call finished"""
+        group = Group()
+        func = Mock(return_value="test-result")
+        self.assertEqual(group.do("key", func, 1, value=2), "test-result")
+        self.assertEqual(group.do("key", func, 1, value=2), "test-result")
+        self.assertEqual(func.call_count, 2)
+        func.assert_called_with(1, value=2)
+
+    def test_do_shares_errors(self):
+        """Group.do: It raises the error of the shared call"""
+        group = Group()
+        self.assertRaises(ValueError, group.do, "key", Mock(side_effect=ValueError))
+        self.assertEqual(group.calls, {})
+
+
+class AsyncGroupTest(unittest.IsolatedAsyncioTestCase):
+    """Coroutines single flight group tests"""
+
+    async def test_do_shares_concurrent_calls(self):
+        """AsyncGroup.do: It awaits concurrent calls with the same key only once"""
+        group = AsyncGroup()
+        calls = []
+
+        async def func(value):
+            calls.append(value)
+            await asyncio.sleep(0.01)
+            return value
+
+        results = await asyncio.gather(
+            *[group.do("key", func, "test-result") for _ in range(5)],
+            group.do("other-key", func, "other-result"),
+        )
+
+        self.assertEqual(results, ["test-result"] * 5 + ["other-result"])
+        self.assertEqual(calls, ["test-result", "other-result"])
+        self.assertEqual(group.tasks, {})
+
+    async def test_do_shares_errors(self):
+        """AsyncGroup.do: It raises the error of the shared call"""
+        group = AsyncGroup()
+
+        async def func():
+            await asyncio.sleep(0.01)
+            raise ValueError("test-error")
+
+        results = await asyncio.gather(
+            group.do("key", func), group.do("key", func), return_exceptions=True
+        )
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+"""Auth API upstream timeouts and request deadlines
+"""
+
+import contextvars
+import math
+import time
+import typing
+import httpx
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+from .. import environment
+from .. import exceptions
+from . import constants as auth_consts
+
+
+request_deadline = contextvars.ContextVar("request_deadline", default=None)
+request_started_at = contextvars.ContextVar("request_started_at", default=None)
+
+
+def get_operation_timeouts(operation: str) -> typing.Tuple[float, float]:
+    """Gets the configured connect and read timeouts of an upstream operation
+
+    Args:
+        operation (str): The upstream operation
+
+    Returns:
+        typing.Tuple[float, float]: The connect and read timeouts in seconds
+    """
+    return {
+        auth_consts.INTROSPECT_UPSTREAM_OPERATION: (
+            environment.introspect_connect_timeout,
+            environment.introspect_read_timeout,
+        ),
+        auth_consts.TOKEN_UPSTREAM_OPERATION: (
+            environment.token_connect_timeout,
+            environment.token_read_timeout,
+        ),
+        auth_consts.ADMIN_USERS_UPSTREAM_OPERATION: (
+            environment.admin_users_connect_timeout,
+            environment.admin_users_read_timeout,
+        ),
+        auth_consts.LOGOUT_UPSTREAM_OPERATION: (
+            environment.logout_connect_timeout,
+            environment.logout_read_timeout,
+        ),
+        auth_consts.RESET_EMAIL_UPSTREAM_OPERATION: (
+            environment.reset_email_connect_timeout,
+            environment.reset_email_read_timeout,
+        ),
+    }[operation]
+
+
+def get_remaining_budget() -> typing.Optional[float]:
+    """Gets the time left before the deadline of the request in context
+
+    Returns:
+        typing.Optional[float]: The remaining seconds or None without deadline
+    """
+    deadline = request_deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def get_timeout(operation: str) -> typing.Tuple[float, float]:
+    """Gets the connect and read timeouts of an upstream call
+
+    The configured timeouts of the operation are capped by the remaining budget
+    of the request in context, so upstream calls never outlive their caller.
+
+    Args:
+        operation (str): The upstream operation
+
+    Raises:
+        HTTPException: Gateway timeout error when the request deadline is exceeded.
+
+    Returns:
+        typing.Tuple[float, float]: The connect and read timeouts in seconds
+    """
+    connect_timeout, read_timeout = get_operation_timeouts(operation)
+    remaining = get_remaining_budget()
+    if remaining is None:
+        return connect_timeout, read_timeout
+    if remaining <= 0:
+        raise exceptions.GATEWAY_TIMEOUT_ERROR
+    return min(connect_timeout, remaining), min(read_timeout, remaining)
+
+
+def get_async_timeout(operation: str) -> httpx.Timeout:
+    """Gets the timeouts of an asyncio upstream call
+
+    Args:
+        operation (str): The upstream operation
+
+    Raises:
+        HTTPException: Gateway timeout error when the request deadline is exceeded.
+
+    Returns:
+        httpx.Timeout: The connect timeout, and the read timeout for the rest
+    """
+    connect_timeout, read_timeout = get_timeout(operation)
+    return httpx.Timeout(read_timeout, connect=connect_timeout)
+
+
+def parse_deadline_header(value: typing.Optional[str]) -> typing.Optional[float]:
+    """Parses the deadline header into a monotonic deadline
+
+    Args:
+        value (typing.Optional[str]): The remaining budget of the caller in milliseconds
+
+    Returns:
+        typing.Optional[float]: The deadline or None when the header is missing or invalid
+    """
+    if value is None:
+        return None
+    try:
+        budget = float(value) / 1000
+    except ValueError:
+        return None
+    if not math.isfinite(budget):
+        return None
+    return time.monotonic() + budget
+
+
+class RequestDeadlineMiddleware:  # pylint: disable=too-few-public-methods
+    """Sets the deadline of every request from its deadline header
+
+    Callers send their remaining budget in milliseconds, which is turned into
+    a deadline before any work starts. The arrival time of the request is kept
+    as well, to tell how long it waited before being handled.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        deadline = parse_deadline_header(
+            Headers(scope=scope).get(auth_consts.REQUEST_DEADLINE_HEADER)
+        )
+        token = request_deadline.set(deadline)
+        started_at_token = request_started_at.set(time.monotonic())
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_started_at.reset(started_at_token)
+            request_deadline.reset(token)
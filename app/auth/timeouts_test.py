@@ -0,0 +1,107 @@
+"""Auth API upstream timeouts and request deadlines tests
+"""
+
+import unittest
+from unittest.mock import Mock, patch
+from fastapi import FastAPI, HTTPException, status
+from fastapi.testclient import TestClient
+from . import constants
+from . import timeouts
+
+
+mock_environment = Mock(
+    introspect_connect_timeout=1,
+    introspect_read_timeout=2,
+    token_connect_timeout=3,
+    token_read_timeout=4,
+    admin_users_connect_timeout=5,
+    admin_users_read_timeout=20,
+    logout_connect_timeout=6,
+    logout_read_timeout=7,
+    reset_email_connect_timeout=8,
+    reset_email_read_timeout=9,
+)
+
+
+@patch("app.auth.timeouts.environment", mock_environment)
+@patch("app.auth.timeouts.time.monotonic", Mock(return_value=100))
+class TimeoutsTest(unittest.TestCase):
+    """Upstream timeouts functions tests"""
+
+    def test_get_timeout(self):
+        """get_timeout: It gets the connect and read timeouts of every operation"""
+        self.assertEqual(
+            timeouts.get_timeout(constants.INTROSPECT_UPSTREAM_OPERATION), (1, 2)
+        )
+        self.assertEqual(timeouts.get_timeout(constants.TOKEN_UPSTREAM_OPERATION), (3, 4))
+        self.assertEqual(
+            timeouts.get_timeout(constants.ADMIN_USERS_UPSTREAM_OPERATION), (5, 20)
+        )
+        self.assertEqual(timeouts.get_timeout(constants.LOGOUT_UPSTREAM_OPERATION), (6, 7))
+        self.assertEqual(
+            timeouts.get_timeout(constants.RESET_EMAIL_UPSTREAM_OPERATION), (8, 9)
+        )
+
+    def test_get_timeout_deadline(self):
+        """get_timeout: It caps the timeouts by the remaining request budget"""
+        token = timeouts.request_deadline.set(103.5)
+        try:
+            self.assertEqual(
+                timeouts.get_timeout(constants.ADMIN_USERS_UPSTREAM_OPERATION),
+                (3.5, 3.5),
+            )
+            self.assertEqual(
+                timeouts.get_timeout(constants.INTROSPECT_UPSTREAM_OPERATION), (1, 2)
+            )
+            async_timeout = timeouts.get_async_timeout(
+                constants.ADMIN_USERS_UPSTREAM_OPERATION
+            )
+            self.assertEqual(async_timeout.connect, 3.5)
+            self.assertEqual(async_timeout.read, 3.5)
+        finally:
+            timeouts.request_deadline.reset(token)
+
+    def test_get_timeout_deadline_exceeded(self):
+        """get_timeout: It fails with gateway timeout once the deadline is exceeded"""
+        token = timeouts.request_deadline.set(100)
+        try:
+            with self.assertRaises(HTTPException) as context:
+                timeouts.get_timeout(constants.TOKEN_UPSTREAM_OPERATION)
+            self.assertEqual(
+                context.exception.status_code, status.HTTP_504_GATEWAY_TIMEOUT
+            )
+        finally:
+            timeouts.request_deadline.reset(token)
+
+    def test_parse_deadline_header(self):
+        """parse_deadline_header: It turns the remaining milliseconds into a deadline"""
+        self.assertEqual(timeouts.parse_deadline_header("300"), 100.3)
+        self.assertIsNone(timeouts.parse_deadline_header(None))
+        self.assertIsNone(timeouts.parse_deadline_header("soon"))
+        self.assertIsNone(timeouts.parse_deadline_header("nan"))
+
+
+class RequestDeadlineMiddlewareTest(unittest.TestCase):
+    """Request deadline middleware tests"""
+
+    def setUp(self):
+        app = FastAPI()
+        app.add_middleware(timeouts.RequestDeadlineMiddleware)
+
+        @app.get("/budget")
+        def get_budget():
+            return {"budget": timeouts.get_remaining_budget()}
+
+        self.client = TestClient(app)
+
+    def test_request_deadline(self):
+        """RequestDeadlineMiddleware: It sets the deadline of the request in context"""
+        budget = self.client.get(
+            "/budget", headers={constants.REQUEST_DEADLINE_HEADER: "300"}
+        ).json()["budget"]
+        self.assertTrue(0 < budget <= 0.3)
+        self.assertIsNone(self.client.get("/budget").json()["budget"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,307 @@
+"""Local access token verification
+"""
+
+import hashlib
+import re
+import time
+import typing
+import jwt
+from fastapi import status
+from .. import constants
+from .. import environment
+from .. import metrics
+from . import async_api
+from . import models
+from . import constants as auth_consts
+from .cache import TTLCache
+from .helpers import handle_error_response
+
+
+INACTIVE_TOKEN_DATA = {constants.ACTIVE_PROPERTY: False}
+SIGNING_KEY_USE = "sig"
+JWT_SEGMENTS_SEPARATOR = "."
+JWT_SEGMENTS_COUNT = 3
+BEARER_TOKEN_PATTERN = re.compile(r"^[A-Za-z0-9\-._~+/]+=*$")
+
+jwks_cache = {}
+introspection_cache = TTLCache(
+    environment.introspection_cache_max_entries, auth_consts.INTROSPECTION_CACHE_NAME
+)
+negative_token_cache = TTLCache(
+    environment.negative_token_cache_max_entries, auth_consts.NEGATIVE_TOKEN_CACHE_NAME
+)
+
+
+def is_malformed_token(access_token: str) -> bool:
+    """Checks if the given access token is not a well formed bearer token
+
+    Args:
+        access_token (str): The access token
+
+    Returns:
+        bool: True when the token does not follow the bearer token syntax
+    """
+    return BEARER_TOKEN_PATTERN.match(access_token) is None
+
+
+def get_token_kid(access_token: str) -> typing.Optional[str]:
+    """Gets the id of the key used to sign the given access token
+
+    Args:
+        access_token (str): The access token
+
+    Raises:
+        jwt.InvalidTokenError: When the token looks like a JWT but its header
+        can not be parsed
+
+    Returns:
+        typing.Optional[str]: The key id or None when the token is not a signed JWT
+    """
+    if len(access_token.split(JWT_SEGMENTS_SEPARATOR)) != JWT_SEGMENTS_COUNT:
+        return None
+    return jwt.get_unverified_header(access_token).get("kid")
+
+
+def store_jwks(realm: str, data: dict) -> None:
+    """Stores the signing keys of the given JSON Web Key Set indexed by key id
+
+    Args:
+        realm (str): The realm in context
+        data (dict): The JSON Web Key Set
+    """
+    keys = {}
+    for key_data in data.get("keys", []):
+        if key_data.get("use", SIGNING_KEY_USE) != SIGNING_KEY_USE:
+            continue
+        try:
+            key = jwt.PyJWK(key_data)
+        except (jwt.PyJWKError, jwt.InvalidKeyError):
+            continue
+        keys[key.key_id] = key
+    jwks_cache[realm] = {"keys": keys, "fetched_at": time.monotonic()}
+
+
+def get_signing_key(realm: str, kid: str) -> typing.Optional[jwt.PyJWK]:
+    """Gets a cached signing key of the realm in context
+
+    Args:
+        realm (str): The realm in context
+        kid (str): The key id
+
+    Returns:
+        typing.Optional[jwt.PyJWK]: The signing key or None when it is unknown
+    """
+    key = jwks_cache.get(realm, {}).get("keys", {}).get(kid)
+    metrics.record_cache_lookup(auth_consts.JWKS_CACHE_NAME, key is not None)
+    return key
+
+
+def should_fetch_jwks(realm: str) -> bool:
+    """Checks if the JSON Web Key Set of the realm can be fetched again
+
+    Unknown key ids trigger a new fetch to pick up rotated keys, but not more
+    often than the configured minimum refresh interval.
+
+    Args:
+        realm (str): The realm in context
+
+    Returns:
+        bool: True when the key set is missing or old enough to be fetched again
+    """
+    cached = jwks_cache.get(realm)
+    if cached is None:
+        return True
+    elapsed = time.monotonic() - cached["fetched_at"]
+    return elapsed >= environment.jwks_min_refresh_interval
+
+
+def get_issuer(realm: str) -> str:
+    """Gets the expected issuer of the tokens of the realm in context
+
+    Args:
+        realm (str): The realm in context
+
+    Returns:
+        str: The issuer
+    """
+    return f"{environment.token_issuer_base_url}{auth_consts.REALMS_PATH}{realm}"
+
+
+def decode_access_token(realm: str, access_token: str, key: jwt.PyJWK) -> dict:
+    """Verifies the signature and registered claims of the given access token
+
+    Args:
+        realm (str): The realm in context
+        access_token (str): The access token
+        key (jwt.PyJWK): The key the token was signed with
+
+    Returns:
+        dict: The token claims flagged as active, or inactive token data when
+        the token does not pass the verification.
+    """
+    try:
+        claims = jwt.decode(
+            access_token,
+            key=key.key,
+            algorithms=environment.jwt_algorithms,
+            audience=environment.jwt_audience,
+            issuer=get_issuer(realm),
+            leeway=environment.jwt_leeway,
+            options={
+                "require": ["exp", "iss"],
+                "verify_aud": bool(environment.jwt_audience),
+            },
+        )
+    except jwt.InvalidTokenError:
+        return dict(INACTIVE_TOKEN_DATA)
+    return {**claims, constants.ACTIVE_PROPERTY: True}
+
+
+async def async_verify_access_token(
+    realm: str, access_token: str
+) -> typing.Optional[dict]:
+    """Verifies the given access token locally against the realm signing keys
+
+    Args:
+        realm (str): The realm in context
+        access_token (str): The access token
+
+    Returns:
+        typing.Optional[dict]: Instrospection like token data, or None when the
+        token can not be verified locally and has to be instrospected.
+    """
+    try:
+        kid = get_token_kid(access_token)
+    except jwt.InvalidTokenError:
+        return dict(INACTIVE_TOKEN_DATA)
+    if kid is None:
+        return None
+
+    key = get_signing_key(realm, kid)
+    if key is None and should_fetch_jwks(realm):
+        response = await async_api.get_jwks(realm)
+        if response.status_code == status.HTTP_200_OK:
+            store_jwks(realm, response.json())
+            key = get_signing_key(realm, kid)
+
+    if key is None:
+        return None
+
+    return decode_access_token(realm, access_token, key)
+
+
+def get_introspection_cache_key(
+    realm: str, access_token: str, payload: models.ValidateAccessTokenPayload
+) -> str:
+    """Gets the instrospection cache key of the given token
+
+    The key is a digest, so neither the token nor the client credentials are
+    kept in memory. The client secret is part of it so that wrong credentials
+    never get a result cached for the right ones.
+
+    Args:
+        realm (str): The realm in context
+        access_token (str): The access token
+        payload (models.ValidateAccessTokenPayload): The instrospection payload
+
+    Returns:
+        str: The cache key
+    """
+    digest = hashlib.sha256()
+    for value in (realm, payload.clientId, payload.clientSecret, access_token):
+        digest.update(value.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def get_introspection_ttl(data: dict) -> float:
+    """Gets how long an instrospection result can be cached
+
+    Args:
+        data (dict): The instrospection result
+
+    Returns:
+        float: Time to live in seconds, capped by the token expiration
+    """
+    ttl = environment.introspection_cache_ttl
+    expires_at = data.get("exp")
+    if isinstance(expires_at, (int, float)):
+        ttl = min(ttl, expires_at - time.time())
+    return ttl
+
+
+def get_cached_introspection_result(key: str, access_token: str) -> typing.Optional[dict]:
+    """Gets a cached instrospection result of the given token
+
+    Tokens known to be inactive, as well as malformed ones, are answered as
+    inactive without reaching the auth API.
+
+    Args:
+        key (str): The instrospection cache key
+        access_token (str): The access token
+
+    Returns:
+        typing.Optional[dict]: The cached result or None when it is unknown
+    """
+    if negative_token_cache.get(key) is not None:
+        return dict(INACTIVE_TOKEN_DATA)
+    if is_malformed_token(access_token):
+        negative_token_cache.set(key, True, environment.negative_token_cache_ttl)
+        return dict(INACTIVE_TOKEN_DATA)
+    return introspection_cache.get(key)
+
+
+def cache_introspection_result(key: str, status_code: int, data: dict) -> dict:
+    """Caches the compact result of a successful instrospection
+
+    Active tokens go to the instrospection cache and inactive ones to the
+    negative token cache, each one with its own time to live.
+
+    Args:
+        key (str): The instrospection cache key
+        status_code (int): The instrospection response status code
+        data (dict): The instrospection response data
+
+    Returns:
+        dict: The compact instrospection result
+    """
+    result = {
+        claim: data[claim]
+        for claim in auth_consts.INTROSPECTION_RESULT_CLAIMS
+        if claim in data
+    }
+    if status_code != status.HTTP_200_OK:
+        return result
+    if result.get(constants.ACTIVE_PROPERTY) is True:
+        introspection_cache.set(key, result, get_introspection_ttl(result))
+    else:
+        negative_token_cache.set(key, True, environment.negative_token_cache_ttl)
+    return result
+
+
+async def async_introspect_access_token(
+    realm: str,
+    access_token: str,
+    payload: models.ValidateAccessTokenPayload,
+    check_response: bool = False,
+) -> dict:
+    """Instrospects the given token through the instrospection cache
+
+    Args:
+        realm (str): The realm in context
+        access_token (str): The access token
+        payload (models.ValidateAccessTokenPayload): The instrospection payload
+        check_response (bool, optional): Whether to raise on error responses
+
+    Returns:
+        dict: The compact instrospection result
+    """
+    key = get_introspection_cache_key(realm, access_token, payload)
+    result = get_cached_introspection_result(key, access_token)
+    if result is not None:
+        return result
+
+    response = await async_api.token_instrospect(realm, access_token, payload)
+    if check_response:
+        handle_error_response(response)
+    return cache_introspection_result(key, response.status_code, response.json())
@@ -0,0 +1,275 @@
+"""Local access token verification tests
+"""
+
+import base64
+import json
+import time
+import unittest
+from unittest.mock import AsyncMock, Mock, patch
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import HTTPException, status
+from . import models
+from . import tokens
+
+
+BASE_URL = "http://base-url.test"
+REALM = "test-realm"
+KID = "test-kid"
+
+mock_environment = Mock(
+    token_issuer_base_url=BASE_URL,
+    jwt_audience=None,
+    jwt_algorithms=["RS256"],
+    jwt_leeway=0,
+    jwks_min_refresh_interval=30,
+    introspection_cache_ttl=30,
+    negative_token_cache_ttl=60,
+)
+
+
+def get_jwks(private_key, kid: str = KID) -> dict:
+    """Gets a JSON Web Key Set for the public part of the given key"""
+    key_data = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+    return {"keys": [{**key_data, "kid": kid, "use": "sig", "alg": "RS256"}]}
+
+
+def get_token(private_key, kid: str = KID, **claims) -> str:
+    """Gets a signed access token with the given claims"""
+    now = int(time.time())
+    payload = {
+        "iss": f"{BASE_URL}/realms/{REALM}",
+        "exp": now + 300,
+        "nbf": now - 10,
+        "sub": "test-user-id",
+        "scope": "email test-scope",
+        **claims,
+    }
+    return jwt.encode(payload, private_key, algorithm="RS256", headers={"kid": kid})
+
+
+def get_malformed_kid_token() -> str:
+    """Gets a token whose key id header is not a string"""
+    header = base64.urlsafe_b64encode(json.dumps({"alg": "RS256", "kid": 123}).encode())
+    return f"{header.decode().rstrip('=')}.e30.c2lnbmF0dXJl"
+
+
+@patch("app.auth.tokens.environment", mock_environment)
+class TokensTest(unittest.IsolatedAsyncioTestCase):
+    """Local access token verification functions tests"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        cls.other_private_key = rsa.generate_private_key(
+            public_exponent=65537, key_size=2048
+        )
+
+    def setUp(self):
+        tokens.jwks_cache.clear()
+
+    def test_get_token_kid(self):
+        """get_token_kid: It gets the key id of signed tokens and None for opaque tokens"""
+        self.assertEqual(tokens.get_token_kid(get_token(self.private_key)), KID)
+        self.assertIsNone(tokens.get_token_kid("opaque-token"))
+        self.assertRaises(jwt.DecodeError, tokens.get_token_kid, "not.a.jwt")
+
+    @patch("app.auth.tokens.async_api.get_jwks", new_callable=AsyncMock)
+    async def test_async_verify_access_token_malformed(self, get_jwks_mock):
+        """async_verify_access_token: It returns inactive data for malformed tokens"""
+        self.assertEqual(
+            await tokens.async_verify_access_token(REALM, "not.a.jwt"), {"active": False}
+        )
+        self.assertEqual(
+            await tokens.async_verify_access_token(REALM, get_malformed_kid_token()),
+            {"active": False},
+        )
+        get_jwks_mock.assert_not_called()
+
+    def test_store_jwks(self):
+        """store_jwks: It indexes the signing keys by key id and skips other keys"""
+        jwks = get_jwks(self.private_key)
+        jwks["keys"].append({**jwks["keys"][0], "kid": "enc-kid", "use": "enc"})
+        jwks["keys"].append({"kid": "bad-kid", "kty": "unknown"})
+        tokens.store_jwks(REALM, jwks)
+        self.assertIsNotNone(tokens.get_signing_key(REALM, KID))
+        self.assertIsNone(tokens.get_signing_key(REALM, "enc-kid"))
+        self.assertIsNone(tokens.get_signing_key(REALM, "bad-kid"))
+
+    @patch("app.auth.tokens.async_api.get_jwks", new_callable=AsyncMock)
+    async def test_async_verify_access_token(self, get_jwks_mock):
+        """async_verify_access_token: It verifies a valid token fetching the keys only once"""
+        get_jwks_mock.return_value = Mock(
+            status_code=status.HTTP_200_OK,
+            json=Mock(return_value=get_jwks(self.private_key)),
+        )
+        access_token = get_token(self.private_key)
+
+        data = await tokens.async_verify_access_token(REALM, access_token)
+        self.assertTrue(data["active"])
+        self.assertEqual(data["scope"], "email test-scope")
+        data = await tokens.async_verify_access_token(REALM, access_token)
+        self.assertTrue(data["active"])
+        get_jwks_mock.assert_called_once_with(REALM)
+
+    @patch("app.auth.tokens.async_api.get_jwks", new_callable=AsyncMock)
+    async def test_async_verify_access_token_invalid_claims(self, get_jwks_mock):
+        """async_verify_access_token: It returns inactive data for tokens failing verification"""
+        tokens.store_jwks(REALM, get_jwks(self.private_key))
+        now = int(time.time())
+        invalid_tokens = [
+            get_token(self.private_key, exp=now - 60),
+            get_token(self.private_key, nbf=now + 60),
+            get_token(self.private_key, iss=f"{BASE_URL}/realms/other-realm"),
+            get_token(self.other_private_key),
+        ]
+        for access_token in invalid_tokens:
+            self.assertEqual(
+                await tokens.async_verify_access_token(REALM, access_token),
+                {"active": False},
+            )
+        get_jwks_mock.assert_not_called()
+
+    @patch("app.auth.tokens.async_api.get_jwks", new_callable=AsyncMock)
+    async def test_async_verify_access_token_audience(self, get_jwks_mock):
+        """async_verify_access_token: It checks the audience when one is configured"""
+        tokens.store_jwks(REALM, get_jwks(self.private_key))
+        with patch.object(mock_environment, "jwt_audience", "test-audience"):
+            data = await tokens.async_verify_access_token(
+                REALM, get_token(self.private_key, aud="test-audience")
+            )
+            self.assertTrue(data["active"])
+            data = await tokens.async_verify_access_token(
+                REALM, get_token(self.private_key, aud="other-audience")
+            )
+            self.assertFalse(data["active"])
+        get_jwks_mock.assert_not_called()
+
+    @patch("app.auth.tokens.async_api.get_jwks", new_callable=AsyncMock)
+    async def test_async_verify_access_token_not_verifiable(self, get_jwks_mock):
+        """async_verify_access_token: It returns None for opaque tokens and unknown keys"""
+        get_jwks_mock.return_value = Mock(
+            status_code=status.HTTP_200_OK,
+            json=Mock(return_value=get_jwks(self.private_key)),
+        )
+        self.assertIsNone(await tokens.async_verify_access_token(REALM, "opaque-token"))
+        get_jwks_mock.assert_not_called()
+
+        access_token = get_token(self.private_key, kid="unknown-kid")
+        self.assertIsNone(await tokens.async_verify_access_token(REALM, access_token))
+        self.assertIsNone(await tokens.async_verify_access_token(REALM, access_token))
+        get_jwks_mock.assert_called_once_with(REALM)
+
+
+@patch("app.auth.tokens.environment", mock_environment)
+class IntrospectionCacheTest(unittest.IsolatedAsyncioTestCase):
+    """Token instrospection cache functions tests"""
+
+    def setUp(self):
+        tokens.introspection_cache.clear()
+        tokens.negative_token_cache.clear()
+        self.payload = models.ValidateAccessTokenPayload(
+            clientId="test-client-id",
+            clientSecret="test-client-secret",
+            expectedScope="test-scope",
+        )
+
+    def test_get_introspection_cache_key(self):
+        """get_introspection_cache_key: It depends on the realm, client and token"""
+        key = tokens.get_introspection_cache_key(REALM, "test-token", self.payload)
+        self.assertNotIn("test-token", key)
+        self.assertEqual(
+            key, tokens.get_introspection_cache_key(REALM, "test-token", self.payload)
+        )
+        other_payload = self.payload.copy(update={"clientSecret": "other-secret"})
+        self.assertNotEqual(
+            key, tokens.get_introspection_cache_key(REALM, "test-token", other_payload)
+        )
+        self.assertNotEqual(
+            key, tokens.get_introspection_cache_key("other", "test-token", self.payload)
+        )
+
+    def test_get_introspection_ttl(self):
+        """get_introspection_ttl: It caps the time to live by the token expiration"""
+        with patch("app.auth.tokens.time.time", return_value=1000):
+            self.assertEqual(tokens.get_introspection_ttl({}), 30)
+            self.assertEqual(tokens.get_introspection_ttl({"exp": 1100}), 30)
+            self.assertEqual(tokens.get_introspection_ttl({"exp": 1010}), 10)
+
+    @patch("app.auth.tokens.async_api.token_instrospect", new_callable=AsyncMock)
+    async def test_async_introspect_access_token(self, token_instrospect_mock):
+        """async_introspect_access_token: It caches the compact result of active tokens"""
+        token_instrospect_mock.return_value = Mock(
+            status_code=status.HTTP_200_OK,
+            json=Mock(
+                return_value={
+                    "active": True,
+                    "scope": "test-scope",
+                    "sub": "test-user-id",
+                    "jti": "not-cached-claim",
+                }
+            ),
+        )
+        for _ in range(3):
+            result = await tokens.async_introspect_access_token(
+                REALM, "test-token", self.payload
+            )
+            self.assertEqual(
+                result, {"active": True, "scope": "test-scope", "sub": "test-user-id"}
+            )
+        token_instrospect_mock.assert_called_once_with(
+            REALM, "test-token", self.payload
+        )
+
+    @patch("app.auth.tokens.async_api.token_instrospect", new_callable=AsyncMock)
+    async def test_async_introspect_access_token_not_cached(self, token_instrospect_mock):
+        """async_introspect_access_token: It does not cache error responses"""
+        token_instrospect_mock.return_value = Mock(
+            status_code=status.HTTP_401_UNAUTHORIZED, json=Mock(return_value={})
+        )
+        for _ in range(2):
+            result = await tokens.async_introspect_access_token(
+                REALM, "test-token", self.payload
+            )
+            self.assertEqual(result, {})
+        self.assertEqual(token_instrospect_mock.call_count, 2)
+
+    @patch("app.auth.tokens.async_api.token_instrospect", new_callable=AsyncMock)
+    async def test_async_introspect_access_token_inactive(self, token_instrospect_mock):
+        """async_introspect_access_token: It answers inactive tokens without the auth API"""
+        token_instrospect_mock.return_value = Mock(
+            status_code=status.HTTP_200_OK, json=Mock(return_value={"active": False})
+        )
+        for _ in range(3):
+            result = await tokens.async_introspect_access_token(
+                REALM, "test-token", self.payload
+            )
+            self.assertEqual(result, {"active": False})
+        token_instrospect_mock.assert_called_once_with(
+            REALM, "test-token", self.payload
+        )
+
+    @patch("app.auth.tokens.async_api.token_instrospect", new_callable=AsyncMock)
+    async def test_async_introspect_access_token_malformed(self, token_instrospect_mock):
+        """async_introspect_access_token: It answers malformed tokens without the API"""
+        for access_token in ["", "not a token", "tok\u00e9n"]:
+            result = await tokens.async_introspect_access_token(
+                REALM, access_token, self.payload
+            )
+            self.assertEqual(result, {"active": False})
+        token_instrospect_mock.assert_not_called()
+
+    @patch("app.auth.tokens.async_api.token_instrospect", new_callable=AsyncMock)
+    async def test_async_introspect_access_token_check_response(self, token_instrospect_mock):
+        """async_introspect_access_token: It raises on error responses when asked to"""
+        token_instrospect_mock.return_value = Mock(
+            status_code=status.HTTP_401_UNAUTHORIZED, json=Mock(return_value={})
+        )
+        with self.assertRaises(HTTPException):
+            await tokens.async_introspect_access_token(
+                REALM, "test-token", self.payload, check_response=True
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
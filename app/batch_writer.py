@@ -0,0 +1,161 @@
+"""Background writer of records in batches
+"""
+
+import queue
+import threading
+import typing
+
+
+def append_lines(path: str) -> typing.Callable[[typing.List[str]], None]:
+    """Creates a batch write function appending the records to a file
+
+    The file is opened for every batch, so it can be rotated away.
+
+    Args:
+        path (str): The file path
+
+    Returns:
+        typing.Callable[[typing.List[str]], None]: The batch write function
+    """
+
+    def write_lines(records: typing.List[str]) -> None:
+        with open(path, "a", encoding="utf-8") as output:
+            output.write("".join(f"{record}\n" for record in records))
+
+    return write_lines
+
+
+def stream_lines(stream: typing.TextIO) -> typing.Callable[[typing.List[str]], None]:
+    """Creates a batch write function writing the records to a stream
+
+    Args:
+        stream (typing.TextIO): The stream
+
+    Returns:
+        typing.Callable[[typing.List[str]], None]: The batch write function
+    """
+
+    def write_lines(records: typing.List[str]) -> None:
+        stream.write("".join(f"{record}\n" for record in records))
+        stream.flush()
+
+    return write_lines
+
+
+class BatchWriter:  # pylint: disable=too-many-instance-attributes
+    """Writer of records handed over through a bounded queue
+
+    Submitting a record never waits on I/O: records are queued, and a daemon
+    thread started on the first record drains the queue in batches. Records
+    submitted while the queue is full are dropped and counted.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        name: str,
+        write_batch: typing.Callable[[typing.List[str]], None],
+        max_queue: int,
+        batch_size: int,
+        flush_interval: float,
+    ):
+        self.name = name
+        self.write_batch = write_batch
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.records = queue.Queue(maxsize=max_queue)
+        self.dropped = 0
+        self.stopping = threading.Event()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def submit(self, record: str, timeout: typing.Optional[float] = None) -> bool:
+        """Queues a record to be written
+
+        Args:
+            record (str): The record
+            timeout (typing.Optional[float], optional): The seconds to wait for
+            room in the queue, no waiting when not set
+
+        Returns:
+            bool: True when the record was queued, False when it was dropped
+        """
+        if self.thread is None:
+            self.start()
+        try:
+            if timeout:
+                self.records.put(record, timeout=timeout)
+            else:
+                self.records.put_nowait(record)
+        except queue.Full:
+            with self.lock:
+                self.dropped += 1
+            return False
+        return True
+
+    def start(self) -> None:
+        """Starts the writer thread unless it is running"""
+        with self.lock:
+            if self.thread is not None:
+                return
+            self.stopping.clear()
+            self.thread = threading.Thread(
+                target=self.run, name=f"{self.name}-writer", daemon=True
+            )
+            self.thread.start()
+
+    def get_batch(self) -> typing.List[str]:
+        """Takes the next batch of records, waiting up to the flush interval
+
+        Returns:
+            typing.List[str]: The records of the batch
+        """
+        try:
+            batch = [self.records.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.records.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def flush(self) -> None:
+        """Writes the queued records"""
+        while not self.records.empty():
+            batch = self.get_batch()
+            if batch:
+                self.write(batch)
+
+    def write(self, batch: typing.List[str]) -> None:
+        """Writes a batch, dropping it when it cannot be written
+
+        Args:
+            batch (typing.List[str]): The records of the batch
+        """
+        try:
+            self.write_batch(batch)
+        except OSError:
+            with self.lock:
+                self.dropped += len(batch)
+
+    def run(self) -> None:
+        """Writes the queued records in batches until the writer is stopped"""
+        while not self.stopping.is_set():
+            batch = self.get_batch()
+            if batch:
+                self.write(batch)
+        self.flush()
+
+    def stop(self, timeout: typing.Optional[float] = None) -> None:
+        """Stops the writer thread once the queued records are written
+
+        Args:
+            timeout (typing.Optional[float], optional): The seconds to wait for the thread
+        """
+        with self.lock:
+            thread, self.thread = self.thread, None
+        if thread is None:
+            return
+        self.stopping.set()
+        thread.join(timeout)
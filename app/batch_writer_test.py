@@ -0,0 +1,73 @@
+"""Batch writer tests
+"""
+
+import io
+import os
+import tempfile
+import threading
+import unittest
+from app import batch_writer
+
+
+class BatchWriterTest(unittest.TestCase):
+    """Batch writer tests"""
+
+    def test_append_lines(self):
+        """append_lines: It appends the records to the file as lines"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "records.jsonl")
+            write_lines = batch_writer.append_lines(path)
+            write_lines(["a", "b"])
+            write_lines(["c"])
+            with open(path, encoding="utf-8") as records:
+                self.assertEqual(records.read(), "a\nb\nc\n")
+
+    def test_stream_lines(self):
+        """stream_lines: It writes the records to the stream as lines"""
+        stream = io.StringIO()
+        batch_writer.stream_lines(stream)(["a", "b"])
+        self.assertEqual(stream.getvalue(), "a\nb\n")
+
+    def test_write_in_batches(self):
+        """BatchWriter: It writes the submitted records in batches"""
+        batches = []
+        writer = batch_writer.BatchWriter("test", batches.append, 10, 2, 0.01)
+        for record in ["a", "b", "c"]:
+            self.assertTrue(writer.submit(record))
+        writer.stop()
+        self.assertEqual([record for batch in batches for record in batch], ["a", "b", "c"])
+        self.assertTrue(all(len(batch) <= 2 for batch in batches))
+        self.assertIsNone(writer.thread)
+
+    def test_drop_when_full(self):
+        """BatchWriter: It drops and counts the records submitted while the queue is full"""
+        blocked = threading.Event()
+        batches = []
+
+        def write_batch(batch):
+            blocked.wait()
+            batches.append(batch)
+
+        writer = batch_writer.BatchWriter("test", write_batch, 1, 1, 0.01)
+        submitted = [writer.submit(str(index)) for index in range(5)]
+        blocked.set()
+        writer.stop()
+        self.assertIn(False, submitted)
+        self.assertEqual(writer.dropped, submitted.count(False))
+        self.assertEqual(sum(len(batch) for batch in batches), submitted.count(True))
+
+    def test_drop_on_write_error(self):
+        """BatchWriter: It drops the batches that cannot be written"""
+
+        def write_batch(batch):
+            raise OSError("disk full")
+
+        writer = batch_writer.BatchWriter("test", write_batch, 10, 10, 0.01)
+        writer.submit("a")
+        writer.submit("b")
+        writer.stop()
+        self.assertEqual(writer.dropped, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,9 +7,117 @@ SCOPE_PROPERTY = "scope"
 SCOPES_SEPARATOR = " "
 API_KEYS_SEPARATOR = ","
 IP_ADDRESSES_SEPARATOR = ","
+API_KEY_HEADER = b"api_key"
+API_KEY_STATE = "api_key"
+API_KEY_DIGEST_PREFIX = "sha256:"
+APPLICATION_HEADER = b"application"
+RETRY_AFTER_HEADER = "Retry-After"
+FORWARDED_FOR_HEADER = b"x-forwarded-for"
+FORWARDED_FOR_SEPARATOR = ","
 EMPTY_VALUE = ""
 TIMEOUT = 10
 
+# API access check
+DEPENDENCY_ACCESS_CHECK_MODE = "dependency"
+MIDDLEWARE_ACCESS_CHECK_MODE = "middleware"
+DEFAULT_API_ACCESS_CHECK_MODE = DEPENDENCY_ACCESS_CHECK_MODE
+DEFAULT_ALLOWLISTS_WATCH_INTERVAL = "5"
+DEFAULT_ADMISSION_MAX_IN_FLIGHT = "256"
+DEFAULT_ADMISSION_QUEUE_DELAY_TARGET = "0.1"
+DEFAULT_TRACING_SAMPLE_RATE = "0"
+DEFAULT_TRACING_FILE = "traces.jsonl"
+DEFAULT_TRACING_QUEUE_SIZE = "10000"
+DEFAULT_SERVER_TIMING = "true"
+DEFAULT_PROFILING = "false"
+DEFAULT_LOOP_MONITOR_INTERVAL = "0.5"
+DEFAULT_LOOP_BLOCKED_THRESHOLD = "0"
+STDOUT_LOG_FILE = "-"
+DROP_QUEUE_FULL_POLICY = "drop"
+BLOCK_QUEUE_FULL_POLICY = "block"
+DEFAULT_AUDIT_LOG_QUEUE_SIZE = "10000"
+DEFAULT_AUDIT_LOG_QUEUE_FULL_POLICY = DROP_QUEUE_FULL_POLICY
+DEFAULT_AUDIT_LOG_BLOCK_TIMEOUT = "1"
+MEMORY_RATE_LIMIT_BACKEND = "memory"
+SQLITE_RATE_LIMIT_BACKEND = "sqlite"
+DEFAULT_RATE_LIMIT_BACKEND = MEMORY_RATE_LIMIT_BACKEND
+DEFAULT_RATE_LIMIT_DEFAULT = "0"
+DEFAULT_RATE_LIMITS = "{}"
+DEFAULT_RATE_LIMIT_BURST = "1"
+DEFAULT_RATE_LIMIT_MAX_BUCKETS = "10000"
+DEFAULT_RATE_LIMIT_SQLITE_PATH = "rate_limits.sqlite3"
+RATE_LIMIT_SQLITE_TIMEOUT = 0.05
+RATE_LIMIT_SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+)
+RATE_LIMIT_SQLITE_CREATE_TABLE = (
+    "CREATE TABLE IF NOT EXISTS rate_limit_buckets "
+    "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+)
+RATE_LIMIT_SQLITE_SELECT = (
+    "SELECT tokens, updated_at FROM rate_limit_buckets WHERE key = ?"
+)
+RATE_LIMIT_SQLITE_UPSERT = (
+    "INSERT OR REPLACE INTO rate_limit_buckets (key, tokens, updated_at) "
+    "VALUES (?, ?, ?)"
+)
+
+# Auth API connection pool defaults
+DEFAULT_AUTH_API_POOL_CONNECTIONS = "10"
+DEFAULT_AUTH_API_POOL_MAXSIZE = "50"
+DEFAULT_AUTH_API_POOL_BLOCK = "false"
+TRUE_VALUE = "true"
+
+# Token validation
+INTROSPECT_TOKEN_VALIDATION_MODE = "introspect"
+LOCAL_TOKEN_VALIDATION_MODE = "local"
+DEFAULT_TOKEN_VALIDATION_MODE = INTROSPECT_TOKEN_VALIDATION_MODE
+DEFAULT_JWT_ALGORITHMS = "RS256"
+JWT_ALGORITHMS_SEPARATOR = ","
+DEFAULT_JWT_LEEWAY = "0"
+DEFAULT_JWKS_MIN_REFRESH_INTERVAL = "30"
+DEFAULT_INTROSPECTION_CACHE_TTL = "30"
+DEFAULT_INTROSPECTION_CACHE_MAX_ENTRIES = "10000"
+DEFAULT_NEGATIVE_TOKEN_CACHE_TTL = "60"
+DEFAULT_NEGATIVE_TOKEN_CACHE_MAX_ENTRIES = "10000"
+DEFAULT_VALIDATE_BATCH_CONCURRENCY = "10"
+DEFAULT_CREDENTIALS_TOKEN_CACHE_MAX_ENTRIES = "1000"
+DEFAULT_CREDENTIALS_TOKEN_EXPIRY_MARGIN = "30"
+DEFAULT_CREDENTIALS_TOKEN_REFRESH_AHEAD = "60"
+
+# Auth API upstream timeouts defaults
+DEFAULT_UPSTREAM_CONNECT_TIMEOUT = "3"
+DEFAULT_UPSTREAM_READ_TIMEOUT = str(TIMEOUT)
+
+# Auth API retries defaults
+DEFAULT_RETRY_MAX_ATTEMPTS = "3"
+DEFAULT_RETRY_BASE_DELAY = "0.05"
+DEFAULT_RETRY_MAX_DELAY = "1"
+DEFAULT_RETRY_BUDGET_RATIO = "0.1"
+DEFAULT_RETRY_BUDGET_BURST = "10"
+DEFAULT_INTROSPECTION_HEDGING = "false"
+
+# Synchronous handlers bulkheads defaults
+DEFAULT_TOKEN_BULKHEAD_MAX_WORKERS = "20"
+DEFAULT_TOKEN_BULKHEAD_MAX_QUEUE = "50"
+DEFAULT_ADMIN_BULKHEAD_MAX_WORKERS = "5"
+DEFAULT_ADMIN_BULKHEAD_MAX_QUEUE = "10"
+
+# Auth API adaptive concurrency limit defaults
+DEFAULT_UPSTREAM_CONCURRENCY_INITIAL_LIMIT = "20"
+DEFAULT_UPSTREAM_CONCURRENCY_MIN_LIMIT = "2"
+DEFAULT_UPSTREAM_CONCURRENCY_MAX_LIMIT = "200"
+DEFAULT_UPSTREAM_CONCURRENCY_LATENCY_THRESHOLD = "1"
+DEFAULT_UPSTREAM_CONCURRENCY_QUEUE_TIMEOUT = "0.05"
+
+# Auth API circuit breaker defaults
+DEFAULT_CIRCUIT_BREAKER_FAILURE_RATE = "0.5"
+DEFAULT_CIRCUIT_BREAKER_MIN_CALLS = "20"
+DEFAULT_CIRCUIT_BREAKER_WINDOW = "30"
+DEFAULT_CIRCUIT_BREAKER_SLOW_CALL_DURATION = "5"
+DEFAULT_CIRCUIT_BREAKER_OPEN_DURATION = "15"
+DEFAULT_CIRCUIT_BREAKER_MAX_BREAKERS = "100"
+
 DEVICE_TOKEN_GRANT_TYPE = "urn:ietf:params:oauth:grant-type:device_code"
 REFRESH_TOKEN_GRANT_TYPE = "refresh_token"
 PASSWORD_GRANT_TYPE = "password"
@@ -27,10 +135,139 @@ API_VERSION = "1.0.0"
 # API routes prefixes
 AUTH_ROUTE_PREFIX = "/api/v1/auth"
 
+# Metrics route
+METRICS_ROUTE_PATH = "/metrics"
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+METRICS_LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+CACHE_HIT_RESULT = "hit"
+CACHE_MISS_RESULT = "miss"
+UPSTREAM_ERROR_STATUS = "error"
+
+# Tracing
+TRACEPARENT_HEADER = "traceparent"
+TRACEPARENT_SAMPLED_FLAG = 0x01
+TRACING_BATCH_SIZE = 512
+TRACING_FLUSH_INTERVAL = 1.0
+SPAN_OK_STATUS = "ok"
+SPAN_ERROR_STATUS = "error"
+SPAN_OPERATION_ID_ATTRIBUTE = "operation_id"
+SPAN_REALM_ATTRIBUTE = "realm"
+SPAN_STATUS_CODE_ATTRIBUTE = "status_code"
+SPAN_BYTES_ATTRIBUTE = "response_bytes"
+UPSTREAM_SPAN_PREFIX = "upstream."
+ACCESS_CHECK_SPAN_NAME = "validate_api_access"
+
+# Server timing
+SERVER_TIMING_HEADER = b"server-timing"
+ACCESS_CHECK_TIMING_NAME = "auth"
+UPSTREAM_TIMING_NAME = "upstream"
+SERIALIZE_TIMING_NAME = "serialize"
+TOTAL_TIMING_NAME = "total"
+CACHE_TIMING_PREFIX = "cache-"
+
+# Profiling
+PROFILE_HEADER = b"x-profile"
+PROFILE_FILE_HEADER = b"x-profile-file"
+PROFILE_STATUS_HEADER = b"x-profile-status"
+PROFILE_CONTENT_TYPE = "application/octet-stream"
+PROFILE_FILE_EXTENSION = ".prof"
+
+# Health route
+HEALTH_ROUTE_PATH = "/health"
+HEALTH_OPERATION_ID = "getHealth"
+HEALTH_TAGS = ["health"]
+HEALTHY_STATUS = "ok"
+DEGRADED_STATUS = "degraded"
+
 # Environment names
 AUTH_API_BASE_URL_ENV_NAME = "AUTH_API_BASE_URL"
 AUTH_ALLOWED_IP_ADDRESSES_ENV_NAME = "AUTH_ALLOWED_IP_ADDRESSES"
 AUTH_ALLOWED_API_KEYS_ENV_NAME = "AUTH_ALLOWED_API_KEYS"
+AUTH_API_ACCESS_CHECK_MODE_ENV_NAME = "AUTH_API_ACCESS_CHECK_MODE"
+AUTH_API_KEYS_ENV_NAME = "AUTH_API_KEYS"
+AUTH_TRUSTED_PROXIES_ENV_NAME = "AUTH_TRUSTED_PROXIES"
+AUTH_RATE_LIMIT_BACKEND_ENV_NAME = "AUTH_RATE_LIMIT_BACKEND"
+AUTH_RATE_LIMIT_DEFAULT_ENV_NAME = "AUTH_RATE_LIMIT_DEFAULT"
+AUTH_RATE_LIMITS_ENV_NAME = "AUTH_RATE_LIMITS"
+AUTH_RATE_LIMIT_BURST_ENV_NAME = "AUTH_RATE_LIMIT_BURST"
+AUTH_RATE_LIMIT_MAX_BUCKETS_ENV_NAME = "AUTH_RATE_LIMIT_MAX_BUCKETS"
+AUTH_RATE_LIMIT_SQLITE_PATH_ENV_NAME = "AUTH_RATE_LIMIT_SQLITE_PATH"
+AUTH_ADMISSION_MAX_IN_FLIGHT_ENV_NAME = "AUTH_ADMISSION_MAX_IN_FLIGHT"
+AUTH_ADMISSION_QUEUE_DELAY_TARGET_ENV_NAME = "AUTH_ADMISSION_QUEUE_DELAY_TARGET"
+AUTH_TRACING_SAMPLE_RATE_ENV_NAME = "AUTH_TRACING_SAMPLE_RATE"
+AUTH_TRACING_FILE_ENV_NAME = "AUTH_TRACING_FILE"
+AUTH_TRACING_QUEUE_SIZE_ENV_NAME = "AUTH_TRACING_QUEUE_SIZE"
+AUTH_SERVER_TIMING_ENV_NAME = "AUTH_SERVER_TIMING"
+AUTH_PROFILING_ENV_NAME = "AUTH_PROFILING"
+AUTH_PROFILING_DIRECTORY_ENV_NAME = "AUTH_PROFILING_DIRECTORY"
+AUTH_LOOP_MONITOR_INTERVAL_ENV_NAME = "AUTH_LOOP_MONITOR_INTERVAL"
+AUTH_LOOP_BLOCKED_THRESHOLD_ENV_NAME = "AUTH_LOOP_BLOCKED_THRESHOLD"
+AUTH_AUDIT_LOG_FILE_ENV_NAME = "AUTH_AUDIT_LOG_FILE"
+AUTH_AUDIT_LOG_QUEUE_SIZE_ENV_NAME = "AUTH_AUDIT_LOG_QUEUE_SIZE"
+AUTH_AUDIT_LOG_QUEUE_FULL_POLICY_ENV_NAME = "AUTH_AUDIT_LOG_QUEUE_FULL_POLICY"
+AUTH_AUDIT_LOG_BLOCK_TIMEOUT_ENV_NAME = "AUTH_AUDIT_LOG_BLOCK_TIMEOUT"
+AUTH_ALLOWLISTS_FILE_ENV_NAME = "AUTH_ALLOWLISTS_FILE"
+AUTH_ALLOWLISTS_WATCH_INTERVAL_ENV_NAME = "AUTH_ALLOWLISTS_WATCH_INTERVAL"
+AUTH_API_POOL_CONNECTIONS_ENV_NAME = "AUTH_API_POOL_CONNECTIONS"
+AUTH_API_POOL_MAXSIZE_ENV_NAME = "AUTH_API_POOL_MAXSIZE"
+AUTH_API_POOL_BLOCK_ENV_NAME = "AUTH_API_POOL_BLOCK"
+AUTH_TOKEN_VALIDATION_MODE_ENV_NAME = "AUTH_TOKEN_VALIDATION_MODE"
+AUTH_TOKEN_ISSUER_BASE_URL_ENV_NAME = "AUTH_TOKEN_ISSUER_BASE_URL"
+AUTH_JWT_AUDIENCE_ENV_NAME = "AUTH_JWT_AUDIENCE"
+AUTH_JWT_ALGORITHMS_ENV_NAME = "AUTH_JWT_ALGORITHMS"
+AUTH_JWT_LEEWAY_ENV_NAME = "AUTH_JWT_LEEWAY"
+AUTH_JWKS_MIN_REFRESH_INTERVAL_ENV_NAME = "AUTH_JWKS_MIN_REFRESH_INTERVAL"
+AUTH_INTROSPECTION_CACHE_TTL_ENV_NAME = "AUTH_INTROSPECTION_CACHE_TTL"
+AUTH_INTROSPECTION_CACHE_MAX_ENTRIES_ENV_NAME = "AUTH_INTROSPECTION_CACHE_MAX_ENTRIES"
+AUTH_NEGATIVE_TOKEN_CACHE_TTL_ENV_NAME = "AUTH_NEGATIVE_TOKEN_CACHE_TTL"
+AUTH_NEGATIVE_TOKEN_CACHE_MAX_ENTRIES_ENV_NAME = "AUTH_NEGATIVE_TOKEN_CACHE_MAX_ENTRIES"
+AUTH_VALIDATE_BATCH_CONCURRENCY_ENV_NAME = "AUTH_VALIDATE_BATCH_CONCURRENCY"
+AUTH_CREDENTIALS_TOKEN_CACHE_MAX_ENTRIES_ENV_NAME = "AUTH_CREDENTIALS_TOKEN_CACHE_MAX_ENTRIES"
+AUTH_CREDENTIALS_TOKEN_EXPIRY_MARGIN_ENV_NAME = "AUTH_CREDENTIALS_TOKEN_EXPIRY_MARGIN"
+AUTH_CREDENTIALS_TOKEN_REFRESH_AHEAD_ENV_NAME = "AUTH_CREDENTIALS_TOKEN_REFRESH_AHEAD"
+AUTH_CIRCUIT_BREAKER_FAILURE_RATE_ENV_NAME = "AUTH_CIRCUIT_BREAKER_FAILURE_RATE"
+AUTH_CIRCUIT_BREAKER_MIN_CALLS_ENV_NAME = "AUTH_CIRCUIT_BREAKER_MIN_CALLS"
+AUTH_CIRCUIT_BREAKER_WINDOW_ENV_NAME = "AUTH_CIRCUIT_BREAKER_WINDOW"
+AUTH_CIRCUIT_BREAKER_SLOW_CALL_DURATION_ENV_NAME = "AUTH_CIRCUIT_BREAKER_SLOW_CALL_DURATION"
+AUTH_CIRCUIT_BREAKER_OPEN_DURATION_ENV_NAME = "AUTH_CIRCUIT_BREAKER_OPEN_DURATION"
+AUTH_CIRCUIT_BREAKER_MAX_BREAKERS_ENV_NAME = "AUTH_CIRCUIT_BREAKER_MAX_BREAKERS"
+AUTH_API_INTROSPECT_CONNECT_TIMEOUT_ENV_NAME = "AUTH_API_INTROSPECT_CONNECT_TIMEOUT"
+AUTH_API_INTROSPECT_READ_TIMEOUT_ENV_NAME = "AUTH_API_INTROSPECT_READ_TIMEOUT"
+AUTH_API_TOKEN_CONNECT_TIMEOUT_ENV_NAME = "AUTH_API_TOKEN_CONNECT_TIMEOUT"
+AUTH_API_TOKEN_READ_TIMEOUT_ENV_NAME = "AUTH_API_TOKEN_READ_TIMEOUT"
+AUTH_API_ADMIN_USERS_CONNECT_TIMEOUT_ENV_NAME = "AUTH_API_ADMIN_USERS_CONNECT_TIMEOUT"
+AUTH_API_ADMIN_USERS_READ_TIMEOUT_ENV_NAME = "AUTH_API_ADMIN_USERS_READ_TIMEOUT"
+AUTH_API_LOGOUT_CONNECT_TIMEOUT_ENV_NAME = "AUTH_API_LOGOUT_CONNECT_TIMEOUT"
+AUTH_API_LOGOUT_READ_TIMEOUT_ENV_NAME = "AUTH_API_LOGOUT_READ_TIMEOUT"
+AUTH_API_RESET_EMAIL_CONNECT_TIMEOUT_ENV_NAME = "AUTH_API_RESET_EMAIL_CONNECT_TIMEOUT"
+AUTH_API_RESET_EMAIL_READ_TIMEOUT_ENV_NAME = "AUTH_API_RESET_EMAIL_READ_TIMEOUT"
+AUTH_API_RETRY_MAX_ATTEMPTS_ENV_NAME = "AUTH_API_RETRY_MAX_ATTEMPTS"
+AUTH_API_RETRY_BASE_DELAY_ENV_NAME = "AUTH_API_RETRY_BASE_DELAY"
+AUTH_API_RETRY_MAX_DELAY_ENV_NAME = "AUTH_API_RETRY_MAX_DELAY"
+AUTH_API_RETRY_BUDGET_RATIO_ENV_NAME = "AUTH_API_RETRY_BUDGET_RATIO"
+AUTH_API_RETRY_BUDGET_BURST_ENV_NAME = "AUTH_API_RETRY_BUDGET_BURST"
+AUTH_INTROSPECTION_HEDGING_ENV_NAME = "AUTH_INTROSPECTION_HEDGING"
+AUTH_TOKEN_BULKHEAD_MAX_WORKERS_ENV_NAME = "AUTH_TOKEN_BULKHEAD_MAX_WORKERS"
+AUTH_TOKEN_BULKHEAD_MAX_QUEUE_ENV_NAME = "AUTH_TOKEN_BULKHEAD_MAX_QUEUE"
+AUTH_ADMIN_BULKHEAD_MAX_WORKERS_ENV_NAME = "AUTH_ADMIN_BULKHEAD_MAX_WORKERS"
+AUTH_ADMIN_BULKHEAD_MAX_QUEUE_ENV_NAME = "AUTH_ADMIN_BULKHEAD_MAX_QUEUE"
+AUTH_API_CONCURRENCY_INITIAL_LIMIT_ENV_NAME = "AUTH_API_CONCURRENCY_INITIAL_LIMIT"
+AUTH_API_CONCURRENCY_MIN_LIMIT_ENV_NAME = "AUTH_API_CONCURRENCY_MIN_LIMIT"
+AUTH_API_CONCURRENCY_MAX_LIMIT_ENV_NAME = "AUTH_API_CONCURRENCY_MAX_LIMIT"
+AUTH_API_CONCURRENCY_LATENCY_THRESHOLD_ENV_NAME = "AUTH_API_CONCURRENCY_LATENCY_THRESHOLD"
+AUTH_API_CONCURRENCY_QUEUE_TIMEOUT_ENV_NAME = "AUTH_API_CONCURRENCY_QUEUE_TIMEOUT"
 TEST_AUTH_API_KEY_ENV_NAME = "TEST_AUTH_API_KEY"
 TEST_AUTH_API_CLIENT_ID_ENV_NAME = "TEST_AUTH_API_CLIENT_ID"
 TEST_AUTH_API_CLIENT_SECRET_ENV_NAME = "TEST_AUTH_API_CLIENT_SECRET"
@@ -56,12 +293,22 @@ UNAUTHORIZED_ERROR_CODE = "UNAUTHORIZED"
 CONFLICT_ERROR_MESSAGE = "Conflict"
 CONFLICT_ERROR_CODE = "CONFLICT"
 
+SERVICE_UNAVAILABLE_ERROR_MESSAGE = "Service Unavailable"
+SERVICE_UNAVAILABLE_ERROR_CODE = "SERVICE_UNAVAILABLE"
+
+GATEWAY_TIMEOUT_ERROR_MESSAGE = "Gateway Timeout"
+GATEWAY_TIMEOUT_ERROR_CODE = "GATEWAY_TIMEOUT"
+
+TOO_MANY_REQUESTS_ERROR_MESSAGE = "Too Many Requests"
+TOO_MANY_REQUESTS_ERROR_CODE = "TOO_MANY_REQUESTS"
+
 BAD_REQUEST_ERROR_CODE = "BAD_REQUEST"
 
 INTERNAL_ERROR_TYPE = "INTERNAL_ERROR"
 AUTHORIZATION_ERROR_TYPE = "AUTHORIZATION_ERROR"
 VALIDATION_ERROR_TYPE = "VALIDATION_ERROR"
 CONFLICT_ERROR_TYPE = "CONFLICT_ERROR"
+RATE_LIMIT_ERROR_TYPE = "RATE_LIMIT_ERROR"
 
 # API statuses description
 HTTP_400_DESCRIPTION = "Client is sending an incorrect format of API request"
@@ -71,4 +318,7 @@ HTTP_404_DESCRIPTION = "Resource could not be found"
 HTTP_422_DESCRIPTION = (
     "The server was unable to process the request because it contains invalid data"
 )
+HTTP_429_DESCRIPTION = "Client exceeded its rate limit, the request can be retried later"
 HTTP_500_DESCRIPTION = "Unexpected internal error"
+HTTP_503_DESCRIPTION = "The auth API is unavailable, the request can be retried later"
+HTTP_504_DESCRIPTION = "The request deadline was exceeded before the auth API answered"
@@ -1,6 +1,7 @@
 """Environment variables
 """
 
+import json
 import os
 from dotenv import load_dotenv
 from app import constants
@@ -12,6 +13,433 @@ allowed_ip_adresses = os.getenv(constants.AUTH_ALLOWED_IP_ADDRESSES_ENV_NAME)
 allowed_api_keys = os.getenv(
     constants.AUTH_ALLOWED_API_KEYS_ENV_NAME, constants.EMPTY_VALUE
 )
+api_access_check_mode = os.getenv(
+    constants.AUTH_API_ACCESS_CHECK_MODE_ENV_NAME,
+    constants.DEFAULT_API_ACCESS_CHECK_MODE,
+)
+api_keys = os.getenv(constants.AUTH_API_KEYS_ENV_NAME, constants.EMPTY_VALUE)
+trusted_proxies = os.getenv(
+    constants.AUTH_TRUSTED_PROXIES_ENV_NAME, constants.EMPTY_VALUE
+)
+rate_limit_backend = os.getenv(
+    constants.AUTH_RATE_LIMIT_BACKEND_ENV_NAME, constants.DEFAULT_RATE_LIMIT_BACKEND
+)
+rate_limit_default = float(
+    os.getenv(
+        constants.AUTH_RATE_LIMIT_DEFAULT_ENV_NAME, constants.DEFAULT_RATE_LIMIT_DEFAULT
+    )
+)
+rate_limits = {
+    operation_id: float(limit)
+    for operation_id, limit in json.loads(
+        os.getenv(constants.AUTH_RATE_LIMITS_ENV_NAME, constants.DEFAULT_RATE_LIMITS)
+    ).items()
+}
+rate_limit_burst = float(
+    os.getenv(
+        constants.AUTH_RATE_LIMIT_BURST_ENV_NAME, constants.DEFAULT_RATE_LIMIT_BURST
+    )
+)
+rate_limit_max_buckets = int(
+    os.getenv(
+        constants.AUTH_RATE_LIMIT_MAX_BUCKETS_ENV_NAME,
+        constants.DEFAULT_RATE_LIMIT_MAX_BUCKETS,
+    )
+)
+rate_limit_sqlite_path = os.getenv(
+    constants.AUTH_RATE_LIMIT_SQLITE_PATH_ENV_NAME,
+    constants.DEFAULT_RATE_LIMIT_SQLITE_PATH,
+)
+admission_max_in_flight = int(
+    os.getenv(
+        constants.AUTH_ADMISSION_MAX_IN_FLIGHT_ENV_NAME,
+        constants.DEFAULT_ADMISSION_MAX_IN_FLIGHT,
+    )
+)
+admission_queue_delay_target = float(
+    os.getenv(
+        constants.AUTH_ADMISSION_QUEUE_DELAY_TARGET_ENV_NAME,
+        constants.DEFAULT_ADMISSION_QUEUE_DELAY_TARGET,
+    )
+)
+tracing_sample_rate = float(
+    os.getenv(
+        constants.AUTH_TRACING_SAMPLE_RATE_ENV_NAME,
+        constants.DEFAULT_TRACING_SAMPLE_RATE,
+    )
+)
+tracing_file = os.getenv(
+    constants.AUTH_TRACING_FILE_ENV_NAME,
+    constants.DEFAULT_TRACING_FILE,
+)
+tracing_queue_size = int(
+    os.getenv(
+        constants.AUTH_TRACING_QUEUE_SIZE_ENV_NAME,
+        constants.DEFAULT_TRACING_QUEUE_SIZE,
+    )
+)
+server_timing = (
+    os.getenv(
+        constants.AUTH_SERVER_TIMING_ENV_NAME,
+        constants.DEFAULT_SERVER_TIMING,
+    ).lower()
+    == constants.TRUE_VALUE
+)
+profiling = (
+    os.getenv(
+        constants.AUTH_PROFILING_ENV_NAME,
+        constants.DEFAULT_PROFILING,
+    ).lower()
+    == constants.TRUE_VALUE
+)
+profiling_directory = os.getenv(constants.AUTH_PROFILING_DIRECTORY_ENV_NAME)
+loop_monitor_interval = float(
+    os.getenv(
+        constants.AUTH_LOOP_MONITOR_INTERVAL_ENV_NAME,
+        constants.DEFAULT_LOOP_MONITOR_INTERVAL,
+    )
+)
+loop_blocked_threshold = float(
+    os.getenv(
+        constants.AUTH_LOOP_BLOCKED_THRESHOLD_ENV_NAME,
+        constants.DEFAULT_LOOP_BLOCKED_THRESHOLD,
+    )
+)
+audit_log_file = os.getenv(constants.AUTH_AUDIT_LOG_FILE_ENV_NAME)
+audit_log_queue_size = int(
+    os.getenv(
+        constants.AUTH_AUDIT_LOG_QUEUE_SIZE_ENV_NAME,
+        constants.DEFAULT_AUDIT_LOG_QUEUE_SIZE,
+    )
+)
+audit_log_queue_full_policy = os.getenv(
+    constants.AUTH_AUDIT_LOG_QUEUE_FULL_POLICY_ENV_NAME,
+    constants.DEFAULT_AUDIT_LOG_QUEUE_FULL_POLICY,
+).lower()
+audit_log_block_timeout = float(
+    os.getenv(
+        constants.AUTH_AUDIT_LOG_BLOCK_TIMEOUT_ENV_NAME,
+        constants.DEFAULT_AUDIT_LOG_BLOCK_TIMEOUT,
+    )
+)
+allowlists_file = os.getenv(constants.AUTH_ALLOWLISTS_FILE_ENV_NAME)
+allowlists_watch_interval = float(
+    os.getenv(
+        constants.AUTH_ALLOWLISTS_WATCH_INTERVAL_ENV_NAME,
+        constants.DEFAULT_ALLOWLISTS_WATCH_INTERVAL,
+    )
+)
+
+auth_api_pool_connections = int(
+    os.getenv(
+        constants.AUTH_API_POOL_CONNECTIONS_ENV_NAME,
+        constants.DEFAULT_AUTH_API_POOL_CONNECTIONS,
+    )
+)
+auth_api_pool_maxsize = int(
+    os.getenv(
+        constants.AUTH_API_POOL_MAXSIZE_ENV_NAME,
+        constants.DEFAULT_AUTH_API_POOL_MAXSIZE,
+    )
+)
+auth_api_pool_block = (
+    os.getenv(
+        constants.AUTH_API_POOL_BLOCK_ENV_NAME,
+        constants.DEFAULT_AUTH_API_POOL_BLOCK,
+    ).lower()
+    == constants.TRUE_VALUE
+)
+
+token_validation_mode = os.getenv(
+    constants.AUTH_TOKEN_VALIDATION_MODE_ENV_NAME,
+    constants.DEFAULT_TOKEN_VALIDATION_MODE,
+)
+token_issuer_base_url = os.getenv(
+    constants.AUTH_TOKEN_ISSUER_BASE_URL_ENV_NAME, auth_api_base_url
+)
+jwt_audience = os.getenv(constants.AUTH_JWT_AUDIENCE_ENV_NAME)
+jwt_algorithms = os.getenv(
+    constants.AUTH_JWT_ALGORITHMS_ENV_NAME, constants.DEFAULT_JWT_ALGORITHMS
+).split(constants.JWT_ALGORITHMS_SEPARATOR)
+jwt_leeway = int(
+    os.getenv(constants.AUTH_JWT_LEEWAY_ENV_NAME, constants.DEFAULT_JWT_LEEWAY)
+)
+jwks_min_refresh_interval = int(
+    os.getenv(
+        constants.AUTH_JWKS_MIN_REFRESH_INTERVAL_ENV_NAME,
+        constants.DEFAULT_JWKS_MIN_REFRESH_INTERVAL,
+    )
+)
+
+introspection_cache_ttl = int(
+    os.getenv(
+        constants.AUTH_INTROSPECTION_CACHE_TTL_ENV_NAME,
+        constants.DEFAULT_INTROSPECTION_CACHE_TTL,
+    )
+)
+introspection_cache_max_entries = int(
+    os.getenv(
+        constants.AUTH_INTROSPECTION_CACHE_MAX_ENTRIES_ENV_NAME,
+        constants.DEFAULT_INTROSPECTION_CACHE_MAX_ENTRIES,
+    )
+)
+negative_token_cache_ttl = int(
+    os.getenv(
+        constants.AUTH_NEGATIVE_TOKEN_CACHE_TTL_ENV_NAME,
+        constants.DEFAULT_NEGATIVE_TOKEN_CACHE_TTL,
+    )
+)
+negative_token_cache_max_entries = int(
+    os.getenv(
+        constants.AUTH_NEGATIVE_TOKEN_CACHE_MAX_ENTRIES_ENV_NAME,
+        constants.DEFAULT_NEGATIVE_TOKEN_CACHE_MAX_ENTRIES,
+    )
+)
+
+validate_batch_concurrency = int(
+    os.getenv(
+        constants.AUTH_VALIDATE_BATCH_CONCURRENCY_ENV_NAME,
+        constants.DEFAULT_VALIDATE_BATCH_CONCURRENCY,
+    )
+)
+
+credentials_token_cache_max_entries = int(
+    os.getenv(
+        constants.AUTH_CREDENTIALS_TOKEN_CACHE_MAX_ENTRIES_ENV_NAME,
+        constants.DEFAULT_CREDENTIALS_TOKEN_CACHE_MAX_ENTRIES,
+    )
+)
+
+credentials_token_expiry_margin = int(
+    os.getenv(
+        constants.AUTH_CREDENTIALS_TOKEN_EXPIRY_MARGIN_ENV_NAME,
+        constants.DEFAULT_CREDENTIALS_TOKEN_EXPIRY_MARGIN,
+    )
+)
+
+credentials_token_refresh_ahead = int(
+    os.getenv(
+        constants.AUTH_CREDENTIALS_TOKEN_REFRESH_AHEAD_ENV_NAME,
+        constants.DEFAULT_CREDENTIALS_TOKEN_REFRESH_AHEAD,
+    )
+)
+
+circuit_breaker_failure_rate = float(
+    os.getenv(
+        constants.AUTH_CIRCUIT_BREAKER_FAILURE_RATE_ENV_NAME,
+        constants.DEFAULT_CIRCUIT_BREAKER_FAILURE_RATE,
+    )
+)
+
+circuit_breaker_min_calls = int(
+    os.getenv(
+        constants.AUTH_CIRCUIT_BREAKER_MIN_CALLS_ENV_NAME,
+        constants.DEFAULT_CIRCUIT_BREAKER_MIN_CALLS,
+    )
+)
+
+circuit_breaker_window = int(
+    os.getenv(
+        constants.AUTH_CIRCUIT_BREAKER_WINDOW_ENV_NAME,
+        constants.DEFAULT_CIRCUIT_BREAKER_WINDOW,
+    )
+)
+
+circuit_breaker_slow_call_duration = float(
+    os.getenv(
+        constants.AUTH_CIRCUIT_BREAKER_SLOW_CALL_DURATION_ENV_NAME,
+        constants.DEFAULT_CIRCUIT_BREAKER_SLOW_CALL_DURATION,
+    )
+)
+
+circuit_breaker_open_duration = int(
+    os.getenv(
+        constants.AUTH_CIRCUIT_BREAKER_OPEN_DURATION_ENV_NAME,
+        constants.DEFAULT_CIRCUIT_BREAKER_OPEN_DURATION,
+    )
+)
+circuit_breaker_max_breakers = int(
+    os.getenv(
+        constants.AUTH_CIRCUIT_BREAKER_MAX_BREAKERS_ENV_NAME,
+        constants.DEFAULT_CIRCUIT_BREAKER_MAX_BREAKERS,
+    )
+)
+
+introspect_connect_timeout = float(
+    os.getenv(
+        constants.AUTH_API_INTROSPECT_CONNECT_TIMEOUT_ENV_NAME,
+        constants.DEFAULT_UPSTREAM_CONNECT_TIMEOUT,
+    )
+)
+
+introspect_read_timeout = float(
+    os.getenv(
+        constants.AUTH_API_INTROSPECT_READ_TIMEOUT_ENV_NAME,
+        constants.DEFAULT_UPSTREAM_READ_TIMEOUT,
+    )
+)
+
+token_connect_timeout = float(
+    os.getenv(
+        constants.AUTH_API_TOKEN_CONNECT_TIMEOUT_ENV_NAME,
+        constants.DEFAULT_UPSTREAM_CONNECT_TIMEOUT,
+    )
+)
+
+token_read_timeout = float(
+    os.getenv(
+        constants.AUTH_API_TOKEN_READ_TIMEOUT_ENV_NAME,
+        constants.DEFAULT_UPSTREAM_READ_TIMEOUT,
+    )
+)
+
+admin_users_connect_timeout = float(
+    os.getenv(
+        constants.AUTH_API_ADMIN_USERS_CONNECT_TIMEOUT_ENV_NAME,
+        constants.DEFAULT_UPSTREAM_CONNECT_TIMEOUT,
+    )
+)
+
+admin_users_read_timeout = float(
+    os.getenv(
+        constants.AUTH_API_ADMIN_USERS_READ_TIMEOUT_ENV_NAME,
+        constants.DEFAULT_UPSTREAM_READ_TIMEOUT,
+    )
+)
+
+logout_connect_timeout = float(
+    os.getenv(
+        constants.AUTH_API_LOGOUT_CONNECT_TIMEOUT_ENV_NAME,
+        constants.DEFAULT_UPSTREAM_CONNECT_TIMEOUT,
+    )
+)
+
+logout_read_timeout = float(
+    os.getenv(
+        constants.AUTH_API_LOGOUT_READ_TIMEOUT_ENV_NAME,
+        constants.DEFAULT_UPSTREAM_READ_TIMEOUT,
+    )
+)
+
+reset_email_connect_timeout = float(
+    os.getenv(
+        constants.AUTH_API_RESET_EMAIL_CONNECT_TIMEOUT_ENV_NAME,
+        constants.DEFAULT_UPSTREAM_CONNECT_TIMEOUT,
+    )
+)
+
+reset_email_read_timeout = float(
+    os.getenv(
+        constants.AUTH_API_RESET_EMAIL_READ_TIMEOUT_ENV_NAME,
+        constants.DEFAULT_UPSTREAM_READ_TIMEOUT,
+    )
+)
+
+retry_max_attempts = int(
+    os.getenv(
+        constants.AUTH_API_RETRY_MAX_ATTEMPTS_ENV_NAME,
+        constants.DEFAULT_RETRY_MAX_ATTEMPTS,
+    )
+)
+
+retry_base_delay = float(
+    os.getenv(
+        constants.AUTH_API_RETRY_BASE_DELAY_ENV_NAME,
+        constants.DEFAULT_RETRY_BASE_DELAY,
+    )
+)
+
+retry_max_delay = float(
+    os.getenv(
+        constants.AUTH_API_RETRY_MAX_DELAY_ENV_NAME,
+        constants.DEFAULT_RETRY_MAX_DELAY,
+    )
+)
+
+retry_budget_ratio = float(
+    os.getenv(
+        constants.AUTH_API_RETRY_BUDGET_RATIO_ENV_NAME,
+        constants.DEFAULT_RETRY_BUDGET_RATIO,
+    )
+)
+
+retry_budget_burst = int(
+    os.getenv(
+        constants.AUTH_API_RETRY_BUDGET_BURST_ENV_NAME,
+        constants.DEFAULT_RETRY_BUDGET_BURST,
+    )
+)
+
+introspection_hedging = (
+    os.getenv(
+        constants.AUTH_INTROSPECTION_HEDGING_ENV_NAME,
+        constants.DEFAULT_INTROSPECTION_HEDGING,
+    ).lower()
+    == constants.TRUE_VALUE
+)
+
+token_bulkhead_max_workers = int(
+    os.getenv(
+        constants.AUTH_TOKEN_BULKHEAD_MAX_WORKERS_ENV_NAME,
+        constants.DEFAULT_TOKEN_BULKHEAD_MAX_WORKERS,
+    )
+)
+
+token_bulkhead_max_queue = int(
+    os.getenv(
+        constants.AUTH_TOKEN_BULKHEAD_MAX_QUEUE_ENV_NAME,
+        constants.DEFAULT_TOKEN_BULKHEAD_MAX_QUEUE,
+    )
+)
+
+admin_bulkhead_max_workers = int(
+    os.getenv(
+        constants.AUTH_ADMIN_BULKHEAD_MAX_WORKERS_ENV_NAME,
+        constants.DEFAULT_ADMIN_BULKHEAD_MAX_WORKERS,
+    )
+)
+
+admin_bulkhead_max_queue = int(
+    os.getenv(
+        constants.AUTH_ADMIN_BULKHEAD_MAX_QUEUE_ENV_NAME,
+        constants.DEFAULT_ADMIN_BULKHEAD_MAX_QUEUE,
+    )
+)
+
+upstream_concurrency_initial_limit = int(
+    os.getenv(
+        constants.AUTH_API_CONCURRENCY_INITIAL_LIMIT_ENV_NAME,
+        constants.DEFAULT_UPSTREAM_CONCURRENCY_INITIAL_LIMIT,
+    )
+)
+
+upstream_concurrency_min_limit = int(
+    os.getenv(
+        constants.AUTH_API_CONCURRENCY_MIN_LIMIT_ENV_NAME,
+        constants.DEFAULT_UPSTREAM_CONCURRENCY_MIN_LIMIT,
+    )
+)
+
+upstream_concurrency_max_limit = int(
+    os.getenv(
+        constants.AUTH_API_CONCURRENCY_MAX_LIMIT_ENV_NAME,
+        constants.DEFAULT_UPSTREAM_CONCURRENCY_MAX_LIMIT,
+    )
+)
+
+upstream_concurrency_latency_threshold = float(
+    os.getenv(
+        constants.AUTH_API_CONCURRENCY_LATENCY_THRESHOLD_ENV_NAME,
+        constants.DEFAULT_UPSTREAM_CONCURRENCY_LATENCY_THRESHOLD,
+    )
+)
+
+upstream_concurrency_queue_timeout = float(
+    os.getenv(
+        constants.AUTH_API_CONCURRENCY_QUEUE_TIMEOUT_ENV_NAME,
+        constants.DEFAULT_UPSTREAM_CONCURRENCY_QUEUE_TIMEOUT,
+    )
+)
 
 test_auth_api_key = os.getenv(constants.TEST_AUTH_API_KEY_ENV_NAME)
 test_auth_api_client_id = os.getenv(constants.TEST_AUTH_API_CLIENT_ID_ENV_NAME)
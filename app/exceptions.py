@@ -1,6 +1,7 @@
 """Exceptions
 """
 
+import math
 from fastapi import HTTPException, status
 from . import constants
 from . import models
@@ -51,6 +52,44 @@ CONFLICT_ERROR = HTTPException(
     ).dict(),
 )
 
+SERVICE_UNAVAILABLE_ERROR = HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    detail=models.APIResponse(
+        message=constants.SERVICE_UNAVAILABLE_ERROR_MESSAGE,
+        code=constants.SERVICE_UNAVAILABLE_ERROR_CODE,
+        type=constants.INTERNAL_ERROR_TYPE,
+    ).dict(),
+)
+
+GATEWAY_TIMEOUT_ERROR = HTTPException(
+    status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+    detail=models.APIResponse(
+        message=constants.GATEWAY_TIMEOUT_ERROR_MESSAGE,
+        code=constants.GATEWAY_TIMEOUT_ERROR_CODE,
+        type=constants.INTERNAL_ERROR_TYPE,
+    ).dict(),
+)
+
+
+def get_too_many_requests_error(retry_after: float) -> HTTPException:
+    """Gets a too many requests error telling when to retry
+
+    Args:
+        retry_after (float): seconds to wait before retrying
+
+    Returns:
+        HTTPException: 429 HTTP Exception
+    """
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=models.APIResponse(
+            message=constants.TOO_MANY_REQUESTS_ERROR_MESSAGE,
+            code=constants.TOO_MANY_REQUESTS_ERROR_CODE,
+            type=constants.RATE_LIMIT_ERROR_TYPE,
+        ).dict(),
+        headers={constants.RETRY_AFTER_HEADER: str(math.ceil(retry_after))},
+    )
+
 
 def get_validation_error(data: dict) -> HTTPException:
     """Gets a validation error from given data
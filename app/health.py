@@ -0,0 +1,36 @@
+"""API health router
+"""
+
+from fastapi import APIRouter
+from .auth import circuit_breaker
+from .auth import concurrency
+from . import constants
+from . import models
+
+
+router = APIRouter()
+
+
+@router.get(
+    constants.HEALTH_ROUTE_PATH,
+    tags=constants.HEALTH_TAGS,
+    operation_id=constants.HEALTH_OPERATION_ID,
+    response_model=models.HealthResponse,
+)
+def get_health() -> models.HealthResponse:
+    """Gets the API health along with the auth API circuits and concurrency limit
+
+    The API is degraded while any circuit breaker is open, yet still answers
+    with an ok status as breakers are per realm and one realm failing must not
+    take the instance out of the load balancers for every other realm.
+    """
+    circuits = circuit_breaker.get_states()
+    health_status = constants.HEALTHY_STATUS
+    if circuit_breaker.OPEN_STATE in circuits.values():
+        health_status = constants.DEGRADED_STATUS
+    return models.HealthResponse(
+        status=health_status,
+        circuits=circuits,
+        concurrencyLimit=concurrency.upstream_limiter.get_limit(),
+        inFlight=concurrency.upstream_limiter.in_flight,
+    )
@@ -0,0 +1,49 @@
+"""Health router tests
+"""
+
+import unittest
+from fastapi import status
+from fastapi.testclient import TestClient
+from app import main
+from app.auth import circuit_breaker
+from app.auth import concurrency
+
+
+class HealthRouterTest(unittest.TestCase):
+    """Health router functions tests"""
+
+    def setUp(self):
+        self.client = TestClient(main.app)
+        circuit_breaker.breakers.clear()
+
+    def tearDown(self):
+        circuit_breaker.breakers.clear()
+
+    def test_get_health(self):
+        """get_health: It is healthy while every circuit breaker is closed"""
+        circuit_breaker.get_breaker("test-realm", "http://auth-api.test/path")
+        response = self.client.get("/health")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["status"], "ok")
+        self.assertEqual(
+            response.json()["circuits"], {"auth-api.test/test-realm": "closed"}
+        )
+        self.assertEqual(
+            response.json()["concurrencyLimit"],
+            concurrency.upstream_limiter.get_limit(),
+        )
+
+    def test_get_health_degraded(self):
+        """get_health: It reports open circuit breakers without failing the probe"""
+        breaker = circuit_breaker.get_breaker("test-realm", "http://auth-api.test/path")
+        breaker.open(0)
+        response = self.client.get("/health")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["status"], "degraded")
+        self.assertEqual(
+            response.json()["circuits"], {"auth-api.test/test-realm": "open"}
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
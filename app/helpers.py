@@ -1,10 +1,184 @@
 """API common helpers
 """
 
+import typing
 from fastapi import Header, Request
+from . import api_keys
 from . import environment
 from . import constants
 from . import exceptions
+from . import ip_ranges
+from . import server_timing
+from . import tracing
+
+
+class Allowlists(typing.NamedTuple):
+    """Parsed api keys, ip addresses and trusted proxies allowlists"""
+
+    source: typing.Tuple[str, str, str, str]
+    api_keys: typing.Dict[str, api_keys.ApiKey]
+    ip_addresses: typing.FrozenSet[str]
+    ip_networks: ip_ranges.IpRangeTrie
+    trusted_proxies: ip_ranges.IpRangeTrie
+
+
+allowlists_cache = Allowlists(
+    source=(None, None, None, None),
+    api_keys={},
+    ip_addresses=frozenset(),
+    ip_networks=ip_ranges.IpRangeTrie(),
+    trusted_proxies=ip_ranges.IpRangeTrie(),
+)
+reloaded_allowlists: typing.Optional[Allowlists] = None
+
+
+def parse_allowlist(
+    value: typing.Optional[str], separator: str
+) -> typing.FrozenSet[str]:
+    """Parses a separated list of allowed values
+
+    Args:
+      value (typing.Optional[str]): The separated values
+      separator (str): The values separator
+
+    Returns:
+      typing.FrozenSet[str]: The allowed values
+    """
+    if not value:
+        return frozenset()
+    return frozenset(item.strip() for item in value.split(separator) if item.strip())
+
+
+def parse_allowlists(source: typing.Tuple[str, str, str, str]) -> Allowlists:
+    """Parses the allowlists
+
+    Args:
+      source (typing.Tuple[str, str, str, str]): The allowed api keys, the
+        allowed ip addresses, the trusted proxies and the api keys metadata
+
+    Returns:
+      Allowlists: The parsed allowlists
+    """
+    ip_addresses = parse_allowlist(source[1], constants.IP_ADDRESSES_SEPARATOR)
+    allowed_api_keys = parse_allowlist(source[0], constants.API_KEYS_SEPARATOR)
+    return Allowlists(
+        source=source,
+        api_keys=api_keys.build_api_keys_index(
+            [api_keys.parse_allowed_api_key(key) for key in allowed_api_keys]
+            + api_keys.parse_api_keys_metadata(source[3])
+        ),
+        ip_addresses=ip_addresses,
+        ip_networks=ip_ranges.parse_ip_ranges(ip_addresses),
+        trusted_proxies=ip_ranges.parse_ip_ranges(
+            parse_allowlist(source[2], constants.IP_ADDRESSES_SEPARATOR)
+        ),
+    )
+
+
+def set_allowlists(allowlists: typing.Optional[Allowlists]) -> None:
+    """Swaps the allowlists in use with reloaded ones
+
+    Args:
+      allowlists (typing.Optional[Allowlists]): The reloaded allowlists, or
+        None to go back to the environment ones
+    """
+    global reloaded_allowlists  # pylint: disable=global-statement
+    reloaded_allowlists = allowlists
+
+
+def get_allowlists() -> Allowlists:
+    """Gets the allowlists, parsing them only when their source values change
+
+    Reloaded allowlists are parsed by the reloader and swapped as a whole, so
+    requests never see a mix of old and new values. Until the first reload,
+    the environment values are parsed once.
+
+    Returns:
+      Allowlists: The parsed allowlists
+    """
+    global allowlists_cache  # pylint: disable=global-statement
+    allowlists = reloaded_allowlists
+    if allowlists is not None:
+        return allowlists
+    allowlists = allowlists_cache
+    source = (
+        environment.allowed_api_keys,
+        environment.allowed_ip_adresses,
+        environment.trusted_proxies,
+        environment.api_keys,
+    )
+    if allowlists.source != source:
+        allowlists = parse_allowlists(source)
+        allowlists_cache = allowlists
+    return allowlists
+
+
+def get_client_host(
+    peer: typing.Optional[str], forwarded_for: typing.Optional[str]
+) -> typing.Optional[str]:
+    """Gets the ip address of the client behind the trusted proxies
+
+    The forwarded for header is only read when the peer is a trusted proxy,
+    and its hops are walked from the closest one, skipping the trusted
+    proxies, so clients cannot spoof their address.
+
+    Args:
+      peer (typing.Optional[str]): The ip address of the connection peer
+      forwarded_for (typing.Optional[str]): The forwarded for header
+
+    Returns:
+      typing.Optional[str]: The client ip address
+    """
+    trusted_proxies = get_allowlists().trusted_proxies
+    if not forwarded_for or not trusted_proxies:
+        return peer
+    if not trusted_proxies.contains(ip_ranges.parse_ip_address(peer)):
+        return peer
+
+    hops = [
+        hop.strip() for hop in forwarded_for.split(constants.FORWARDED_FOR_SEPARATOR)
+    ]
+    for hop in reversed(hops):
+        if not trusted_proxies.contains(ip_ranges.parse_ip_address(hop)):
+            return hop
+    return hops[0]
+
+
+def check_api_access(
+    api_key: typing.Optional[str],
+    host: typing.Optional[str],
+    application: typing.Optional[str] = None,
+) -> api_keys.ApiKey:
+    """Checks the api key and ip address of a caller
+
+    Args:
+      api_key (typing.Optional[str]): API Key
+      host (typing.Optional[str]): Caller ip address
+      application (typing.Optional[str], optional): Application in context
+
+    Raises:
+      HTTPException: Authorization error when providing an invalid api key
+      HTTPException: Forbidden error when the ip addres is not within the allowed
+      ones or the api key is not allowed for the application
+
+    Returns:
+      api_keys.ApiKey: The api key digest and metadata
+    """
+    allowlists = get_allowlists()
+
+    allowed_key = api_keys.find_api_key(allowlists.api_keys, api_key)
+    if allowed_key is None:
+        raise exceptions.UNAUTHORIZED_ERROR
+
+    if host not in allowlists.ip_addresses and not allowlists.ip_networks.contains(
+        ip_ranges.parse_ip_address(host)
+    ):
+        raise exceptions.FORBIDDEN_ERROR
+
+    if not allowed_key.allows_application(application):
+        raise exceptions.FORBIDDEN_ERROR
+
+    return allowed_key
 
 
 def validate_api_access(
@@ -13,21 +187,30 @@ def validate_api_access(
 ):
     """Validates the access to the API
 
+    In the middleware access check mode the access was already checked before
+    reading the request, so there is nothing left to do. Otherwise the api key
+    digest and metadata are kept in the request state.
+
     Args:
       request (Request): incoming request
       api_key (str, optional): API Key
 
     Raises:
       HTTPException: Authorization error when providing an invalid api key
-      HTTPException: Forbidden error when the ip addres is not an allowed one
+      HTTPException: Forbidden error when the ip addres is not an allowed one or
+      the api key is not allowed for the application
     """
-    allowed_keys = environment.allowed_api_keys.split(constants.API_KEYS_SEPARATOR)
-    allowed_adresses = environment.allowed_ip_adresses.split(
-        constants.IP_ADDRESSES_SEPARATOR
-    )
+    if environment.api_access_check_mode == constants.MIDDLEWARE_ACCESS_CHECK_MODE:
+        return
 
-    if not api_key in allowed_keys:
-        raise exceptions.UNAUTHORIZED_ERROR
-
-    if not request.client.host in allowed_adresses:
-        raise exceptions.FORBIDDEN_ERROR
+    with tracing.start_span(constants.ACCESS_CHECK_SPAN_NAME), server_timing.timed(
+        constants.ACCESS_CHECK_TIMING_NAME
+    ):
+        host = get_client_host(
+            request.client.host,
+            request.headers.get(constants.FORWARDED_FOR_HEADER.decode("latin-1")),
+        )
+        application = request.headers.get(
+            constants.APPLICATION_HEADER.decode("latin-1")
+        )
+        request.state.api_key = check_api_access(api_key, host, application)
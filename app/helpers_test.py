@@ -1,10 +1,20 @@
 """Helpers tests
 """
 
+import json
 import unittest
 from unittest.mock import Mock, patch
 from fastapi import HTTPException
-from app.helpers import validate_api_access
+from app.api_keys import get_digest
+from app.helpers import (
+    check_api_access,
+    get_allowlists,
+    get_client_host,
+    parse_allowlist,
+    parse_allowlists,
+    set_allowlists,
+    validate_api_access,
+)
 from app.exceptions import UNAUTHORIZED_ERROR, FORBIDDEN_ERROR
 
 
@@ -14,7 +24,10 @@ ALLOWED_KEYS = f"{ALLOWED_KEY},test-api-key-2"
 ALLOWED_IP_ADDRESSES = f"{ALLOWED_IP_ADDRESS},192.0.0.100"
 
 mock_environment = Mock(
-    allowed_api_keys=ALLOWED_KEYS, allowed_ip_adresses=ALLOWED_IP_ADDRESSES
+    allowed_api_keys=ALLOWED_KEYS,
+    allowed_ip_adresses=ALLOWED_IP_ADDRESSES,
+    trusted_proxies="",
+    api_keys="",
 )
 
 
@@ -61,6 +74,169 @@ class HelpersTest(unittest.TestCase):
             ALLOWED_KEY,
         )
 
+    @patch(
+        "app.helpers.environment",
+        Mock(
+            allowed_api_keys=ALLOWED_KEYS,
+            allowed_ip_adresses=ALLOWED_IP_ADDRESSES,
+            api_access_check_mode="middleware",
+        ),
+    )
+    def test_validate_api_access_middleware_mode(self):
+        """validate_api_access: It leaves the check to the middleware in the middleware mode"""
+        request_mock = Mock(client=Mock(host="127.1.2.3"))
+        validate_api_access(request_mock, "not-allowed-key")
+
+    @patch(
+        "app.helpers.environment",
+        mock_environment,
+    )
+    def test_check_api_access_missing(self):
+        """check_api_access: It fails without api key or ip address"""
+        self.assertRaises(
+            UNAUTHORIZED_ERROR.__class__, check_api_access, None, ALLOWED_IP_ADDRESS
+        )
+        self.assertRaises(FORBIDDEN_ERROR.__class__, check_api_access, ALLOWED_KEY, None)
+
+    def test_parse_allowlist(self):
+        """parse_allowlist: It parses the separated values into a set, skipping blanks"""
+        self.assertEqual(
+            parse_allowlist(" key-1,key-2,,key-1 ", ","), frozenset({"key-1", "key-2"})
+        )
+        self.assertEqual(parse_allowlist(None, ","), frozenset())
+
+    def test_get_allowlists_parsed_once(self):
+        """get_allowlists: It parses the allowlists again only when their values change"""
+        environment = Mock(
+            allowed_api_keys=ALLOWED_KEYS,
+            allowed_ip_adresses=ALLOWED_IP_ADDRESSES,
+            trusted_proxies="",
+            api_keys="",
+        )
+        with patch("app.helpers.environment", environment):
+            allowlists = get_allowlists()
+            self.assertIs(get_allowlists(), allowlists)
+            self.assertIn(get_digest(ALLOWED_KEY), allowlists.api_keys)
+
+            environment.allowed_api_keys = "reloaded-key"
+            reloaded = get_allowlists()
+            self.assertEqual(list(reloaded.api_keys), [get_digest("reloaded-key")])
+            self.assertEqual(reloaded.ip_addresses, allowlists.ip_addresses)
+
+    def test_get_allowlists_reloaded(self):
+        """get_allowlists: It serves the reloaded allowlists as a whole over the environment ones"""
+        self.addCleanup(set_allowlists, None)
+        reloaded = parse_allowlists(("reloaded-key", "10.0.0.1", "10.1.0.0/16", ""))
+        with patch("app.helpers.environment", mock_environment):
+            set_allowlists(reloaded)
+            self.assertIs(get_allowlists(), reloaded)
+
+            set_allowlists(None)
+            self.assertIn(get_digest(ALLOWED_KEY), get_allowlists().api_keys)
+
+    @patch(
+        "app.helpers.environment",
+        Mock(
+            allowed_api_keys=ALLOWED_KEYS,
+            allowed_ip_adresses="10.1.0.0/16,2001:db8::/32,testclient",
+            trusted_proxies="",
+            api_keys="",
+        ),
+    )
+    def test_check_api_access_ip_ranges(self):
+        """check_api_access: It allows the ip addresses within the allowed ranges"""
+        for host in ["10.1.0.1", "10.1.255.254", "2001:db8::1", "::ffff:10.1.2.3"]:
+            check_api_access(ALLOWED_KEY, host)
+        check_api_access(ALLOWED_KEY, "testclient")
+        for host in ["10.2.0.1", "2001:db9::1", "not-an-ip", None]:
+            self.assertRaises(
+                FORBIDDEN_ERROR.__class__, check_api_access, ALLOWED_KEY, host
+            )
+
+    @patch(
+        "app.helpers.environment",
+        Mock(
+            allowed_api_keys=ALLOWED_KEYS,
+            allowed_ip_adresses=ALLOWED_IP_ADDRESSES,
+            trusted_proxies="172.16.0.0/12, 192.168.1.1",
+            api_keys="",
+        ),
+    )
+    def test_get_client_host(self):
+        """get_client_host: It reads the client from the forwarded for header of trusted proxies"""
+        self.assertEqual(get_client_host("172.16.0.5", "203.0.113.9"), "203.0.113.9")
+        self.assertEqual(
+            get_client_host("172.16.0.5", "198.51.100.1, 203.0.113.9, 192.168.1.1"),
+            "203.0.113.9",
+        )
+        self.assertEqual(get_client_host("172.16.0.5", "192.168.1.1"), "192.168.1.1")
+        self.assertEqual(get_client_host("172.16.0.5", None), "172.16.0.5")
+        self.assertEqual(get_client_host("203.0.113.9", "10.0.0.12"), "203.0.113.9")
+
+    @patch(
+        "app.helpers.environment",
+        Mock(
+            allowed_api_keys=ALLOWED_KEYS,
+            allowed_ip_adresses=ALLOWED_IP_ADDRESSES,
+            trusted_proxies="172.16.0.0/12",
+            api_keys="",
+        ),
+    )
+    def test_validate_api_access_trusted_proxy(self):
+        """validate_api_access: It checks the client behind a trusted proxy"""
+        request_mock = Mock(
+            client=Mock(host="172.16.0.5"),
+            headers={"x-forwarded-for": ALLOWED_IP_ADDRESS},
+        )
+        validate_api_access(request_mock, ALLOWED_KEY)
+        request_mock.headers = {"x-forwarded-for": "127.1.2.3"}
+        self.assertRaises(
+            FORBIDDEN_ERROR.__class__, validate_api_access, request_mock, ALLOWED_KEY
+        )
+
+    @patch(
+        "app.helpers.environment",
+        Mock(
+            allowed_api_keys=f"{get_digest(ALLOWED_KEY)},test-api-key-2",
+            allowed_ip_adresses=ALLOWED_IP_ADDRESSES,
+            trusted_proxies="",
+            api_keys=json.dumps(
+                [
+                    {
+                        "digest": get_digest("test-api-key-3"),
+                        "owner": "test-owner",
+                        "applications": ["test-app"],
+                        "rateLimit": 10,
+                    }
+                ]
+            ),
+        ),
+    )
+    def test_check_api_access_digests(self):
+        """check_api_access: It finds the api keys by digest with their metadata"""
+        self.assertEqual(
+            check_api_access(ALLOWED_KEY, ALLOWED_IP_ADDRESS).digest,
+            get_digest(ALLOWED_KEY),
+        )
+        self.assertIsNone(check_api_access("test-api-key-2", ALLOWED_IP_ADDRESS).owner)
+
+        api_key = check_api_access("test-api-key-3", ALLOWED_IP_ADDRESS, "test-app")
+        self.assertEqual(api_key.owner, "test-owner")
+        self.assertEqual(api_key.rate_limit, 10.0)
+        self.assertRaises(
+            FORBIDDEN_ERROR.__class__,
+            check_api_access,
+            "test-api-key-3",
+            ALLOWED_IP_ADDRESS,
+            "other-app",
+        )
+        self.assertRaises(
+            UNAUTHORIZED_ERROR.__class__,
+            check_api_access,
+            get_digest(ALLOWED_KEY),
+            ALLOWED_IP_ADDRESS,
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
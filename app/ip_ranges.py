@@ -0,0 +1,130 @@
+"""IP address ranges lookup
+"""
+
+import ipaddress
+import typing
+
+
+IpAddress = typing.Union[ipaddress.IPv4Address, ipaddress.IPv6Address]
+IpNetwork = typing.Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+ZERO_BRANCH = 0
+ONE_BRANCH = 1
+TERMINAL = 2
+
+
+def new_node() -> list:
+    """Creates an empty trie node
+
+    Returns:
+        list: The zero branch, one branch and terminal flag of the node
+    """
+    return [None, None, False]
+
+
+def parse_ip_address(value: typing.Optional[str]) -> typing.Optional[IpAddress]:
+    """Parses an ip address, mapping IPv4-mapped IPv6 addresses to IPv4
+
+    Args:
+        value (typing.Optional[str]): The ip address
+
+    Returns:
+        typing.Optional[IpAddress]: The ip address or None when it is not a valid one
+    """
+    if not value:
+        return None
+    try:
+        address = ipaddress.ip_address(value.strip())
+    except ValueError:
+        return None
+    if address.version == 6 and address.ipv4_mapped:
+        return address.ipv4_mapped
+    return address
+
+
+def parse_ip_network(value: str) -> typing.Optional[IpNetwork]:
+    """Parses an ip address or CIDR range
+
+    Args:
+        value (str): The ip address or CIDR range
+
+    Returns:
+        typing.Optional[IpNetwork]: The range or None when it is not a valid one
+    """
+    try:
+        return ipaddress.ip_network(value.strip(), strict=False)
+    except ValueError:
+        return None
+
+
+class IpRangeTrie:
+    """Binary prefix trie of IPv4 and IPv6 ranges
+
+    Every range is stored as the path of its prefix bits, so checking an
+    address walks at most its prefix length, regardless of the number of
+    ranges.
+    """
+
+    def __init__(self, networks: typing.Iterable[IpNetwork] = ()):
+        self.roots = {4: new_node(), 6: new_node()}
+        self.size = 0
+        for network in networks:
+            self.add(network)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def add(self, network: IpNetwork) -> None:
+        """Adds a range to the trie
+
+        Args:
+            network (IpNetwork): The range
+        """
+        node = self.roots[network.version]
+        value = int(network.network_address)
+        bits = network.max_prefixlen
+        for index in range(network.prefixlen):
+            if node[TERMINAL]:
+                return
+            branch = (value >> (bits - 1 - index)) & 1
+            if node[branch] is None:
+                node[branch] = new_node()
+            node = node[branch]
+        node[TERMINAL] = True
+        node[ZERO_BRANCH] = node[ONE_BRANCH] = None
+        self.size += 1
+
+    def contains(self, address: typing.Optional[IpAddress]) -> bool:
+        """Checks if an address is within any range of the trie
+
+        Args:
+            address (typing.Optional[IpAddress]): The address
+
+        Returns:
+            bool: True when a range contains the address
+        """
+        if address is None:
+            return False
+        node = self.roots[address.version]
+        value = int(address)
+        bits = address.max_prefixlen
+        for index in range(bits):
+            if node[TERMINAL]:
+                return True
+            node = node[(value >> (bits - 1 - index)) & 1]
+            if node is None:
+                return False
+        return node[TERMINAL]
+
+
+def parse_ip_ranges(values: typing.Iterable[str]) -> IpRangeTrie:
+    """Builds the trie of the valid ip addresses and CIDR ranges of a list
+
+    Args:
+        values (typing.Iterable[str]): The ip addresses and CIDR ranges
+
+    Returns:
+        IpRangeTrie: The ranges trie
+    """
+    networks = (parse_ip_network(value) for value in values)
+    return IpRangeTrie(network for network in networks if network is not None)
@@ -0,0 +1,51 @@
+"""IP address ranges tests
+"""
+
+import ipaddress
+import unittest
+from app.ip_ranges import IpRangeTrie, parse_ip_address, parse_ip_ranges
+
+
+class IpRangesTest(unittest.TestCase):
+    """IP address ranges tests"""
+
+    def test_parse_ip_address(self):
+        """parse_ip_address: It parses valid addresses, mapping IPv4-mapped ones"""
+        self.assertEqual(parse_ip_address("10.0.0.1"), ipaddress.ip_address("10.0.0.1"))
+        self.assertEqual(
+            parse_ip_address("::ffff:10.0.0.1"), ipaddress.ip_address("10.0.0.1")
+        )
+        self.assertIsNone(parse_ip_address("testclient"))
+        self.assertIsNone(parse_ip_address(None))
+
+    def test_parse_ip_ranges(self):
+        """parse_ip_ranges: It builds the trie of the valid addresses and ranges"""
+        trie = parse_ip_ranges(["10.0.0.0/8", "192.168.1.1", "testclient", "fd00::/8"])
+        self.assertEqual(len(trie), 3)
+        for address in ["10.255.0.1", "192.168.1.1", "fd12::1"]:
+            self.assertTrue(trie.contains(ipaddress.ip_address(address)), address)
+        for address in ["11.0.0.1", "192.168.1.2", "fe80::1"]:
+            self.assertFalse(trie.contains(ipaddress.ip_address(address)), address)
+        self.assertFalse(trie.contains(None))
+
+    def test_overlapping_ranges(self):
+        """IpRangeTrie: It keeps the widest of overlapping ranges"""
+        trie = IpRangeTrie(
+            [
+                ipaddress.ip_network("10.1.2.0/24"),
+                ipaddress.ip_network("10.0.0.0/8"),
+                ipaddress.ip_network("10.3.0.0/16"),
+            ]
+        )
+        self.assertTrue(trie.contains(ipaddress.ip_address("10.200.0.1")))
+        self.assertTrue(trie.contains(ipaddress.ip_address("10.1.2.3")))
+
+    def test_everything(self):
+        """IpRangeTrie: It supports the zero length prefixes"""
+        trie = IpRangeTrie([ipaddress.ip_network("0.0.0.0/0")])
+        self.assertTrue(trie.contains(ipaddress.ip_address("203.0.113.9")))
+        self.assertFalse(trie.contains(ipaddress.ip_address("::1")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+"""Event loop lag monitor
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+import typing
+from . import environment
+from . import metrics
+
+
+logger = logging.getLogger(__name__)
+loop_lag = metrics.Histogram(
+    "qms_iam_event_loop_lag_seconds",
+    "Delay of the event loop in running a callback past its scheduled time",
+)
+
+
+def get_thread_stack(thread_id: int) -> str:
+    """Gets the current stack of a thread
+
+    Args:
+        thread_id (int): The thread identifier
+
+    Returns:
+        str: The formatted stack, empty when the thread is gone
+    """
+    frame = sys._current_frames().get(thread_id)  # pylint: disable=protected-access
+    if frame is None:
+        return ""
+    return "".join(traceback.format_stack(frame))
+
+
+class LoopMonitor:
+    """Measures how late the event loop runs its callbacks
+
+    A task sleeps for the monitor interval over and over, and how much later
+    than planned it wakes up is the time the loop was kept busy. In debug
+    mode, a watchdog thread logs the stack of the loop thread when the task
+    is late by more than the blocked threshold, which points at the call
+    blocking the loop while it is still running.
+    """
+
+    def __init__(self):
+        self.beat = None
+        self.reported_beat = None
+        self.loop_thread_id = None
+        self.task = None
+        self.watchdog = None
+        self.stopping = threading.Event()
+
+    async def measure(self, interval: float) -> None:
+        """Records the loop lag every interval
+
+        Args:
+            interval (float): The seconds between measures
+        """
+        while True:
+            beat = time.monotonic()
+            self.beat = beat
+            await asyncio.sleep(interval)
+            loop_lag.observe(max(0.0, time.monotonic() - beat - interval))
+
+    def watch(self, interval: float, threshold: float) -> None:
+        """Logs the loop thread stack whenever the loop is blocked past the threshold
+
+        Args:
+            interval (float): The seconds between measures
+            threshold (float): The seconds the loop can be blocked for
+        """
+        while not self.stopping.wait(threshold / 2):
+            beat = self.beat
+            if beat is None or beat == self.reported_beat:
+                continue
+            blocked = time.monotonic() - beat - interval
+            if blocked > threshold:
+                self.reported_beat = beat
+                logger.warning(
+                    "Event loop blocked for more than %.3fs:\n%s",
+                    blocked,
+                    get_thread_stack(self.loop_thread_id),
+                )
+
+    def start(
+        self,
+        interval: float,
+        threshold: typing.Optional[float] = None,
+    ) -> None:
+        """Starts monitoring the running loop
+
+        Args:
+            interval (float): The seconds between measures
+            threshold (typing.Optional[float], optional): The seconds the loop can
+            be blocked for before its stack is logged, no logging when not set
+        """
+        if self.task is not None:
+            return
+        self.loop_thread_id = threading.get_ident()
+        self.task = asyncio.ensure_future(self.measure(interval))
+        if threshold:
+            self.stopping.clear()
+            self.watchdog = threading.Thread(
+                target=self.watch,
+                args=(interval, threshold),
+                name="loop-monitor-watchdog",
+                daemon=True,
+            )
+            self.watchdog.start()
+
+    def stop(self) -> None:
+        """Stops monitoring the loop"""
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+        if self.watchdog is not None:
+            self.stopping.set()
+            self.watchdog.join()
+            self.watchdog = None
+        self.beat = None
+
+
+loop_monitor = LoopMonitor()
+
+
+def start_monitoring() -> None:
+    """Starts monitoring the running loop when the monitor is enabled"""
+    if environment.loop_monitor_interval > 0:
+        loop_monitor.start(
+            environment.loop_monitor_interval,
+            environment.loop_blocked_threshold,
+        )
+
+
+def stop_monitoring() -> None:
+    """Stops monitoring the loop"""
+    loop_monitor.stop()
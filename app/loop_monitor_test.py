@@ -0,0 +1,52 @@
+"""Loop monitor tests
+"""
+
+import asyncio
+import time
+import unittest
+from app import loop_monitor
+
+
+def block_loop():
+    """Blocks the loop thread"""
+    time.sleep(0.2)
+
+
+class LoopMonitorTest(unittest.TestCase):
+    """Loop monitor tests"""
+
+    def get_lag_count(self):
+        """Gets the number of loop lag measures"""
+        return sum(
+            value
+            for name, _, value in loop_monitor.loop_lag.get_samples()
+            if name.endswith("_count")
+        )
+
+    def test_measure_and_log_blocked_loop(self):
+        """LoopMonitor: It measures the lag and logs the stack of a blocked loop"""
+        monitor = loop_monitor.LoopMonitor()
+        count = self.get_lag_count()
+
+        async def run():
+            monitor.start(0.01, 0.05)
+            await asyncio.sleep(0.05)
+            block_loop()
+            await asyncio.sleep(0.05)
+            monitor.stop()
+
+        with self.assertLogs("app.loop_monitor", level="WARNING") as logs:
+            asyncio.run(run())
+        self.assertGreater(self.get_lag_count(), count)
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn("block_loop", logs.output[0])
+        self.assertIsNone(monitor.task)
+        self.assertIsNone(monitor.watchdog)
+
+    def test_get_thread_stack_gone(self):
+        """get_thread_stack: It is empty for threads that are gone"""
+        self.assertEqual(loop_monitor.get_thread_stack(-1), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
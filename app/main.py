@@ -5,8 +5,18 @@ from fastapi import FastAPI, HTTPException, Request, status
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 from .auth import router as authorize
+from .auth import audit
+from .auth import client
+from .auth import timeouts
+from . import allowlists
 from . import constants
+from . import environment
 from . import exceptions
+from . import middlewares
+from . import health
+from . import loop_monitor
+from . import metrics
+from . import tracing
 
 
 # pylint: disable=W0613
@@ -19,6 +29,65 @@ app = FastAPI(
     version=constants.API_VERSION,
 )
 
+app.add_middleware(timeouts.RequestDeadlineMiddleware)
+if environment.api_access_check_mode == constants.MIDDLEWARE_ACCESS_CHECK_MODE:
+    app.add_middleware(middlewares.ApiAccessMiddleware)
+if environment.server_timing:
+    app.add_middleware(middlewares.ServerTimingMiddleware)
+if environment.profiling:
+    app.add_middleware(middlewares.ProfilingMiddleware)
+
+
+@app.on_event("startup")
+def open_upstream_client():
+    """Opens the pooled auth API clients once the application starts"""
+    client.open_session()
+    client.open_async_client()
+
+
+@app.on_event("startup")
+def start_allowlists_reload():
+    """Loads the allowlists file and reloads the allowlists on SIGHUP or file changes"""
+    allowlists.start_reload()
+
+
+@app.on_event("startup")
+async def start_loop_monitor():
+    """Starts measuring the event loop lag"""
+    loop_monitor.start_monitoring()
+
+
+@app.on_event("shutdown")
+async def close_upstream_client():
+    """Closes the pooled auth API clients when the application stops"""
+    client.close_session()
+    await client.close_async_client()
+
+
+@app.on_event("shutdown")
+def stop_allowlists_reload():
+    """Stops watching the allowlists file"""
+    allowlists.stop_watching()
+
+
+@app.on_event("shutdown")
+def stop_span_writer():
+    """Writes the spans left in the queue"""
+    tracing.span_writer.stop()
+
+
+@app.on_event("shutdown")
+def stop_audit_writer():
+    """Writes the audit records left in the queue"""
+    if audit.audit_writer is not None:
+        audit.audit_writer.stop()
+
+
+@app.on_event("shutdown")
+def stop_loop_monitor():
+    """Stops measuring the event loop lag"""
+    loop_monitor.stop_monitoring()
+
 
 @app.exception_handler(HTTPException)
 def http_exception_handler(request: Request, exc: HTTPException):
@@ -34,6 +103,7 @@ def http_exception_handler(request: Request, exc: HTTPException):
     return JSONResponse(
         status_code=exc.status_code,
         content=exc.detail,
+        headers=getattr(exc, "headers", None),
     )
 
 
@@ -61,3 +131,5 @@ def request_validation_error_handler(request: Request, exc: RequestValidationErr
 
 
 app.include_router(authorize.router, prefix=constants.AUTH_ROUTE_PREFIX)
+app.include_router(health.router)
+app.include_router(metrics.router)
@@ -0,0 +1,414 @@
+"""Prometheus metrics
+"""
+
+import bisect
+import functools
+import inspect
+import threading
+import time
+import typing
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from fastapi.exceptions import RequestValidationError
+from . import constants
+from . import server_timing
+
+
+registry = []
+
+
+class Metric:
+    """Metric whose samples are recorded in per-thread shards
+
+    Every thread records in its own shard, so recording takes no lock, and
+    the shards are only summed up when the metrics are collected. The shards
+    of the finished threads are folded into the retired samples whenever a
+    shard is added or the metric is collected, so short lived threads do not
+    pile up shards.
+    """
+
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names: typing.Tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.local = threading.local()
+        self.shards = {}
+        self.retired = {}
+        self.shards_lock = threading.Lock()
+        registry.append(self)
+
+    def get_shard(self) -> dict:
+        """Gets the shard of the current thread
+
+        Returns:
+            dict: The samples recorded by the current thread by labels
+        """
+        shard = getattr(self.local, "shard", None)
+        if shard is None:
+            shard = {}
+            with self.shards_lock:
+                self.retire_shards()
+                self.shards[threading.current_thread()] = shard
+            self.local.shard = shard
+        return shard
+
+    def retire_shards(self) -> None:
+        """Folds the shards of the finished threads into the retired samples
+
+        The caller holds the shards lock.
+        """
+        for thread in [thread for thread in self.shards if not thread.is_alive()]:
+            for labels, value in self.shards.pop(thread).items():
+                total = self.retired.get(labels)
+                self.retired[labels] = value if total is None else self.merge(total, value)
+
+    def get_samples(self) -> typing.Iterator[typing.Tuple[str, typing.Tuple, float]]:
+        """Gets the samples of every label values, summing up the shards
+
+        Returns:
+            typing.Iterator[typing.Tuple[str, typing.Tuple, float]]: The samples
+        """
+        totals = {}
+        with self.shards_lock:
+            self.retire_shards()
+            shards = [dict(self.retired)] + list(self.shards.values())
+        for shard in shards:
+            for labels, value in list(shard.items()):
+                total = totals.get(labels)
+                totals[labels] = value if total is None else self.merge(total, value)
+        for labels, value in totals.items():
+            yield self.name, tuple(zip(self.label_names, labels)), value
+
+    def merge(self, total: typing.Any, value: typing.Any) -> typing.Any:
+        """Merges the samples of two shards
+
+        Args:
+            total (typing.Any): The samples merged so far
+            value (typing.Any): The samples of another shard
+
+        Returns:
+            typing.Any: The merged samples
+        """
+        return total + value
+
+    def collect(self) -> str:
+        """Renders the metric in the Prometheus text format
+
+        Returns:
+            str: The metric help, type and samples
+        """
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+        for name, labels, value in self.get_samples():
+            lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """Metric that only goes up"""
+
+    metric_type = "counter"
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        """Increments the counter of the label values
+
+        Args:
+            labels (str): The label values
+            amount (float): The increment
+        """
+        shard = self.get_shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+
+class Gauge(Counter):
+    """Metric that goes up and down"""
+
+    metric_type = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        """Decrements the gauge of the label values
+
+        Args:
+            labels (str): The label values
+            amount (float): The decrement
+        """
+        self.inc(*labels, amount=-amount)
+
+
+class CallbackGauge(Metric):
+    """Gauge read from the state it describes when the metrics are collected"""
+
+    metric_type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        callback: typing.Callable[[], typing.Dict[typing.Tuple, float]],
+        label_names: typing.Tuple = (),
+    ):
+        super().__init__(name, documentation, label_names)
+        self.callback = callback
+
+    def get_samples(self) -> typing.Iterator[typing.Tuple[str, typing.Tuple, float]]:
+        for labels, value in self.callback().items():
+            yield self.name, tuple(zip(self.label_names, labels)), value
+
+
+class Histogram(Metric):
+    """Metric counting the observed values by bucket"""
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: typing.Tuple = (),
+        buckets: typing.Tuple[float, ...] = constants.METRICS_LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, label_names)
+        self.buckets = buckets
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Records an observed value
+
+        Args:
+            value (float): The observed value
+            labels (str): The label values
+        """
+        shard = self.get_shard()
+        sample = shard.get(labels)
+        if sample is None:
+            sample = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        sample[bisect.bisect_left(self.buckets, value)] += 1
+        sample[-1] += value
+
+    def merge(self, total: typing.Any, value: typing.Any) -> typing.Any:
+        return [left + right for left, right in zip(total, value)]
+
+    def get_samples(self) -> typing.Iterator[typing.Tuple[str, typing.Tuple, float]]:
+        for _, labels, sample in super().get_samples():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), sample[:-1]):
+                cumulative += count
+                yield f"{self.name}_bucket", labels + (("le", bound),), cumulative
+            yield f"{self.name}_count", labels, cumulative
+            yield f"{self.name}_sum", labels, sample[-1]
+
+
+def format_value(value: float) -> str:
+    """Formats a sample value or bucket bound
+
+    Args:
+        value (float): The value
+
+    Returns:
+        str: The value in the Prometheus text format
+    """
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def format_labels(labels: typing.Tuple[typing.Tuple[str, typing.Any], ...]) -> str:
+    """Formats the labels of a sample
+
+    Args:
+        labels (typing.Tuple[typing.Tuple[str, typing.Any], ...]): The label names and values
+
+    Returns:
+        str: The labels in the Prometheus text format
+    """
+    if not labels:
+        return ""
+    formatted = []
+    for name, value in labels:
+        if not isinstance(value, str):
+            value = format_value(value)
+        value = value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        formatted.append(f'{name}="{value}"')
+    return "{" + ",".join(formatted) + "}"
+
+
+def collect() -> str:
+    """Renders every metric in the Prometheus text format
+
+    Returns:
+        str: The metrics
+    """
+    return "\n".join(metric.collect() for metric in list(registry)) + "\n"
+
+
+request_latency = Histogram(
+    "qms_iam_request_duration_seconds",
+    "Latency of the API requests",
+    ("operation_id", "status"),
+)
+requests_in_flight = Gauge(
+    "qms_iam_requests_in_flight",
+    "Requests being handled",
+    ("operation_id",),
+)
+request_errors = Counter(
+    "qms_iam_request_errors_total",
+    "Requests answered with an error, by error code",
+    ("operation_id", "code"),
+)
+upstream_latency = Histogram(
+    "qms_iam_upstream_duration_seconds",
+    "Latency of the auth API calls, retries and hedged requests included",
+    ("function", "status"),
+)
+cache_lookups = Counter(
+    "qms_iam_cache_lookups_total",
+    "Cache lookups by cache and result",
+    ("cache", "result"),
+)
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    """Counts a cache lookup
+
+    Args:
+        cache (str): The cache name
+        hit (bool): Whether the value was cached
+    """
+    result = constants.CACHE_HIT_RESULT if hit else constants.CACHE_MISS_RESULT
+    cache_lookups.inc(cache, result)
+    server_timing.add_cache_lookup(cache, result)
+
+
+def get_error_code(exc: Exception) -> str:
+    """Gets the error code of the response of an exception
+
+    Args:
+        exc (Exception): The exception
+
+    Returns:
+        str: The API error code
+    """
+    if isinstance(exc, RequestValidationError):
+        return constants.BAD_REQUEST_ERROR_CODE
+    detail = getattr(exc, "detail", None)
+    if isinstance(detail, dict) and detail.get("code"):
+        return str(detail["code"])
+    return constants.INTERNAL_SERVER_ERROR_CODE
+
+
+def get_error_status(exc: Exception) -> int:
+    """Gets the status code of the response of an exception
+
+    Args:
+        exc (Exception): The exception
+
+    Returns:
+        int: The response status code
+    """
+    if isinstance(exc, RequestValidationError):
+        return status.HTTP_400_BAD_REQUEST
+    return getattr(exc, "status_code", status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def get_upstream_status(result: typing.Any) -> str:
+    """Gets the status label of an upstream call result
+
+    Args:
+        result (typing.Any): The upstream response
+
+    Returns:
+        str: The response status code
+    """
+    return str(getattr(result, "status_code", constants.UPSTREAM_ERROR_STATUS))
+
+
+def timed_upstream(func: typing.Callable) -> typing.Callable:
+    """Records the latency and status of the calls of an auth API function
+
+    Args:
+        func (typing.Callable): The auth API function
+
+    Returns:
+        typing.Callable: The instrumented function
+    """
+    name = func.__name__
+
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            started_at = time.perf_counter()
+            status_label = constants.UPSTREAM_ERROR_STATUS
+            try:
+                result = await func(*args, **kwargs)
+                status_label = get_upstream_status(result)
+                return result
+            except HTTPException as exc:
+                status_label = str(exc.status_code)
+                raise
+            finally:
+                duration = time.perf_counter() - started_at
+                upstream_latency.observe(duration, name, status_label)
+                server_timing.add(constants.UPSTREAM_TIMING_NAME, duration)
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started_at = time.perf_counter()
+        status_label = constants.UPSTREAM_ERROR_STATUS
+        try:
+            result = func(*args, **kwargs)
+            status_label = get_upstream_status(result)
+            return result
+        except HTTPException as exc:
+            status_label = str(exc.status_code)
+            raise
+        finally:
+            duration = time.perf_counter() - started_at
+            upstream_latency.observe(duration, name, status_label)
+            server_timing.add(constants.UPSTREAM_TIMING_NAME, duration)
+
+    return wrapper
+
+
+class MetricsRoute(server_timing.ServerTimingRoute):
+    """Route recording the latency, errors and requests in flight of its operation"""
+
+    def get_route_handler(self) -> typing.Callable:
+        handler = super().get_route_handler()
+        operation_id = self.operation_id or self.name
+
+        async def metrics_route_handler(request: Request) -> Response:
+            started_at = time.perf_counter()
+            status_label = str(status.HTTP_500_INTERNAL_SERVER_ERROR)
+            requests_in_flight.inc(operation_id)
+            try:
+                response = await handler(request)
+                status_label = str(response.status_code)
+                return response
+            except Exception as exc:
+                status_label = str(get_error_status(exc))
+                request_errors.inc(operation_id, get_error_code(exc))
+                raise
+            finally:
+                requests_in_flight.dec(operation_id)
+                request_latency.observe(
+                    time.perf_counter() - started_at, operation_id, status_label
+                )
+
+        return metrics_route_handler
+
+
+router = APIRouter()
+
+
+@router.get(constants.METRICS_ROUTE_PATH, include_in_schema=False)
+def get_metrics() -> Response:
+    """Gets the metrics in the Prometheus text format"""
+    return Response(collect(), media_type=constants.METRICS_CONTENT_TYPE)
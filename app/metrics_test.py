@@ -0,0 +1,199 @@
+"""Metrics tests
+"""
+
+import asyncio
+import threading
+import unittest
+from unittest.mock import Mock
+from fastapi import APIRouter, FastAPI, HTTPException, status
+from fastapi.exceptions import RequestValidationError
+from fastapi.testclient import TestClient
+from app import exceptions, main, metrics
+from app.auth import models
+
+
+class MetricsTest(unittest.TestCase):
+    """Metrics tests"""
+
+    def create(self, metric_class, *args, **kwargs):
+        """Creates a metric left out of the registry after the test"""
+        metric = metric_class(*args, **kwargs)
+        self.addCleanup(metrics.registry.remove, metric)
+        return metric
+
+    def test_counter(self):
+        """Counter: It sums up the shards of every thread"""
+        counter = self.create(metrics.Counter, "test_total", "Test", ("name",))
+        counter.inc("a")
+        threads = [
+            threading.Thread(target=counter.inc, args=("a",), kwargs={"amount": 2})
+            for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        counter.inc("b")
+        self.assertEqual(
+            counter.collect(),
+            "# HELP test_total Test\n"
+            "# TYPE test_total counter\n"
+            'test_total{name="a"} 7\n'
+            'test_total{name="b"} 1',
+        )
+
+    def test_retire_shards(self):
+        """Metric: It folds the shards of the finished threads"""
+        histogram = self.create(metrics.Histogram, "test_seconds", "Test", buckets=(1.0,))
+        for _ in range(50):
+            thread = threading.Thread(target=histogram.observe, args=(0.5,))
+            thread.start()
+            thread.join()
+        histogram.observe(2.0)
+        self.assertLessEqual(len(histogram.shards), 2)
+        self.assertEqual(
+            list(histogram.get_samples()),
+            [
+                ("test_seconds_bucket", (("le", 1.0),), 50),
+                ("test_seconds_bucket", (("le", float("inf")),), 51),
+                ("test_seconds_count", (), 51),
+                ("test_seconds_sum", (), 27.0),
+            ],
+        )
+        self.assertEqual(len(histogram.shards), 1)
+
+    def test_gauge(self):
+        """Gauge: It goes up and down"""
+        gauge = self.create(metrics.Gauge, "test_in_flight", "Test")
+        gauge.inc()
+        gauge.inc()
+        gauge.dec()
+        self.assertEqual(list(gauge.get_samples()), [("test_in_flight", (), 1)])
+
+    def test_histogram(self):
+        """Histogram: It counts the observations in cumulative buckets"""
+        histogram = self.create(
+            metrics.Histogram, "test_seconds", "Test", ("op",), buckets=(0.1, 1.0)
+        )
+        for value in [0.05, 0.1, 0.5, 2.0]:
+            histogram.observe(value, "op-1")
+        self.assertEqual(
+            histogram.collect().splitlines()[2:],
+            [
+                'test_seconds_bucket{op="op-1",le="0.1"} 2',
+                'test_seconds_bucket{op="op-1",le="1"} 3',
+                'test_seconds_bucket{op="op-1",le="+Inf"} 4',
+                'test_seconds_count{op="op-1"} 4',
+                'test_seconds_sum{op="op-1"} 2.65',
+            ],
+        )
+
+    def test_format_labels(self):
+        """format_labels: It escapes the label values"""
+        self.assertEqual(
+            metrics.format_labels((("a", 'x"y\\z\n'), ("le", 0.5))),
+            '{a="x\\"y\\\\z\\n",le="0.5"}',
+        )
+        self.assertEqual(metrics.format_labels(()), "")
+
+    def test_timed_upstream(self):
+        """timed_upstream: It records the latency and status of the upstream calls"""
+        @metrics.timed_upstream
+        def call_upstream(status_code):
+            return Mock(status_code=status_code)
+
+        @metrics.timed_upstream
+        async def call_async_upstream():
+            raise exceptions.SERVICE_UNAVAILABLE_ERROR
+
+        call_upstream(200)
+        call_upstream(200)
+        with self.assertRaises(HTTPException):
+            asyncio.run(call_async_upstream())
+        counts = {
+            labels: value
+            for name, labels, value in metrics.upstream_latency.get_samples()
+            if name.endswith("_count") and "call_" in labels[0][1]
+        }
+        self.assertEqual(
+            counts,
+            {
+                (("function", "call_upstream"), ("status", "200")): 2,
+                (("function", "call_async_upstream"), ("status", "503")): 1,
+            },
+        )
+
+    def test_metrics_route(self):
+        """MetricsRoute: It records the latency and errors of the operations"""
+        router = APIRouter(route_class=metrics.MetricsRoute)
+
+        @router.get("/ok", operation_id="testOk")
+        def get_ok():
+            return {}
+
+        @router.get("/conflict", operation_id="testConflict")
+        def get_conflict():
+            raise exceptions.CONFLICT_ERROR
+
+        app = FastAPI()
+        app.include_router(router)
+        client = TestClient(app)
+        client.get("/ok")
+        client.get("/conflict")
+
+        samples = [
+            sample
+            for sample in metrics.collect().splitlines()
+            if "testOk" in sample or "testConflict" in sample
+        ]
+        self.assertIn(
+            'qms_iam_request_duration_seconds_count{operation_id="testOk",status="200"} 1',
+            samples,
+        )
+        self.assertIn(
+            'qms_iam_request_errors_total{operation_id="testConflict",code="CONFLICT"} 1',
+            samples,
+        )
+        self.assertIn('qms_iam_requests_in_flight{operation_id="testOk"} 0', samples)
+
+    def test_metrics_route_validation_error(self):
+        """MetricsRoute: It records the invalid requests as bad requests"""
+        router = APIRouter(route_class=metrics.MetricsRoute)
+
+        @router.post("/invalid", operation_id="testInvalid")
+        def post_invalid(payload: models.GetTokensForCredentialsPayload):
+            return payload
+
+        app = FastAPI()
+        app.include_router(router)
+        app.add_exception_handler(
+            RequestValidationError, main.request_validation_error_handler
+        )
+        response = TestClient(app).post("/invalid", json={})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        samples = metrics.collect().splitlines()
+        self.assertIn(
+            'qms_iam_request_duration_seconds_count{operation_id="testInvalid",status="400"} 1',
+            samples,
+        )
+        self.assertIn(
+            'qms_iam_request_errors_total{operation_id="testInvalid",code="BAD_REQUEST"} 1',
+            samples,
+        )
+
+    def test_get_metrics(self):
+        """get_metrics: It exposes the metrics in the Prometheus text format"""
+        response = TestClient(main.app).get("/metrics")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.headers["content-type"].startswith("text/plain"))
+        for name in [
+            "qms_iam_upstream_concurrency_limit",
+            "qms_iam_bulkhead_calls_in_flight",
+            "qms_iam_cache_lookups_total",
+        ]:
+            self.assertIn(f"# TYPE {name} ", response.text)
+
+
+if __name__ == "__main__":
+    unittest.main()
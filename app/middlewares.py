@@ -0,0 +1,237 @@
+"""API middlewares
+"""
+
+import json
+import os
+import typing
+from fastapi import HTTPException, status
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from . import api_keys
+from . import constants
+from . import environment
+from . import exceptions
+from . import helpers
+from . import profiling
+from . import server_timing
+
+
+def get_error_response(exc: HTTPException) -> typing.Tuple[dict, bytes]:
+    """Gets the ASGI response start message and body of an error response
+
+    Args:
+        exc (HTTPException): HTTP Exception
+
+    Returns:
+        typing.Tuple[dict, bytes]: The response start message and JSON body
+    """
+    body = json.dumps(exc.detail, separators=(",", ":")).encode()
+    start = {
+        "type": "http.response.start",
+        "status": exc.status_code,
+        "headers": [
+            (b"content-type", constants.JSON_CONTENT_TYPE.encode()),
+            (b"content-length", str(len(body)).encode()),
+        ],
+    }
+    return start, body
+
+
+def check_scope_access(scope: Scope) -> api_keys.ApiKey:
+    """Checks the api key and ip address of the caller of a request
+
+    Args:
+        scope (Scope): The request scope
+
+    Raises:
+        HTTPException: Authorization error when providing an invalid api key
+        HTTPException: Forbidden error when the ip addres is not an allowed one or
+        the api key is not allowed for the application
+
+    Returns:
+        api_keys.ApiKey: The api key digest and metadata
+    """
+    api_key = None
+    forwarded_for = None
+    application = None
+    for name, value in scope["headers"]:
+        if name == constants.API_KEY_HEADER:
+            api_key = value.decode("latin-1")
+        elif name == constants.FORWARDED_FOR_HEADER:
+            forwarded_for = value.decode("latin-1")
+        elif name == constants.APPLICATION_HEADER:
+            application = value.decode("latin-1")
+    client = scope.get("client")
+    host = helpers.get_client_host(client[0] if client else None, forwarded_for)
+    return helpers.check_api_access(api_key, host, application)
+
+
+error_responses = {
+    exc.status_code: get_error_response(exc)
+    for exc in (exceptions.UNAUTHORIZED_ERROR, exceptions.FORBIDDEN_ERROR)
+}
+
+
+class ApiAccessMiddleware:  # pylint: disable=too-few-public-methods
+    """Checks the api key and ip address of the callers before reading requests
+
+    Requests to the protected routes that fail the check are answered right
+    away with precomputed error responses, without routing the request nor
+    reading its body.
+    """
+
+    def __init__(self, app: ASGIApp, path_prefix: str = constants.AUTH_ROUTE_PREFIX):
+        self.app = app
+        self.path_prefix = path_prefix
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            with server_timing.timed(constants.ACCESS_CHECK_TIMING_NAME):
+                allowed_key = check_scope_access(scope)
+        except HTTPException as exc:
+            start, body = error_responses[exc.status_code]
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        scope.setdefault("state", {})[constants.API_KEY_STATE] = allowed_key
+        await self.app(scope, receive, send)
+
+
+class ServerTimingMiddleware:  # pylint: disable=too-few-public-methods
+    """Adds the Server-Timing header to the responses of the protected routes"""
+
+    def __init__(self, app: ASGIApp, path_prefix: str = constants.AUTH_ROUTE_PREFIX):
+        self.app = app
+        self.path_prefix = path_prefix
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        timing = server_timing.ServerTiming()
+
+        async def send_with_server_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message = {
+                    **message,
+                    "headers": list(message.get("headers", []))
+                    + [(constants.SERVER_TIMING_HEADER, timing.to_header().encode("latin-1"))],
+                }
+            await send(message)
+
+        token = server_timing.server_timing.set(timing)
+        try:
+            await self.app(scope, receive, send_with_server_timing)
+        finally:
+            server_timing.server_timing.reset(token)
+
+
+class ProfilingMiddleware:  # pylint: disable=too-few-public-methods
+    """Profiles on demand the requests of the api keys allowed to
+
+    Requests sending the profile header with an api key allowed to profile
+    run under a deterministic profiler, covering the event loop and the
+    bulkhead threads of the request. The profile is written to the profiles
+    directory when there is one, and otherwise sent back instead of the
+    response. One request is profiled at a time, the others are handled as
+    usual, and so are the requests without the header.
+    """
+
+    def __init__(self, app: ASGIApp, path_prefix: str = constants.AUTH_ROUTE_PREFIX):
+        self.app = app
+        self.path_prefix = path_prefix
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or not scope["path"].startswith(self.path_prefix)
+            or not any(name == constants.PROFILE_HEADER for name, _ in scope["headers"])
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            allowed_key = check_scope_access(scope)
+        except HTTPException:
+            allowed_key = None
+        if allowed_key is None or not allowed_key.profiling:
+            await self.app(scope, receive, send)
+            return
+        if not profiling.profiling_lock.acquire(  # pylint: disable=consider-using-with
+            blocking=False
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.profile(scope, receive, send)
+        finally:
+            profiling.profiling_lock.release()
+
+    async def profile(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handles a request under the profiler
+
+        Args:
+            scope (Scope): The request scope
+            receive (Receive): The request receive channel
+            send (Send): The response send channel
+        """
+        profile = profiling.RequestProfile()
+        file_name = profiling.get_file_name(scope["path"])
+        response_status = []
+
+        async def send_with_profile(message: Message) -> None:
+            if environment.profiling_directory:
+                if message["type"] == "http.response.start":
+                    message = {
+                        **message,
+                        "headers": list(message.get("headers", []))
+                        + [(constants.PROFILE_FILE_HEADER, file_name.encode("latin-1"))],
+                    }
+                await send(message)
+            elif message["type"] == "http.response.start":
+                response_status.append(message["status"])
+
+        token = profiling.request_profile.set(profile)
+        try:
+            with profile.profile():
+                await self.app(scope, receive, send_with_profile)
+        finally:
+            profiling.request_profile.reset(token)
+
+        if environment.profiling_directory:
+            try:
+                profile.dump(os.path.join(environment.profiling_directory, file_name))
+            except OSError:
+                pass
+            return
+
+        body = profile.dumps()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status.HTTP_200_OK,
+                "headers": [
+                    (b"content-type", constants.PROFILE_CONTENT_TYPE.encode()),
+                    (b"content-length", str(len(body)).encode()),
+                    (
+                        b"content-disposition",
+                        f'attachment; filename="{file_name}"'.encode("latin-1"),
+                    ),
+                    (
+                        constants.PROFILE_STATUS_HEADER,
+                        str(
+                            response_status[0]
+                            if response_status
+                            else status.HTTP_500_INTERNAL_SERVER_ERROR
+                        ).encode(),
+                    ),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,172 @@
+"""Middlewares tests
+"""
+
+import json
+import marshal
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+from fastapi import FastAPI, Request, status
+from fastapi.testclient import TestClient
+from app.api_keys import ApiKey, get_digest
+from app.middlewares import (
+    ApiAccessMiddleware,
+    ProfilingMiddleware,
+    ServerTimingMiddleware,
+    error_responses,
+)
+from app.exceptions import UNAUTHORIZED_ERROR, FORBIDDEN_ERROR
+
+
+mock_environment = Mock(
+    allowed_api_keys="test-api-key",
+    allowed_ip_adresses="testclient",
+    trusted_proxies="",
+    api_keys="",
+)
+mock_profiling_environment = Mock(
+    allowed_api_keys="test-api-key",
+    allowed_ip_adresses="testclient",
+    trusted_proxies="",
+    api_keys=json.dumps([{"digest": get_digest("profiling-api-key"), "profiling": True}]),
+)
+
+
+@patch("app.helpers.environment", mock_environment)
+class ApiAccessMiddlewareTest(unittest.TestCase):
+    """Api access middleware tests"""
+
+    def setUp(self):
+        self.received = []
+        self.api_keys = []
+        app = FastAPI()
+        app.add_middleware(ApiAccessMiddleware, path_prefix="/protected")
+
+        @app.post("/protected")
+        def protected(payload: dict, request: Request):
+            self.received.append(payload)
+            self.api_keys.append(request.state.api_key)
+            return payload
+
+        @app.get("/public")
+        def public():
+            return {"public": True}
+
+        self.client = TestClient(app)
+
+    def test_allowed(self):
+        """ApiAccessMiddleware: It lets allowed callers through"""
+        response = self.client.post(
+            "/protected", headers={"api_key": "test-api-key"}, json={"test": 1}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.received, [{"test": 1}])
+        self.assertEqual(self.api_keys, [ApiKey(digest=get_digest("test-api-key"))])
+
+    def test_not_allowed_key(self):
+        """ApiAccessMiddleware: It rejects missing and not allowed keys unread"""
+        for headers in [{}, {"api_key": "not-allowed-key"}]:
+            response = self.client.post("/protected", headers=headers, json={})
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+            self.assertEqual(response.json(), UNAUTHORIZED_ERROR.detail)
+        self.assertEqual(self.received, [])
+
+    def test_not_allowed_ip_address(self):
+        """ApiAccessMiddleware: It rejects callers without an allowed ip address"""
+        with patch.object(mock_environment, "allowed_ip_adresses", "10.0.0.1"):
+            response = self.client.post(
+                "/protected", headers={"api_key": "test-api-key"}, json={}
+            )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(response.json(), FORBIDDEN_ERROR.detail)
+        self.assertEqual(self.received, [])
+
+    def test_forwarded_for_untrusted_peer(self):
+        """ApiAccessMiddleware: It ignores the forwarded for header of untrusted peers"""
+        with patch.object(mock_environment, "allowed_ip_adresses", "10.0.0.0/8"):
+            response = self.client.post(
+                "/protected",
+                headers={"api_key": "test-api-key", "x-forwarded-for": "10.0.0.1"},
+                json={},
+            )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.received, [])
+
+    def test_public(self):
+        """ApiAccessMiddleware: It does not check the routes out of the prefix"""
+        response = self.client.get("/public")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_server_timing_rejected(self):
+        """ServerTimingMiddleware: It leaves the shared error responses untouched"""
+        app = FastAPI()
+        app.add_middleware(ApiAccessMiddleware, path_prefix="/protected")
+        app.add_middleware(ServerTimingMiddleware, path_prefix="/protected")
+        client = TestClient(app)
+        headers = list(error_responses[status.HTTP_401_UNAUTHORIZED][0]["headers"])
+        for _ in range(4):
+            response = client.post(
+                "/protected", headers={"api_key": "not-allowed-key"}, json={}
+            )
+            self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+            self.assertEqual(response.headers["server-timing"].count("total;"), 1)
+        self.assertEqual(
+            error_responses[status.HTTP_401_UNAUTHORIZED][0]["headers"], headers
+        )
+
+
+@patch("app.helpers.environment", mock_profiling_environment)
+class ProfilingMiddlewareTest(unittest.TestCase):
+    """Profiling middleware tests"""
+
+    def setUp(self):
+        app = FastAPI()
+        app.add_middleware(ProfilingMiddleware, path_prefix="/protected")
+
+        @app.get("/protected")
+        def protected():
+            return {"protected": True}
+
+        self.client = TestClient(app)
+
+    @patch("app.middlewares.environment", Mock(profiling_directory=None))
+    def test_download(self):
+        """ProfilingMiddleware: It sends the profile back instead of the response"""
+        response = self.client.get(
+            "/protected", headers={"api_key": "profiling-api-key", "x-profile": "1"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.headers["x-profile-status"], "200")
+        self.assertIn("attachment", response.headers["content-disposition"])
+        self.assertIsInstance(marshal.loads(response.content), dict)
+
+    def test_write_to_directory(self):
+        """ProfilingMiddleware: It writes the profile to the profiles directory"""
+        with tempfile.TemporaryDirectory() as directory:
+            with patch(
+                "app.middlewares.environment", Mock(profiling_directory=directory)
+            ):
+                response = self.client.get(
+                    "/protected",
+                    headers={"api_key": "profiling-api-key", "x-profile": "1"},
+                )
+            self.assertEqual(response.json(), {"protected": True})
+            self.assertEqual(
+                os.listdir(directory), [response.headers["x-profile-file"]]
+            )
+
+    def test_not_profiled(self):
+        """ProfilingMiddleware: It handles as usual the requests it cannot profile"""
+        for headers in [
+            {"api_key": "profiling-api-key"},
+            {"api_key": "test-api-key", "x-profile": "1"},
+            {"api_key": "not-allowed-key", "x-profile": "1"},
+        ]:
+            response = self.client.get("/protected", headers=headers)
+            self.assertEqual(response.json(), {"protected": True})
+            self.assertNotIn("x-profile-file", response.headers)
+
+
+if __name__ == "__main__":
+    unittest.main()
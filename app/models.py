@@ -1,6 +1,7 @@
 """Base API models
 """
 
+from typing import Dict
 from pydantic import BaseModel
 
 
@@ -10,3 +11,12 @@ class APIResponse(BaseModel):
     code: str
     type: str
     message: str
+
+
+class HealthResponse(BaseModel):
+    """API health response"""
+
+    status: str
+    circuits: Dict[str, str]
+    concurrencyLimit: int
+    inFlight: int
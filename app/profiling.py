@@ -0,0 +1,102 @@
+"""On demand profiling of single requests
+"""
+
+import contextlib
+import contextvars
+import cProfile
+import marshal
+import pstats
+import threading
+import time
+import typing
+import uuid
+from . import constants
+
+
+class RequestProfile:
+    """Profilers of a request, one for every thread the request runs on"""
+
+    def __init__(self):
+        self.profilers = []
+        self.lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def profile(self) -> typing.Iterator[None]:
+        """Profiles the current thread
+
+        Since Python 3.12 a profiler covers every thread and only one can be
+        enabled at a time, so the current thread is left to the profiler of
+        the request when another one cannot be enabled.
+        """
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            yield
+            return
+        try:
+            yield
+        finally:
+            profiler.disable()
+            with self.lock:
+                self.profilers.append(profiler)
+
+    def get_stats(self) -> pstats.Stats:
+        """Gets the statistics of every thread of the request
+
+        Returns:
+            pstats.Stats: The profile statistics
+        """
+        with self.lock:
+            profilers = list(self.profilers)
+        return pstats.Stats(*profilers)
+
+    def dumps(self) -> bytes:
+        """Renders the profile in the format of the profile files
+
+        Returns:
+            bytes: The profile, readable with pstats
+        """
+        return marshal.dumps(self.get_stats().stats)
+
+    def dump(self, path: str) -> None:
+        """Writes the profile to a file
+
+        Args:
+            path (str): The profile file path
+        """
+        self.get_stats().dump_stats(path)
+
+
+request_profile = contextvars.ContextVar("request_profile", default=None)
+profiling_lock = threading.Lock()
+
+
+def call(func: typing.Callable, *args) -> typing.Any:
+    """Calls a function, profiling it when the request in context is profiled
+
+    Args:
+        func (typing.Callable): The function to call
+
+    Returns:
+        typing.Any: The function result
+    """
+    profile = request_profile.get()
+    if profile is None:
+        return func(*args)
+    with profile.profile():
+        return func(*args)
+
+
+def get_file_name(path: str) -> str:
+    """Gets a unique profile file name for a request
+
+    Args:
+        path (str): The request path
+
+    Returns:
+        str: The profile file name
+    """
+    route = path.strip("/").replace("/", "-") or "root"
+    timestamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime())
+    return f"{route}-{timestamp}-{uuid.uuid4().hex[:8]}{constants.PROFILE_FILE_EXTENSION}"
@@ -0,0 +1,49 @@
+"""Profiling tests
+"""
+
+import contextvars
+import threading
+import unittest
+from app import profiling
+
+
+def work():
+    """Profiled function"""
+    return sum(range(100))
+
+
+class ProfilingTest(unittest.TestCase):
+    """Profiling tests"""
+
+    def test_call_unprofiled(self):
+        """call: It calls the function as is outside of profiled requests"""
+        self.assertEqual(profiling.call(work), 4950)
+
+    def test_call_profiled(self):
+        """call: It profiles the threads of the profiled request"""
+        profile = profiling.RequestProfile()
+        token = profiling.request_profile.set(profile)
+        try:
+            with profile.profile():
+                thread = threading.Thread(
+                    target=contextvars.copy_context().run,
+                    args=(profiling.call, work),
+                )
+                thread.start()
+                thread.join()
+        finally:
+            profiling.request_profile.reset(token)
+
+        functions = [function for _, _, function in profile.get_stats().stats]
+        self.assertIn("work", functions)
+
+    def test_get_file_name(self):
+        """get_file_name: It names the profile after the request path"""
+        file_name = profiling.get_file_name("/api/v1/auth/token")
+        self.assertTrue(file_name.startswith("api-v1-auth-token-"))
+        self.assertTrue(file_name.endswith(".prof"))
+        self.assertNotEqual(file_name, profiling.get_file_name("/api/v1/auth/token"))
+
+
+if __name__ == "__main__":
+    unittest.main()
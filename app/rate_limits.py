@@ -0,0 +1,219 @@
+"""Token bucket rate limits per api key, application and route
+"""
+
+import sqlite3
+import threading
+import time
+import typing
+from collections import OrderedDict
+from fastapi import Request
+from starlette.concurrency import run_in_threadpool
+from . import api_keys
+from . import constants
+from . import environment
+from . import exceptions
+
+
+def take_token(
+    tokens: float, elapsed: float, rate: float, burst: float
+) -> typing.Tuple[float, float]:
+    """Refills a token bucket for the elapsed time and takes a token from it
+
+    Args:
+        tokens (float): The tokens left in the bucket
+        elapsed (float): The seconds since the bucket was last updated
+        rate (float): The tokens added every second
+        burst (float): The bucket capacity
+
+    Returns:
+        typing.Tuple[float, float]: The tokens left and the seconds to wait
+        for a token, which is 0 when one was taken
+    """
+    tokens = min(burst, tokens + elapsed * rate)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / rate
+
+
+class MemoryBackend:  # pylint: disable=too-few-public-methods
+    """Token buckets of the current process
+
+    At most ``max_buckets`` buckets are kept, evicting the least recently
+    used ones first.
+    """
+
+    blocking = False
+
+    def __init__(self, max_buckets: int):
+        self.max_buckets = max_buckets
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def acquire(self, key: str, rate: float, burst: float) -> float:
+        """Takes a token from a bucket
+
+        Args:
+            key (str): The bucket key
+            rate (float): The tokens added every second
+            burst (float): The bucket capacity
+
+        Returns:
+            float: The seconds to wait for a token, which is 0 when one was taken
+        """
+        now = time.monotonic()
+        with self.lock:
+            tokens, updated_at = self.buckets.get(key, (burst, now))
+            tokens, retry_after = take_token(tokens, now - updated_at, rate, burst)
+            self.buckets[key] = (tokens, now)
+            self.buckets.move_to_end(key)
+            while len(self.buckets) > self.max_buckets:
+                self.buckets.popitem(last=False)
+        return retry_after
+
+
+class SqliteBackend:
+    """Token buckets shared by the workers of a host through a SQLite file
+
+    Every bucket update runs in an immediate transaction, so workers never
+    take the same token twice. The limits fail open when the file stays
+    locked, as the buckets only protect the upstream. The file is written
+    ahead of its log without syncing every transaction, and the buckets are
+    taken off the event loop, since a transaction can wait for another
+    worker.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str):
+        self.path = path
+        self.local = threading.local()
+
+    def get_connection(self) -> sqlite3.Connection:
+        """Gets the database connection of the current thread
+
+        Returns:
+            sqlite3.Connection: The database connection
+        """
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self.path,
+                timeout=constants.RATE_LIMIT_SQLITE_TIMEOUT,
+                isolation_level=None,
+            )
+            for pragma in constants.RATE_LIMIT_SQLITE_PRAGMAS:
+                connection.execute(pragma)
+            connection.execute(constants.RATE_LIMIT_SQLITE_CREATE_TABLE)
+            self.local.connection = connection
+        return connection
+
+    def acquire(self, key: str, rate: float, burst: float) -> float:
+        """Takes a token from a bucket
+
+        Args:
+            key (str): The bucket key
+            rate (float): The tokens added every second
+            burst (float): The bucket capacity
+
+        Returns:
+            float: The seconds to wait for a token, which is 0 when one was taken
+        """
+        try:
+            connection = self.get_connection()
+            now = time.time()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = connection.execute(
+                    constants.RATE_LIMIT_SQLITE_SELECT, (key,)
+                ).fetchone()
+                tokens, updated_at = row if row else (burst, now)
+                tokens, retry_after = take_token(
+                    tokens, max(0.0, now - updated_at), rate, burst
+                )
+                connection.execute(
+                    constants.RATE_LIMIT_SQLITE_UPSERT, (key, tokens, now)
+                )
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        except sqlite3.Error:
+            return 0.0
+        return retry_after
+
+
+def create_backend() -> typing.Union[MemoryBackend, SqliteBackend]:
+    """Creates the configured token buckets backend
+
+    Returns:
+        typing.Union[MemoryBackend, SqliteBackend]: The token buckets backend
+    """
+    if environment.rate_limit_backend == constants.SQLITE_RATE_LIMIT_BACKEND:
+        return SqliteBackend(environment.rate_limit_sqlite_path)
+    return MemoryBackend(environment.rate_limit_max_buckets)
+
+
+backend = create_backend()
+
+
+def get_rate(
+    operation_id: str, api_key: typing.Optional[api_keys.ApiKey]
+) -> typing.Optional[float]:
+    """Gets the requests per second an api key can make to a route
+
+    The rate limit of the api key, when it has one, caps the limit of the route.
+
+    Args:
+        operation_id (str): The route operation id
+        api_key (typing.Optional[api_keys.ApiKey]): The api key digest and metadata
+
+    Returns:
+        typing.Optional[float]: The requests per second or None without limit
+    """
+    rate = environment.rate_limits.get(operation_id, environment.rate_limit_default)
+    key_rate = api_key.rate_limit if api_key else None
+    rates = [limit for limit in (rate, key_rate) if limit is not None and limit > 0]
+    return min(rates) if rates else None
+
+
+def rate_limit(operation_id: str) -> typing.Callable:
+    """Creates the rate limit dependency of a route
+
+    The dependency runs after the access check, whose api key is in the
+    request state, and before any upstream call.
+
+    Args:
+        operation_id (str): The route operation id
+
+    Returns:
+        typing.Callable: The rate limit dependency
+    """
+
+    async def check_rate_limit(request: Request):
+        """Takes a token from the bucket of the api key, application and route
+
+        Args:
+            request (Request): incoming request
+
+        Raises:
+            HTTPException: Too many requests error when the bucket is empty
+        """
+        api_key = getattr(request.state, constants.API_KEY_STATE, None)
+        rate = get_rate(operation_id, api_key)
+        if rate is None:
+            return
+
+        digest = api_key.digest if api_key else constants.EMPTY_VALUE
+        application = request.headers.get(
+            constants.APPLICATION_HEADER.decode("latin-1"), constants.EMPTY_VALUE
+        )
+        burst = max(1.0, rate * environment.rate_limit_burst)
+        key = f"{digest}|{application}|{operation_id}"
+        if backend.blocking:
+            retry_after = await run_in_threadpool(backend.acquire, key, rate, burst)
+        else:
+            retry_after = backend.acquire(key, rate, burst)
+        if retry_after > 0:
+            raise exceptions.get_too_many_requests_error(retry_after)
+
+    return check_rate_limit
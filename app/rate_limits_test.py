@@ -0,0 +1,109 @@
+"""Rate limits tests
+"""
+
+import asyncio
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import Mock, patch
+from app.api_keys import ApiKey
+from app.rate_limits import (
+    MemoryBackend,
+    SqliteBackend,
+    get_rate,
+    rate_limit,
+    take_token,
+)
+
+
+mock_environment = Mock(
+    rate_limits={"loginUser": 5.0, "logout": 0.0}, rate_limit_default=20.0
+)
+
+
+class RateLimitsTest(unittest.TestCase):
+    """Rate limits tests"""
+
+    def test_take_token(self):
+        """take_token: It refills the bucket up to its capacity and takes a token"""
+        self.assertEqual(take_token(0.0, 1.0, 2.0, 5.0), (1.0, 0.0))
+        self.assertEqual(take_token(4.0, 10.0, 2.0, 5.0), (4.0, 0.0))
+        self.assertEqual(take_token(0.5, 0.0, 2.0, 5.0), (0.5, 0.25))
+
+    @patch("app.rate_limits.environment", mock_environment)
+    def test_get_rate(self):
+        """get_rate: It gets the route limit capped by the api key one"""
+        self.assertEqual(get_rate("loginUser", None), 5.0)
+        self.assertEqual(get_rate("registerUser", None), 20.0)
+        self.assertEqual(get_rate("loginUser", ApiKey(digest="d", rate_limit=2)), 2)
+        self.assertEqual(get_rate("loginUser", ApiKey(digest="d", rate_limit=9)), 5.0)
+        self.assertIsNone(get_rate("logout", None))
+        self.assertEqual(get_rate("logout", ApiKey(digest="d", rate_limit=3)), 3)
+
+    @patch("app.rate_limits.time.monotonic")
+    def test_memory_backend(self, monotonic_mock):
+        """MemoryBackend: It limits every bucket on its own"""
+        monotonic_mock.return_value = 100.0
+        backend = MemoryBackend(10)
+        self.assertEqual(
+            [backend.acquire("key-1", 1.0, 2.0) for _ in range(3)], [0.0, 0.0, 1.0]
+        )
+        self.assertEqual(backend.acquire("key-2", 1.0, 2.0), 0.0)
+
+        monotonic_mock.return_value = 101.0
+        self.assertEqual(backend.acquire("key-1", 1.0, 2.0), 0.0)
+
+    def test_memory_backend_max_buckets(self):
+        """MemoryBackend: It evicts the least recently used buckets"""
+        backend = MemoryBackend(2)
+        for key in ["key-1", "key-2", "key-1", "key-3"]:
+            backend.acquire(key, 1.0, 1.0)
+        self.assertEqual(list(backend.buckets), ["key-1", "key-3"])
+
+    def test_sqlite_backend(self):
+        """SqliteBackend: It shares the buckets between backends of the same file"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "rate_limits.sqlite3")
+            first, second = SqliteBackend(path), SqliteBackend(path)
+
+            self.assertEqual(first.acquire("key-1", 0.001, 2.0), 0.0)
+            self.assertEqual(second.acquire("key-1", 0.001, 2.0), 0.0)
+            self.assertGreater(first.acquire("key-1", 0.001, 2.0), 0.0)
+            self.assertEqual(second.acquire("key-2", 0.001, 2.0), 0.0)
+
+            self.assertEqual(
+                first.get_connection().execute("PRAGMA journal_mode").fetchone(),
+                ("wal",),
+            )
+            first.get_connection().close()
+            second.get_connection().close()
+
+    def test_sqlite_backend_fails_open(self):
+        """SqliteBackend: It lets the requests through when the file is unusable"""
+        backend = SqliteBackend("/missing/directory/rate_limits.sqlite3")
+        self.assertEqual(backend.acquire("key-1", 1.0, 1.0), 0.0)
+
+    @patch(
+        "app.rate_limits.environment",
+        Mock(rate_limits={}, rate_limit_default=1.0, rate_limit_burst=1.0),
+    )
+    def test_rate_limit_blocking_backend(self):
+        """rate_limit: It takes the tokens of blocking backends off the event loop"""
+        threads = []
+        backend = Mock(blocking=True)
+        backend.acquire.side_effect = lambda *_: threads.append(threading.get_ident()) or 0.0
+        request = Mock(state=Mock(api_key=None), headers={})
+
+        async def check():
+            threads.append(threading.get_ident())
+            await rate_limit("loginUser")(request)
+
+        with patch("app.rate_limits.backend", backend):
+            asyncio.run(check())
+        self.assertEqual(len(threads), 2)
+        self.assertNotEqual(threads[0], threads[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
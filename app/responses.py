@@ -26,8 +26,20 @@ responses_descriptions = {
         "model": APIResponse,
         "description": constants.HTTP_422_DESCRIPTION,
     },
+    status.HTTP_429_TOO_MANY_REQUESTS: {
+        "model": APIResponse,
+        "description": constants.HTTP_429_DESCRIPTION,
+    },
     status.HTTP_500_INTERNAL_SERVER_ERROR: {
         "model": APIResponse,
         "description": constants.HTTP_500_DESCRIPTION,
     },
+    status.HTTP_503_SERVICE_UNAVAILABLE: {
+        "model": APIResponse,
+        "description": constants.HTTP_503_DESCRIPTION,
+    },
+    status.HTTP_504_GATEWAY_TIMEOUT: {
+        "model": APIResponse,
+        "description": constants.HTTP_504_DESCRIPTION,
+    },
 }
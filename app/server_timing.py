@@ -0,0 +1,166 @@
+"""Server-Timing breakdown of the request latency
+"""
+
+import contextlib
+import contextvars
+import functools
+import inspect
+import threading
+import time
+import typing
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from . import constants
+
+
+class ServerTiming:
+    """Times spent by a request in each of its steps
+
+    The steps may run in the worker threads of the request, which share this
+    object through the copies of the request context.
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.durations = {}
+        self.calls = {}
+        self.cache_lookups = {}
+        self.handled_at = None
+        self.lock = threading.Lock()
+
+    def add(self, name: str, duration: float) -> None:
+        """Adds the duration of a step
+
+        Args:
+            name (str): The step name
+            duration (float): The seconds spent in the step
+        """
+        with self.lock:
+            self.durations[name] = self.durations.get(name, 0.0) + duration
+            self.calls[name] = self.calls.get(name, 0) + 1
+
+    def add_cache_lookup(self, cache: str, result: str) -> None:
+        """Counts a cache lookup
+
+        Args:
+            cache (str): The cache name
+            result (str): The lookup result
+        """
+        with self.lock:
+            results = self.cache_lookups.setdefault(cache, {})
+            results[result] = results.get(result, 0) + 1
+
+    def to_header(self) -> str:
+        """Renders the times spent so far as a Server-Timing header value
+
+        Returns:
+            str: The Server-Timing header value
+        """
+        with self.lock:
+            entries = []
+            for name, duration in self.durations.items():
+                entry = f"{name};dur={duration * 1000:.1f}"
+                if self.calls[name] > 1:
+                    entry += f';desc="{self.calls[name]} calls"'
+                entries.append(entry)
+            for cache, results in self.cache_lookups.items():
+                counts = " ".join(f"{result}={count}" for result, count in results.items())
+                entries.append(f'{constants.CACHE_TIMING_PREFIX}{cache};desc="{counts}"')
+        total = time.perf_counter() - self.started_at
+        entries.append(f"{constants.TOTAL_TIMING_NAME};dur={total * 1000:.1f}")
+        return ", ".join(entries)
+
+
+server_timing = contextvars.ContextVar("server_timing", default=None)
+
+
+def add(name: str, duration: float) -> None:
+    """Adds the duration of a step of the request in context, if it is timed
+
+    Args:
+        name (str): The step name
+        duration (float): The seconds spent in the step
+    """
+    timing = server_timing.get()
+    if timing is not None:
+        timing.add(name, duration)
+
+
+def add_cache_lookup(cache: str, result: str) -> None:
+    """Counts a cache lookup of the request in context, if it is timed
+
+    Args:
+        cache (str): The cache name
+        result (str): The lookup result
+    """
+    timing = server_timing.get()
+    if timing is not None:
+        timing.add_cache_lookup(cache, result)
+
+
+@contextlib.contextmanager
+def timed(name: str) -> typing.Iterator[None]:
+    """Times a step of the request in context
+
+    Args:
+        name (str): The step name
+    """
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        add(name, time.perf_counter() - started_at)
+
+
+def mark_handled(func: typing.Callable) -> typing.Callable:
+    """Records when a route endpoint returns, before its response is serialized
+
+    Args:
+        func (typing.Callable): The route endpoint
+
+    Returns:
+        typing.Callable: The marked endpoint
+    """
+
+    def mark() -> None:
+        timing = server_timing.get()
+        if timing is not None:
+            timing.handled_at = time.perf_counter()
+
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            result = await func(*args, **kwargs)
+            mark()
+            return result
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        result = func(*args, **kwargs)
+        mark()
+        return result
+
+    return wrapper
+
+
+class ServerTimingRoute(APIRoute):
+    """Route timing the serialization of the responses of its endpoint"""
+
+    def get_route_handler(self) -> typing.Callable:
+        self.dependant.call = mark_handled(self.dependant.call)
+        handler = super().get_route_handler()
+
+        async def server_timing_route_handler(request: Request) -> Response:
+            response = await handler(request)
+            timing = server_timing.get()
+            if timing is not None and timing.handled_at is not None:
+                timing.add(
+                    constants.SERIALIZE_TIMING_NAME,
+                    time.perf_counter() - timing.handled_at,
+                )
+            return response
+
+        return server_timing_route_handler
@@ -0,0 +1,87 @@
+"""Server timing tests
+"""
+
+import time
+import unittest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from app import exceptions, metrics, middlewares, server_timing
+
+
+def parse_header(value):
+    """Parses a Server-Timing header into its entries by name"""
+    entries = {}
+    for entry in value.split(", "):
+        name, *params = entry.split(";")
+        entries[name] = dict(param.split("=", 1) for param in params)
+    return entries
+
+
+class ServerTimingTest(unittest.TestCase):
+    """Server timing tests"""
+
+    def test_to_header(self):
+        """ServerTiming: It renders the steps, cache lookups and total time"""
+        timing = server_timing.ServerTiming()
+        timing.add("auth", 0.0012)
+        timing.add("upstream", 0.02)
+        timing.add("upstream", 0.03)
+        timing.add_cache_lookup("introspection", "miss")
+        timing.add_cache_lookup("introspection", "hit")
+        timing.add_cache_lookup("introspection", "hit")
+        entries = parse_header(timing.to_header())
+        self.assertEqual(entries["auth"], {"dur": "1.2"})
+        self.assertEqual(entries["upstream"], {"dur": "50.0", "desc": '"2 calls"'})
+        self.assertEqual(entries["cache-introspection"], {"desc": '"miss=1 hit=2"'})
+        self.assertIn("dur", entries["total"])
+
+    def test_timed_outside_request(self):
+        """timed: It records nothing outside of a timed request"""
+        with server_timing.timed("auth"):
+            pass
+        server_timing.add_cache_lookup("introspection", "hit")
+        self.assertIsNone(server_timing.server_timing.get())
+
+    def test_middleware(self):
+        """ServerTimingMiddleware: It adds the breakdown of the protected routes"""
+        router = APIRouter(route_class=metrics.MetricsRoute)
+
+        @metrics.timed_upstream
+        def call_upstream():
+            time.sleep(0.01)
+
+        @router.get("/api/v1/auth/ok")
+        def get_ok():
+            with server_timing.timed("auth"):
+                metrics.record_cache_lookup("test", False)
+            call_upstream()
+            return {"ok": True}
+
+        @router.get("/api/v1/auth/conflict")
+        def get_conflict():
+            raise exceptions.CONFLICT_ERROR
+
+        @router.get("/other")
+        def get_other():
+            return {}
+
+        app = FastAPI()
+        app.include_router(router)
+        app.add_middleware(middlewares.ServerTimingMiddleware)
+        client = TestClient(app)
+
+        entries = parse_header(client.get("/api/v1/auth/ok").headers["server-timing"])
+        self.assertEqual(
+            set(entries), {"auth", "upstream", "cache-test", "serialize", "total"}
+        )
+        self.assertGreaterEqual(float(entries["upstream"]["dur"]), 10)
+        self.assertEqual(entries["cache-test"], {"desc": '"miss=1"'})
+
+        response = client.get("/api/v1/auth/conflict")
+        self.assertEqual(response.status_code, 409)
+        self.assertIn("total", parse_header(response.headers["server-timing"]))
+        self.assertNotIn("server-timing", client.get("/other").headers)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,243 @@
+"""Request tracing
+"""
+
+import contextlib
+import contextvars
+import functools
+import inspect
+import json
+import random
+import time
+import typing
+from fastapi import Request, Response, status
+from . import batch_writer
+from . import constants
+from . import environment
+from . import metrics
+
+
+class Span:  # pylint: disable=too-many-instance-attributes
+    """Timed operation of a sampled trace"""
+
+    def __init__(self, name: str, trace_id: str, parent_id: typing.Optional[str]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.start_time = time.time()
+        self.started_at = time.perf_counter()
+        self.attributes = {}
+        self.status = constants.SPAN_OK_STATUS
+
+    def set_attribute(self, name: str, value: typing.Any) -> None:
+        """Sets an attribute of the span
+
+        Args:
+            name (str): The attribute name
+            value (typing.Any): The attribute value
+        """
+        self.attributes[name] = value
+
+    def to_record(self) -> str:
+        """Renders the finished span as a JSON line
+
+        Returns:
+            str: The span record
+        """
+        return json.dumps(
+            {
+                "traceId": self.trace_id,
+                "spanId": self.span_id,
+                "parentSpanId": self.parent_id,
+                "name": self.name,
+                "startTime": self.start_time,
+                "duration": time.perf_counter() - self.started_at,
+                "status": self.status,
+                "attributes": self.attributes,
+            },
+            default=str,
+            separators=(",", ":"),
+        )
+
+
+current_span = contextvars.ContextVar("current_span", default=None)
+span_writer = batch_writer.BatchWriter(
+    "spans",
+    batch_writer.append_lines(environment.tracing_file),
+    environment.tracing_queue_size,
+    constants.TRACING_BATCH_SIZE,
+    constants.TRACING_FLUSH_INTERVAL,
+)
+
+
+def parse_traceparent(
+    value: typing.Optional[str],
+) -> typing.Optional[typing.Tuple[str, str, bool]]:
+    """Parses a W3C trace context header
+
+    Args:
+        value (typing.Optional[str]): The traceparent header
+
+    Returns:
+        typing.Optional[typing.Tuple[str, str, bool]]: The trace id, the parent
+        span id and whether the caller sampled the trace, or None when the
+        header is missing or invalid
+    """
+    if not value:
+        return None
+    parts = value.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        flags = int(parts[3], 16)
+        int(parts[1], 16)
+        int(parts[2], 16)
+    except ValueError:
+        return None
+    return parts[1], parts[2], bool(flags & constants.TRACEPARENT_SAMPLED_FLAG)
+
+
+def should_sample(traceparent: typing.Optional[typing.Tuple[str, str, bool]]) -> bool:
+    """Takes the head sampling decision of a new trace
+
+    The decision of the caller is followed when it sent one, so traces are
+    never cut in half.
+
+    Args:
+        traceparent (typing.Optional[typing.Tuple[str, str, bool]]): The parsed traceparent header
+
+    Returns:
+        bool: True when the trace is recorded
+    """
+    if environment.tracing_sample_rate <= 0:
+        return False
+    if traceparent is not None:
+        return traceparent[2]
+    return random.random() < environment.tracing_sample_rate
+
+
+@contextlib.contextmanager
+def start_span(name: str, **attributes) -> typing.Iterator[typing.Optional[Span]]:
+    """Opens a child span of the span in context
+
+    Nothing is recorded outside of sampled traces. The child span carries the
+    operation id of its parent.
+
+    Args:
+        name (str): The span name
+
+    Yields:
+        typing.Optional[Span]: The span or None when the trace is not sampled
+    """
+    parent = current_span.get()
+    if parent is None:
+        yield None
+        return
+    span = Span(name, parent.trace_id, parent.span_id)
+    operation_id = parent.attributes.get(constants.SPAN_OPERATION_ID_ATTRIBUTE)
+    if operation_id is not None:
+        span.set_attribute(constants.SPAN_OPERATION_ID_ATTRIBUTE, operation_id)
+    span.attributes.update(attributes)
+    token = current_span.set(span)
+    try:
+        yield span
+    except BaseException:
+        span.status = constants.SPAN_ERROR_STATUS
+        raise
+    finally:
+        current_span.reset(token)
+        span_writer.submit(span.to_record())
+
+
+def set_response_attributes(span: Span, response: typing.Any) -> None:
+    """Sets the status and size of a response on a span
+
+    Args:
+        span (Span): The span
+        response (typing.Any): The response
+    """
+    status_code = getattr(response, "status_code", None)
+    if status_code is not None:
+        span.set_attribute(constants.SPAN_STATUS_CODE_ATTRIBUTE, status_code)
+    body = getattr(response, "content", None) or getattr(response, "body", None)
+    if isinstance(body, bytes):
+        span.set_attribute(constants.SPAN_BYTES_ATTRIBUTE, len(body))
+
+
+def traced_upstream(func: typing.Callable) -> typing.Callable:
+    """Opens a span around the calls of an auth API function
+
+    Args:
+        func (typing.Callable): The auth API function
+
+    Returns:
+        typing.Callable: The traced function
+    """
+    name = f"{constants.UPSTREAM_SPAN_PREFIX}{func.__name__}"
+
+    def get_realm(args: tuple, kwargs: dict) -> typing.Optional[str]:
+        return kwargs.get("realm", args[0] if args else None)
+
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            if current_span.get() is None:
+                return await func(*args, **kwargs)
+            with start_span(name, realm=get_realm(args, kwargs)) as span:
+                response = await func(*args, **kwargs)
+                set_response_attributes(span, response)
+                return response
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if current_span.get() is None:
+            return func(*args, **kwargs)
+        with start_span(name, realm=get_realm(args, kwargs)) as span:
+            response = func(*args, **kwargs)
+            set_response_attributes(span, response)
+            return response
+
+    return wrapper
+
+
+class TracedRoute(metrics.MetricsRoute):
+    """Route opening the root span of the sampled requests of its operation"""
+
+    def get_route_handler(self) -> typing.Callable:
+        handler = super().get_route_handler()
+        operation_id = self.operation_id or self.name
+
+        async def traced_route_handler(request: Request) -> Response:
+            traceparent = parse_traceparent(
+                request.headers.get(constants.TRACEPARENT_HEADER)
+            )
+            if not should_sample(traceparent):
+                return await handler(request)
+
+            trace_id = traceparent[0] if traceparent else f"{random.getrandbits(128):032x}"
+            span = Span(operation_id, trace_id, traceparent[1] if traceparent else None)
+            span.set_attribute(constants.SPAN_OPERATION_ID_ATTRIBUTE, operation_id)
+            span.set_attribute(
+                constants.SPAN_REALM_ATTRIBUTE,
+                request.headers.get(constants.APPLICATION_HEADER.decode("latin-1")),
+            )
+            token = current_span.set(span)
+            try:
+                response = await handler(request)
+                set_response_attributes(span, response)
+                return response
+            except Exception as exc:
+                span.status = constants.SPAN_ERROR_STATUS
+                span.set_attribute(
+                    constants.SPAN_STATUS_CODE_ATTRIBUTE,
+                    getattr(exc, "status_code", status.HTTP_500_INTERNAL_SERVER_ERROR),
+                )
+                raise
+            finally:
+                current_span.reset(token)
+                span_writer.submit(span.to_record())
+
+        return traced_route_handler
@@ -0,0 +1,125 @@
+"""Tracing tests
+"""
+
+import asyncio
+import json
+import unittest
+from unittest.mock import Mock, patch
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from app import exceptions, tracing
+
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+mock_environment = Mock(tracing_sample_rate=1.0)
+
+
+class TracingTest(unittest.TestCase):
+    """Tracing tests"""
+
+    def setUp(self):
+        self.records = []
+        patcher = patch.object(tracing.span_writer, "submit", self.records.append)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get_spans(self):
+        """Gets the submitted spans"""
+        return [json.loads(record) for record in self.records]
+
+    def test_parse_traceparent(self):
+        """parse_traceparent: It parses the valid W3C trace context headers"""
+        self.assertEqual(
+            tracing.parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-01"),
+            (TRACE_ID, PARENT_ID, True),
+        )
+        self.assertEqual(
+            tracing.parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-00"),
+            (TRACE_ID, PARENT_ID, False),
+        )
+        for value in [None, "", "00-abc-def-01", f"00-{TRACE_ID}-{PARENT_ID}-zz"]:
+            self.assertIsNone(tracing.parse_traceparent(value))
+
+    @patch("app.tracing.environment", mock_environment)
+    def test_should_sample(self):
+        """should_sample: It follows the decision of the caller"""
+        self.assertTrue(tracing.should_sample(None))
+        self.assertTrue(tracing.should_sample((TRACE_ID, PARENT_ID, True)))
+        self.assertFalse(tracing.should_sample((TRACE_ID, PARENT_ID, False)))
+
+    @patch("app.tracing.environment", Mock(tracing_sample_rate=0.0))
+    def test_should_sample_disabled(self):
+        """should_sample: It records nothing when tracing is disabled"""
+        self.assertFalse(tracing.should_sample((TRACE_ID, PARENT_ID, True)))
+
+    def test_start_span_unsampled(self):
+        """start_span: It records nothing outside of sampled traces"""
+        with tracing.start_span("test") as span:
+            self.assertIsNone(span)
+        self.assertEqual(self.records, [])
+
+    def test_traced_upstream(self):
+        """traced_upstream: It records a child span of the upstream calls"""
+
+        @tracing.traced_upstream
+        async def call_upstream(realm):  # pylint: disable=W0613
+            return Mock(status_code=200, content=b"{}")
+
+        parent = tracing.Span("parent", TRACE_ID, None)
+        parent.set_attribute("operation_id", "testOperation")
+        token = tracing.current_span.set(parent)
+        try:
+            asyncio.run(call_upstream("realm-1"))
+        finally:
+            tracing.current_span.reset(token)
+
+        [span] = self.get_spans()
+        self.assertEqual(span["name"], "upstream.call_upstream")
+        self.assertEqual(span["traceId"], TRACE_ID)
+        self.assertEqual(span["parentSpanId"], parent.span_id)
+        self.assertEqual(
+            span["attributes"],
+            {
+                "operation_id": "testOperation",
+                "realm": "realm-1",
+                "status_code": 200,
+                "response_bytes": 2,
+            },
+        )
+
+    @patch("app.tracing.environment", mock_environment)
+    def test_traced_route(self):
+        """TracedRoute: It records the root span of the sampled requests"""
+        def get_item(fail: bool = False):
+            if fail:
+                raise exceptions.CONFLICT_ERROR
+            with tracing.start_span("child"):
+                return {}
+
+        router = APIRouter(route_class=tracing.TracedRoute)
+        router.add_api_route("/item", get_item, operation_id="testTracedItem")
+        client = TestClient(FastAPI(routes=router.routes))
+        client.get(
+            "/item",
+            headers={
+                "traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01",
+                "application": "app-1",
+            },
+        )
+        client.get("/item", params={"fail": True})
+
+        child, root, failed = self.get_spans()
+        self.assertEqual(root["traceId"], TRACE_ID)
+        self.assertEqual(root["parentSpanId"], PARENT_ID)
+        self.assertEqual(root["attributes"]["operation_id"], "testTracedItem")
+        self.assertEqual(root["attributes"]["realm"], "app-1")
+        self.assertEqual(root["attributes"]["status_code"], 200)
+        self.assertEqual(child["parentSpanId"], root["spanId"])
+        self.assertEqual(failed["status"], "error")
+        self.assertEqual(failed["attributes"]["status_code"], 409)
+        self.assertIsNone(failed["parentSpanId"])
+
+
+if __name__ == "__main__":
+    unittest.main()